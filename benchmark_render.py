@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+HexMap Render Benchmark
+
+Measures how the frontend (HexGridRenderer, ConnectionRenderer) scales with
+map size, and keeps a JSON trend file of the results.
+
+For every map size:
+- builds a layout with generate_test_data and ContinentLayoutEngine (cached
+  under benchmarks/maps/)
+- loads it in headless Chromium through the app's live-layout hook: the dev
+  server runs with REACT_APP_LAYOUT_SERVER=BENCH_ORIGIN, and Playwright
+  answers that origin's /data.json with the generated map
+- scripts zoom, pan and hover sequences, waiting on the app's render-complete
+  signal (render_status.py)
+- records first render time, frame times, long tasks, JS heap and DOM node
+  count per phase, from in-page observers and the CDP Performance domain
+
+The dev server is started with with_server.py's helpers unless --url points
+at one that is already running (with REACT_APP_LAYOUT_SERVER set as above).
+
+Usage:
+    python benchmark_render.py run                          # 500, 5k, 20k, 50k apps
+    python benchmark_render.py run --sizes 500 5000 --label before-fix
+    python benchmark_render.py run --geometry               # Maps with precomputed geometry
+    python benchmark_render.py trend                        # Key metrics across runs
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from io import StringIO
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR / 'tools'))
+
+import with_server  # noqa: E402
+from continent_layout import ContinentLayoutEngine, generate_test_data  # noqa: E402
+from hexmap_geometry import add_geometry  # noqa: E402
+from render_status import RenderTimer  # noqa: E402
+
+DEFAULT_SIZES = [500, 5000, 20000, 50000]
+DEFAULT_HISTORY = SCRIPT_DIR / "benchmarks" / "render-history.json"
+MAPS_DIR = SCRIPT_DIR / "benchmarks" / "maps"
+
+# Stand-in layout server; requests to it never leave the browser
+BENCH_ORIGIN = 'http://hexmap-bench.localhost'
+
+# A frame longer than this counts as janky (about three missed 60 Hz frames)
+JANK_FRAME_MS = 50
+
+# Installed before the app loads: frame intervals and long tasks
+OBSERVERS_JS = """
+window.__bench = { frames: [], longTasks: [] };
+let lastFrame = performance.now();
+const tick = (now) => {
+    window.__bench.frames.push(now - lastFrame);
+    lastFrame = now;
+    requestAnimationFrame(tick);
+};
+requestAnimationFrame(tick);
+try {
+    new PerformanceObserver((list) => {
+        list.getEntries().forEach(entry => window.__bench.longTasks.push(entry.duration));
+    }).observe({ type: 'longtask', buffered: true });
+} catch (e) {
+    // No long task API in this browser
+}
+"""
+TAKE_OBSERVED_JS = """
+() => {
+    const observed = window.__bench;
+    window.__bench = { frames: [], longTasks: [] };
+    return { ...observed, domNodes: document.getElementsByTagName('*').length };
+}
+"""
+
+# Zoom levels are discrete (ZoomHandler): 1 -> 2.2 -> 4 -> 2.2 -> 1 -> 0.7 -> 1
+ZOOM_SEQUENCE = [-1, -1, 1, 1, 1, -1]
+
+
+def build_map(num_apps, seed, geometry, rebuild=False):
+    """Generate (or reuse) the layout for one size; returns its path."""
+    suffix = '-geometry' if geometry else ''
+    path = MAPS_DIR / f"apps-{num_apps}-seed-{seed}{suffix}.json"
+    if path.exists() and not rebuild:
+        return path
+
+    start = time.perf_counter()
+    with redirect_stdout(StringIO()):
+        engine = ContinentLayoutEngine(seed=seed, verbose=False)
+        engine.load_apps(generate_test_data(num_apps, seed))
+        layout = engine.generate_layout()
+    if geometry:
+        add_geometry(layout)
+    MAPS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(layout, f, separators=(',', ':'))
+    print(f"  built {path.name} in {time.perf_counter() - start:.1f}s")
+    return path
+
+
+def _percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize_phase(observed, cdp_metrics, render_steps):
+    """One phase's numbers from the in-page observers, CDP metrics and render waits."""
+    frames = observed['frames']
+    long_tasks = observed['longTasks']
+    return {
+        'render_ms_total': sum(step['ms'] for step in render_steps),
+        'render_ms_max': max((step['ms'] for step in render_steps), default=0),
+        'frames': len(frames),
+        'frame_ms_p50': round(_percentile(frames, 50), 1) if frames else None,
+        'frame_ms_p95': round(_percentile(frames, 95), 1) if frames else None,
+        'frame_ms_max': round(max(frames), 1) if frames else None,
+        'janky_frames': sum(1 for frame in frames if frame > JANK_FRAME_MS),
+        'long_tasks': len(long_tasks),
+        'long_task_ms_total': round(sum(long_tasks)),
+        'long_task_ms_max': round(max(long_tasks, default=0)),
+        'js_heap_mb': round(cdp_metrics.get('JSHeapUsedSize', 0) / 2**20, 1),
+        'dom_nodes': observed['domNodes'],
+        'cdp_nodes': int(cdp_metrics.get('Nodes', 0)),
+    }
+
+
+def benchmark_size(browser, url, map_path, render_timeout):
+    """Load one map and run every scripted phase; returns the result record."""
+    body = map_path.read_bytes()
+    served = {'data': 0}
+
+    def serve_layout(route):
+        cors = {'Access-Control-Allow-Origin': '*'}
+        if route.request.url.split('?')[0].endswith('/data.json'):
+            served['data'] += 1
+            route.fulfill(status=200, content_type='application/json', body=body, headers=cors)
+        else:
+            # 204 stops EventSource from reconnecting to /events
+            route.fulfill(status=204, headers=cors)
+
+    context = browser.new_context(viewport={'width': 1920, 'height': 1080})
+    context.route(f"{BENCH_ORIGIN}/**", serve_layout)
+    context.add_init_script(OBSERVERS_JS)
+    page = context.new_page()
+    cdp = context.new_cdp_session(page)
+    cdp.send('Performance.enable')
+    render = RenderTimer(page, timeout=render_timeout)
+
+    def metrics():
+        return {m['name']: m['value'] for m in cdp.send('Performance.getMetrics')['metrics']}
+
+    phases = {}
+
+    def phase(name, since):
+        steps = render.timings[since:]
+        phases[name] = summarize_phase(page.evaluate(TAKE_OBSERVED_JS), metrics(), steps)
+        return len(render.timings)
+
+    try:
+        # First render: navigation until the grid has been drawn and painted
+        with render.step('first render', navigation=True):
+            page.goto(url)
+        if not served['data']:
+            raise RuntimeError(f"the app did not request {BENCH_ORIGIN}/data.json; start the dev "
+                               f"server with REACT_APP_LAYOUT_SERVER={BENCH_ORIGIN}")
+        mark = phase('load', 0)
+        grid_ms = [step['ms'] for timing in render.timings for step in timing['browser']
+                   if step['label'].startswith('grid')]
+        phases['load']['first_render_ms'] = render.timings[0]['ms']
+        phases['load']['grid_render_ms'] = grid_ms[0] if grid_ms else None
+
+        box = page.locator('svg').first.bounding_box()
+        center_x = box['x'] + box['width'] / 2
+        center_y = box['y'] + box['height'] / 2
+
+        page.mouse.move(center_x, center_y)
+        for i, direction in enumerate(ZOOM_SEQUENCE):
+            with render.step(f"zoom {'in' if direction < 0 else 'out'} {i + 1}"):
+                page.mouse.wheel(0, 500 * direction)
+        mark = phase('zoom', mark)
+
+        for i, (dx, dy) in enumerate([(300, 0), (0, 200), (-300, 0), (0, -200)]):
+            with render.step(f'pan {i + 1}', expect_render=False):
+                page.mouse.move(center_x, center_y)
+                page.mouse.down()
+                page.mouse.move(center_x + dx, center_y + dy, steps=20)
+                page.mouse.up()
+        mark = phase('pan', mark)
+
+        # Hover needs zoom 2.2+ for per-app highlights and connection lines
+        with render.step('zoom for hover'):
+            page.mouse.wheel(0, -500)
+        for row in range(5):
+            for col in range(5):
+                with render.step(f'hover {row * 5 + col + 1}', expect_render=False):
+                    page.mouse.move(center_x + (col - 2) * 40, center_y + (row - 2) * 35)
+        phase('hover', mark)
+
+        return {'phases': phases, 'render_steps': render.timings}
+    finally:
+        context.close()
+
+
+def start_dev_server(port, timeout):
+    """npm start with the benchmark's layout origin, through with_server.py."""
+    os.environ.update({'REACT_APP_LAYOUT_SERVER': BENCH_ORIGIN, 'BROWSER': 'none',
+                       'PORT': str(port)})
+    server = {'number': 1, 'cmd': 'npm start', 'port': port,
+              'health': f'http://localhost:{port}/static/js/bundle.js', 'expect_status': 200}
+    process = with_server.start_server(server)
+    try:
+        with_server.wait_for_all([server], [process], timeout)
+    except RuntimeError:
+        with_server.stop_process_group(process.pid, process)
+        raise
+    return process
+
+
+def load_history(path):
+    """Load the list of recorded runs (empty if the file does not exist)."""
+    path = Path(path)
+    if not path.exists():
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_json(data, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def print_result(result):
+    """Print one size's phases as a short table."""
+    num_apps = result['num_apps']
+    if result.get('error'):
+        print(f"\n{num_apps} apps: ERROR {result['error']}")
+        return
+
+    load = result['phases']['load']
+    print(f"\n{num_apps} apps: first render {load['first_render_ms']} ms "
+          f"(grid {load['grid_render_ms']} ms), {load['dom_nodes']} DOM nodes, "
+          f"{load['js_heap_mb']} MB heap")
+    print(f"  {'phase':<6} {'render ms':>10} {'frame p50':>10} {'frame p95':>10} "
+          f"{'janky':>6} {'long tasks':>11} {'long ms':>8}")
+    for name, numbers in result['phases'].items():
+        print(f"  {name:<6} {numbers['render_ms_total']:>10} {str(numbers['frame_ms_p50']):>10} "
+              f"{str(numbers['frame_ms_p95']):>10} {numbers['janky_frames']:>6} "
+              f"{numbers['long_tasks']:>11} {numbers['long_task_ms_total']:>8}")
+
+
+def cmd_run(args):
+    from playwright.sync_api import sync_playwright
+
+    print(f"Building maps for sizes {args.sizes} (seed {args.seed})")
+    maps = {num_apps: build_map(num_apps, args.seed, args.geometry, args.rebuild_maps)
+            for num_apps in args.sizes}
+
+    run = {
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "label": args.label,
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "params": {"seed": args.seed, "geometry": args.geometry},
+        "results": [],
+    }
+
+    server = None
+    url = args.url
+    if not url:
+        print(f"Starting dev server on port {args.port}...")
+        server = start_dev_server(args.port, args.server_timeout)
+        url = f'http://localhost:{args.port}'
+
+    try:
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=True)
+            try:
+                for num_apps, map_path in maps.items():
+                    print(f"\nBenchmarking {num_apps} apps ({map_path.stat().st_size // 1024} KB)...")
+                    result = {'num_apps': num_apps, 'map_bytes': map_path.stat().st_size}
+                    try:
+                        result.update(benchmark_size(browser, url, map_path,
+                                                     args.render_timeout * 1000))
+                    except Exception as e:
+                        result['error'] = f"{type(e).__name__}: {e}"
+                    print_result(result)
+                    run['results'].append(result)
+            finally:
+                browser.close()
+    finally:
+        if server:
+            with_server.stop_process_group(server.pid, server)
+
+    history = load_history(args.history)
+    history.append(run)
+    save_json(history, args.history)
+    print(f"\nAppended run to: {args.history}")
+    return 1 if any(result.get('error') for result in run['results']) else 0
+
+
+def cmd_trend(args):
+    history = load_history(args.history)
+    if not history:
+        print(f"Error: No runs recorded in {args.history}")
+        return 1
+
+    phase, metric = args.metric.split('.', 1) if '.' in args.metric else ('load', args.metric)
+    runs = history[-args.last:]
+    sizes = sorted({result['num_apps'] for run in runs for result in run['results']})
+    print(f"{phase}.{metric} by map size\n")
+    print(f"  {'run':<28}" + "".join(f"{size:>10}" for size in sizes))
+    for run in runs:
+        by_size = {result['num_apps']: result for result in run['results']}
+        cells = []
+        for size in sizes:
+            result = by_size.get(size)
+            if result is None:
+                cells.append('')
+            elif result.get('error'):
+                cells.append('error')
+            else:
+                cells.append(str(result['phases'].get(phase, {}).get(metric, '')))
+        name = f"{run['timestamp']} {run['label']}".strip()
+        print(f"  {name[:28]:<28}" + "".join(f"{cell:>10}" for cell in cells))
+    return 0
+
+
+def _git_commit():
+    """Short commit hash of the tree being measured, if this is a git checkout."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPT_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark HexMap frontend rendering across map sizes',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python benchmark_render.py run --sizes 500 5000
+  python benchmark_render.py run --geometry --label precomputed
+  python benchmark_render.py run --url http://localhost:3333   # Server already running
+  python benchmark_render.py trend --metric zoom.frame_ms_p95
+        """
+    )
+    parser.add_argument('--history', default=str(DEFAULT_HISTORY),
+                        help='JSON trend file (default: benchmarks/render-history.json)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Run the benchmark and append to the trend file')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                            help='Map sizes in apps (default: 500 5000 20000 50000)')
+    run_parser.add_argument('-s', '--seed', type=int, default=42,
+                            help='Random seed (default: 42)')
+    run_parser.add_argument('--geometry', action='store_true',
+                            help='Benchmark maps with precomputed geometry (hexmap_geometry.py)')
+    run_parser.add_argument('--rebuild-maps', action='store_true',
+                            help='Regenerate cached maps (after layout engine changes)')
+    run_parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 3333)),
+                            help='Port for the dev server (default: $PORT or 3333)')
+    run_parser.add_argument('--url',
+                            help=f'Use a running dev server started with '
+                                 f'REACT_APP_LAYOUT_SERVER={BENCH_ORIGIN}')
+    run_parser.add_argument('--server-timeout', type=int, default=180,
+                            help='Seconds to wait for the dev server (default: 180)')
+    run_parser.add_argument('--render-timeout', type=int, default=300,
+                            help='Seconds allowed for any one render (default: 300)')
+    run_parser.add_argument('--label', default='',
+                            help='Free-form label stored with the run')
+
+    trend_parser = subparsers.add_parser('trend', help='Show one metric across recorded runs')
+    trend_parser.add_argument('--metric', default='load.first_render_ms',
+                              help='phase.metric to show (default: load.first_render_ms)')
+    trend_parser.add_argument('--last', type=int, default=10,
+                              help='Number of most recent runs (default: 10)')
+
+    args = parser.parse_args()
+
+    commands = {'run': cmd_run, 'trend': cmd_trend}
+    return commands[args.command](args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
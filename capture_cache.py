@@ -0,0 +1,124 @@
+"""
+Reusing visual test captures when nothing they depend on has changed.
+
+A capture's key hashes:
+- src/data.json
+- the app sources (src/ without its tests, public/, package.json and its lockfile)
+- the installed Playwright version
+- whatever the capture script passes as the scenario's definition, usually
+  the scenario function's source and its viewport
+
+A scenario that passed is stored under .capture-cache/<scenario>/<key>/:
+its screenshots and other output files, plus record.json holding its
+result (stats, render timings). The next run with the same key copies
+them back instead of opening a browser:
+
+    key = cache_key(scenario_function, viewport)
+    result = restore('load', key)
+    if result is None:
+        result = run(...)
+        store('load', key, result, result['screenshots'])
+"""
+
+import hashlib
+import inspect
+import json
+import shutil
+import time
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+CACHE_DIR = SCRIPT_DIR / '.capture-cache'
+DATA_PATH = SCRIPT_DIR / 'src' / 'data.json'
+SOURCE_PATHS = ['src', 'public', 'package.json', 'package-lock.json']
+TEST_SUFFIXES = ('.test.js', '.test.jsx')
+KEEP_PER_SCENARIO = 5       # Keys kept per scenario, most recently used first
+
+_sources_digest = None
+
+
+def _hash_file(digest, path):
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+
+
+def sources_hash():
+    """Hash of every app source file, with its path. Computed once per process."""
+    global _sources_digest
+    if _sources_digest is None:
+        digest = hashlib.sha256()
+        for name in SOURCE_PATHS:
+            root = SCRIPT_DIR / name
+            files = sorted(root.rglob('*')) if root.is_dir() else [root]
+            for path in files:
+                if not path.is_file() or path.name.endswith(TEST_SUFFIXES):
+                    continue
+                digest.update(path.relative_to(SCRIPT_DIR).as_posix().encode() + b'\0')
+                _hash_file(digest, path)
+        _sources_digest = digest.hexdigest()
+    return _sources_digest
+
+
+def _playwright_version():
+    try:
+        from importlib.metadata import version
+        return version('playwright')
+    except Exception:
+        return 'unknown'
+
+
+def cache_key(*definition):
+    """
+    Key for one scenario: the data file, app sources, Playwright version and
+    definition, which may hold strings, functions, classes or modules (hashed
+    by source) or JSON-serializable values.
+    """
+    digest = hashlib.sha256()
+    _hash_file(digest, DATA_PATH)
+    digest.update(sources_hash().encode())
+    digest.update(_playwright_version().encode())
+    for part in definition:
+        if callable(part) or inspect.ismodule(part):
+            part = inspect.getsource(part)
+        elif not isinstance(part, str):
+            part = json.dumps(part, sort_keys=True)
+        digest.update(b'\0' + part.encode())
+    return digest.hexdigest()[:16]
+
+
+def restore(name, key, cache_dir=CACHE_DIR):
+    """Copy a stored scenario's files back to where they were written; returns its record, or None."""
+    entry = Path(cache_dir) / name / key
+    try:
+        with open(entry / 'record.json') as f:
+            stored = json.load(f)
+        for filename, original in stored['files'].items():
+            Path(original).parent.mkdir(parents=True, exist_ok=True)
+            shutil.copyfile(entry / filename, original)
+    except (OSError, ValueError, KeyError):
+        return None
+    (entry / 'record.json').touch()
+    return stored['record']
+
+
+def store(name, key, record, files, cache_dir=CACHE_DIR):
+    """Store a scenario's record and output files under its key, dropping its oldest keys."""
+    scenario_dir = Path(cache_dir) / name
+    entry = scenario_dir / key
+    if entry.exists():
+        shutil.rmtree(entry)
+    entry.mkdir(parents=True)
+    stored_files = {}
+    for number, original in enumerate(files):
+        filename = f"{number:02d}-{Path(original).name}"
+        shutil.copyfile(original, entry / filename)
+        stored_files[filename] = str(original)
+    with open(entry / 'record.json', 'w') as f:
+        json.dump({'key': key, 'stored': time.time(), 'files': stored_files, 'record': record},
+                  f, indent=2)
+
+    entries = sorted((path for path in scenario_dir.iterdir() if (path / 'record.json').exists()),
+                     key=lambda path: (path / 'record.json').stat().st_mtime, reverse=True)
+    for old in entries[KEEP_PER_SCENARIO:]:
+        shutil.rmtree(old, ignore_errors=True)
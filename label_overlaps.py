@@ -0,0 +1,90 @@
+"""
+Overlap checks for the visual tests.
+
+The browser is asked for every cluster label and hexagon box in a single
+page.evaluate call (COLLECT_GEOMETRY_JS). The overlaps are then found here
+with a sort-and-sweep on x: boxes are visited left to right, and each one is
+compared only with the boxes whose x range it can still reach. That is
+O(n log n) for the sort plus the comparisons within one sweep window. The
+old per-label round trips took O(n) calls to the browser, and every pair
+was compared.
+
+Boxes are Playwright/DOM style dicts: {'x', 'y', 'width', 'height', ...}.
+"""
+
+# Runs in the page; returns {'labels': [...], 'hexes': [...]} in viewport pixels
+COLLECT_GEOMETRY_JS = """
+() => {
+    const box = el => {
+        const r = el.getBoundingClientRect();
+        return {x: r.x, y: r.y, width: r.width, height: r.height};
+    };
+    const shown = b => b.width > 0 && b.height > 0;
+    const labels = Array.from(document.querySelectorAll('.cluster-label'), el =>
+        ({...box(el), text: el.textContent}));
+    const hexes = Array.from(document.querySelectorAll('path.hexagon'), el => {
+        const group = el.closest('.hexagon-group');
+        return {...box(el), id: group ? group.id : ''};
+    });
+    return {labels: labels.filter(shown), hexes: hexes.filter(shown)};
+}
+"""
+
+
+def boxes_overlap(box1, box2, padding=2):
+    """Check if two bounding boxes overlap (with optional padding)."""
+    if box1 is None or box2 is None:
+        return False
+    return not (
+        box1['x'] + box1['width'] + padding < box2['x'] or
+        box2['x'] + box2['width'] + padding < box1['x'] or
+        box1['y'] + box1['height'] + padding < box2['y'] or
+        box2['y'] + box2['height'] + padding < box1['y']
+    )
+
+
+def _sweep(boxes, others, padding):
+    """
+    Overlapping (i, j) pairs, by boxes_overlap. With others=None: pairs
+    i < j within boxes. Otherwise: box i of boxes against box j of others only.
+    """
+    # (left, right, top, bottom, side, index); side 0 = boxes, 1 = others
+    items = [(b['x'], b['x'] + b['width'], b['y'], b['y'] + b['height'], 0, i)
+             for i, b in enumerate(boxes)]
+    if others is not None:
+        items += [(b['x'], b['x'] + b['width'], b['y'], b['y'] + b['height'], 1, j)
+                  for j, b in enumerate(others)]
+    items.sort()
+
+    # Active boxes per side whose right edge (plus padding) the sweep hasn't passed
+    active = ([], [])
+    pairs = []
+    for left, right, top, bottom, side, index in items:
+        # Within one set everything meets everything; across sets, only the other side
+        against = (0,) if others is None else (1 - side,)
+        for other_side in against:
+            still_active = []
+            for item in active[other_side]:
+                if item[1] + padding < left:
+                    continue        # Ends before this box starts, and before every later one
+                still_active.append(item)
+                if item[3] + padding >= top and bottom + padding >= item[2]:
+                    if side == 0 and others is None:
+                        pairs.append((min(item[5], index), max(item[5], index)))
+                    elif side == 0:
+                        pairs.append((index, item[5]))
+                    else:
+                        pairs.append((item[5], index))
+            active[other_side][:] = still_active
+        active[side].append((left, right, top, bottom, side, index))
+    return sorted(pairs)
+
+
+def find_overlaps(boxes, padding=2):
+    """Pairs (i, j), i < j, of overlapping boxes."""
+    return _sweep(boxes, None, padding)
+
+
+def find_cross_overlaps(boxes, others, padding=0):
+    """Pairs (i, j) where boxes[i] overlaps others[j]; boxes within a list are not compared."""
+    return _sweep(boxes, others, padding)
@@ -0,0 +1,88 @@
+"""
+Waiting on the map's render-complete signal in the visual tests.
+
+src/utils/renderStatus.js marks <html data-hexmap-render="idle"> once the grid
+has been drawn and every zoom / connection transition has finished, and
+keeps a count of render steps in window.hexmapRender. RenderTimer wraps each
+test action so the test waits for exactly that instead of sleeping:
+
+    render = RenderTimer(page)
+    with render.step('status mode'):
+        toggle.click()                  # returns once the re-render has settled
+    with render.step('hover', expect_render=False):
+        hexagon.hover()                 # may not render anything at all
+
+With expect_render (the default), the step waits for a render started after
+the action to settle. Without it, it waits two frames and then for idle.
+Every step's wait is recorded, along with the browser's own step timings,
+so slow renders show up in the test output.
+"""
+
+import json
+import time
+from contextlib import contextmanager
+
+RENDER_COUNT_JS = "() => window.hexmapRender ? window.hexmapRender.started : 0"
+SETTLED_AFTER_JS = """
+since => document.documentElement.dataset.hexmapRender === 'idle'
+    && window.hexmapRender.settled > since
+"""
+IDLE_JS = "() => document.documentElement.dataset.hexmapRender === 'idle'"
+NEXT_FRAMES_JS = "() => new Promise(r => requestAnimationFrame(() => requestAnimationFrame(r)))"
+BROWSER_STEPS_JS = "count => window.hexmapRender ? window.hexmapRender.steps.slice(-count) : []"
+
+
+class RenderTimer:
+    """Waits for the map to finish rendering after each test step and records how long it took."""
+
+    def __init__(self, page, timeout=30000):
+        self.page = page
+        self.timeout = timeout
+        self.timings = []
+
+    @contextmanager
+    def step(self, name, expect_render=True, navigation=False):
+        """
+        Run the enclosed action, then wait until the map has rendered it.
+        navigation: the action loads a new page, whose render count starts at 0.
+        """
+        since = 0 if navigation else self.page.evaluate(RENDER_COUNT_JS)
+        start = time.perf_counter()
+        yield
+        if expect_render:
+            self.page.wait_for_function(SETTLED_AFTER_JS, arg=since, timeout=self.timeout)
+        else:
+            self.page.evaluate(NEXT_FRAMES_JS)
+            self.page.wait_for_function(IDLE_JS, timeout=self.timeout)
+        elapsed = time.perf_counter() - start
+
+        count = self.page.evaluate(RENDER_COUNT_JS) - since
+        browser_steps = self.page.evaluate(BROWSER_STEPS_JS, count) if count > 0 else []
+        self.timings.append({
+            'step': name,
+            'ms': round(elapsed * 1000),
+            'browser': browser_steps,
+        })
+        print(f"  ⏱ {name}: rendered in {elapsed * 1000:.0f}ms"
+              + (f" ({_describe(browser_steps)})" if browser_steps else ""))
+
+    def summary(self):
+        """Print every step's render latency, slowest first."""
+        print("\n Render latency per step:")
+        for timing in sorted(self.timings, key=lambda t: -t['ms']):
+            print(f"  - {timing['step']}: {timing['ms']}ms")
+
+    def save(self, path):
+        """Write the recorded timings as JSON."""
+        with open(path, 'w') as f:
+            json.dump(self.timings, f, indent=2)
+
+
+def _describe(browser_steps):
+    """'grid (Status) 412ms, zoom 301ms' with repeated labels folded together."""
+    totals = {}
+    for browser_step in browser_steps:
+        count, longest = totals.get(browser_step['label'], (0, 0))
+        totals[browser_step['label']] = (count + 1, max(longest, browser_step['ms']))
+    return ", ".join(f"{label} {longest}ms" + (f" x{count}" if count > 1 else "")
+                     for label, (count, longest) in totals.items())
@@ -31,7 +31,7 @@ set CI=true
 echo Starting dev server on port 3333 and capturing screenshots...
 echo.
 
-python with_server.py --server "npm start" --port 3333 --timeout 90 -- python test_visual_qa.py
+python with_server.py --server "npm start" --port 3333 --health http://localhost:3333/static/js/bundle.js --timeout 90 -- python test_visual_qa.py
 
 echo.
 echo Screenshots captured! Ask Claude Code to analyze them:
@@ -32,8 +32,8 @@ set BROWSER=none
 set PORT=3333
 set CI=true
 
-REM Run tests with server management (90s timeout for React compilation)
-python with_server.py --server "npm start" --port 3333 --timeout 90 -- python test_hexmap_visual.py
+REM Run tests with server management (ready once the compiled bundle is served, 90s timeout)
+python with_server.py --server "npm start" --port 3333 --health http://localhost:3333/static/js/bundle.js --timeout 90 -- python test_hexmap_visual.py
 
 echo.
 echo Tests complete! Check test-screenshots/ for visual results
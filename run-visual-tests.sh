@@ -18,7 +18,8 @@ echo "🚀 Starting dev server and running visual tests..."
 echo ""
 
 # Run tests with server management
-python3 with_server.py --server "npm start" --port 3000 -- python3 test_hexmap_visual.py
+python3 with_server.py --server "npm start" --port 3000 \
+  --health http://localhost:3000/static/js/bundle.js -- python3 test_hexmap_visual.py
 
 echo ""
 echo "✅ Tests complete! Check test-screenshots/ for visual results"
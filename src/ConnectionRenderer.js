@@ -1,6 +1,7 @@
 import { useEffect } from 'react';
 import * as d3 from 'd3';
 import { generateConnectionPath, getConnectionStyles } from './connectionUtils';
+import { trackTransition } from './utils/renderStatus';
 
 const ConnectionRenderer = ({
                                 appConnections,
@@ -50,11 +51,11 @@ const ConnectionRenderer = ({
                     .attr("pointer-events", "none"); // Prevent mouse events on connections
 
                 // Animate the path
-                connectionPath.transition()
+                trackTransition(connectionPath.transition()
                     .duration(600)
                     .attr("opacity", 0.7)
                     .attr("stroke-dashoffset", 0)
-                    .ease(d3.easeQuadOut);
+                    .ease(d3.easeQuadOut), 'connections');
             } else {
                 // Use gradient for connections between different colored nodes
                 const gradientId = `connection-gradient-${index}`;
@@ -86,11 +87,11 @@ const ConnectionRenderer = ({
                     .attr("pointer-events", "none"); // Prevent mouse events on connections
 
                 // Animate the path
-                connectionPath.transition()
+                trackTransition(connectionPath.transition()
                     .duration(600)
                     .attr("opacity", 0.7)
                     .attr("stroke-dashoffset", 0)
-                    .ease(d3.easeQuadOut);
+                    .ease(d3.easeQuadOut), 'connections');
             }
 
             // Add animated projectile particle
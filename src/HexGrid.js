@@ -1,10 +1,13 @@
 import * as d3 from 'd3';
 
 class HexGrid {
-    constructor(hexSize, width, height) {
+    // geometry: optional precomputed section of the layout (see tools/hexmap_geometry.py).
+    // Its pixel centres and collisions are used when it was computed for this hexSize.
+    constructor(hexSize, width, height, geometry = null) {
         this.hexSize = hexSize;
         this.width = width;
         this.height = height;
+        this.precomputed = Boolean(geometry) && Math.abs(geometry.hexSize - hexSize) < 1e-6;
     }
 
     // Conversion from hex grid coordinates (odd-r horizontal) to pixel coordinates
@@ -78,8 +81,9 @@ class HexGrid {
 
             const gridPos = `${app.gridPosition.q},${app.gridPosition.r}`;
 
-            // Check for collision
-            if (occupiedPositions[gridPos]) {
+            // Check for collision; precomputed layouts already carry
+            // hasCollision and collidesWith, so skip the occupancy map
+            if (!this.precomputed && occupiedPositions[gridPos]) {
                 console.warn(`Collision detected: App "${app.name}" at position ${gridPos} collides with "${occupiedPositions[gridPos].name}" from cluster "${occupiedPositions[gridPos].clusterName}"`);
                 // Still add it to the visualization but mark it as conflicted
                 app.hasCollision = true;
@@ -88,7 +92,7 @@ class HexGrid {
                     clusterId: occupiedPositions[gridPos].clusterId,
                     clusterName: occupiedPositions[gridPos].clusterName
                 };
-            } else {
+            } else if (!this.precomputed) {
                 // Mark this position as occupied
                 occupiedPositions[gridPos] = {
                     name: app.name,
@@ -98,7 +102,9 @@ class HexGrid {
             }
 
             // Convert from grid coordinates to pixel coordinates
-            const pixelPos = this.gridToPixel(app.gridPosition.q, app.gridPosition.r);
+            const pixelPos = this.precomputed && app.pixel
+                ? { x: this.width / 2 + app.pixel.x, y: this.height / 2 + app.pixel.y }
+                : this.gridToPixel(app.gridPosition.q, app.gridPosition.r);
             coords.push({
                 x: pixelPos.x,
                 y: pixelPos.y,
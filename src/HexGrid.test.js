@@ -207,6 +207,35 @@ describe('HexGrid', () => {
         });
     });
 
+    describe('precomputed geometry', () => {
+        test('should use precomputed pixels and collisions when hexSize matches', () => {
+            const grid = new HexGrid(hexSize, width, height, { hexSize });
+            const occupiedPositions = {};
+            const apps = [
+                { name: 'App1', id: 'app1', gridPosition: { q: 5, r: 5 }, pixel: { x: 1, y: 2 } },
+                {
+                    name: 'App2', id: 'app2', gridPosition: { q: 5, r: 5 }, pixel: { x: 1, y: 2 },
+                    hasCollision: true, collidesWith: { name: 'App1', clusterId: 'c1', clusterName: 'C1' }
+                }
+            ];
+
+            const result = grid.generateHexCoords(2, 0, 0, apps, occupiedPositions);
+            expect(result[0].x).toBe(width / 2 + 1);
+            expect(result[0].y).toBe(height / 2 + 2);
+            expect(result[0].hasCollision).toBeUndefined();
+            expect(result[1].collidesWith.name).toBe('App1');
+            expect(occupiedPositions).toEqual({});
+        });
+
+        test('should ignore geometry computed for another hexSize', () => {
+            const grid = new HexGrid(hexSize, width, height, { hexSize: hexSize * 2 });
+            const apps = [{ name: 'App1', id: 'app1', gridPosition: { q: 2, r: 3 }, pixel: { x: 1, y: 2 } }];
+
+            const result = grid.generateHexCoords(1, 0, 0, apps);
+            expect(result[0].x).toBeCloseTo(grid.gridToPixel(2, 3).x, 5);
+        });
+    });
+
     describe('coordinate system consistency', () => {
         test('should maintain coordinate consistency across multiple conversions', () => {
             const testCoords = [
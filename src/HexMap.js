@@ -10,6 +10,8 @@ import ZoomHandler from './components/ZoomHandler';
 import ClusterManager from './components/ClusterManager';
 import ConnectionRenderer from './ConnectionRenderer';
 import TooltipManager from './utils/TooltipManager';
+import { LAYOUT_UPDATED_EVENT } from './utils/layoutDelta';
+import { beginRenderStep, trackTransition } from './utils/renderStatus';
 
 // UI Components
 import {
@@ -44,6 +46,9 @@ const HexMap = () => {
     // Status toggle state
     const [colorMode, setColorMode] = useState('Cluster');
 
+    // Bumped when the live layout server applies a delta to entityData
+    const [layoutVersion, setLayoutVersion] = useState(0);
+
     // Refs
     const timeoutIds = useRef([]);
     const svgRef = useRef(null);
@@ -114,98 +119,112 @@ const HexMap = () => {
         }
     }, [currentZoomLevel]);
 
+    useEffect(() => {
+        const onLayoutUpdated = (event) => setLayoutVersion(event.detail.version);
+        window.addEventListener(LAYOUT_UPDATED_EVENT, onLayoutUpdated);
+        return () => window.removeEventListener(LAYOUT_UPDATED_EVENT, onLayoutUpdated);
+    }, []);
+
     useEffect(() => {
         if (!svgRef.current || !tooltipManagerRef.current) return;
 
-        // Store current zoom transform if any
-        const svg = d3.select(svgRef.current);
-        const currentTransform = d3.zoomTransform(svg.node());
-        svg.selectAll("*").remove();
-
-        // Use the full browser window dimensions
-        const width = window.innerWidth;
-        const height = window.innerHeight;
-
-        // Main map group
-        const g = svg.append("g");
-
-        // Create background
-        g.append("rect")
-            .attr("width", width * 2)
-            .attr("height", height * 2)
-            .attr("x", -width / 2)
-            .attr("y", -height / 2)
-            .attr("fill", "transparent")
-            .style("cursor", "default")
-            .on("click", (event) => {
-                if (event.target.tagName === "rect") {
-                    setSelectedCluster(null);
-                    setHoveredCluster(null);
-                    svg.transition()
-                        .duration(1000)
-                        .ease(d3.easeCubicOut)
-                        .call(zoomRef.current.transform, d3.zoomIdentity.scale(1));
-                }
+        const renderDone = beginRenderStep(`grid (${colorMode})`);
+
+        // Always end the step, so a failed render surfaces its error instead of
+        // leaving RenderTimer waiting for the render to finish
+        try {
+            // Store current zoom transform if any
+            const svg = d3.select(svgRef.current);
+            const currentTransform = d3.zoomTransform(svg.node());
+            svg.selectAll("*").remove();
+
+            // Use the full browser window dimensions
+            const width = window.innerWidth;
+            const height = window.innerHeight;
+
+            // Main map group
+            const g = svg.append("g");
+
+            // Create background
+            g.append("rect")
+                .attr("width", width * 2)
+                .attr("height", height * 2)
+                .attr("x", -width / 2)
+                .attr("y", -height / 2)
+                .attr("fill", "transparent")
+                .style("cursor", "default")
+                .on("click", (event) => {
+                    if (event.target.tagName === "rect") {
+                        setSelectedCluster(null);
+                        setHoveredCluster(null);
+                        trackTransition(svg.transition()
+                            .duration(1000)
+                            .ease(d3.easeCubicOut)
+                            .call(zoomRef.current.transform, d3.zoomIdentity.scale(1)), 'zoom reset');
+                    }
+                });
+
+            // Create a dedicated top-level group for outlines
+            const topLevelOutlineGroup = g.append("g")
+                .attr("class", "top-level-outlines")
+                .attr("opacity", 0);
+            topLevelOutlineGroupRef.current = topLevelOutlineGroup;
+
+            // Initialize ZoomHandler
+            const zoomHandler = new ZoomHandler({
+                svg,
+                mainGroup: g,
+                setCurrentZoomLevel,
+                resetHexagonsAndConnections,
+                topLevelOutlineGroup,
+                setHoveredCluster,
+                setContextMenu // Pass setContextMenu here
+            });
+            zoomRef.current = zoomHandler.getZoom();
+
+            // Initialize HexGridRenderer with tooltip manager
+            const gridRenderer = new HexGridRenderer({
+                svg,
+                mainGroup: g,
+                entityData,
+                setCollisionsDetected,
+                setHoveredApp,
+                setAppConnections,
+                zoomRef,
+                connectionsGroupRef,
+                appCoordinatesRef,
+                topLevelOutlineGroup,
+                timeoutIds,
+                currentZoomLevel,
+                setSelectedCluster,
+                tooltipManager: tooltipManagerRef.current,
+                setHoveredCluster,
+                setContextMenu,
+                colorMode,
+                setSelectedApp
             });
 
-        // Create a dedicated top-level group for outlines
-        const topLevelOutlineGroup = g.append("g")
-            .attr("class", "top-level-outlines")
-            .attr("opacity", 0);
-        topLevelOutlineGroupRef.current = topLevelOutlineGroup;
-
-        // Initialize ZoomHandler
-        const zoomHandler = new ZoomHandler({
-            svg,
-            mainGroup: g,
-            setCurrentZoomLevel,
-            resetHexagonsAndConnections,
-            topLevelOutlineGroup,
-            setHoveredCluster,
-            setContextMenu // Pass setContextMenu here
-        });
-        zoomRef.current = zoomHandler.getZoom();
-
-        // Initialize HexGridRenderer with tooltip manager
-        const gridRenderer = new HexGridRenderer({
-            svg,
-            mainGroup: g,
-            entityData,
-            setCollisionsDetected,
-            setHoveredApp,
-            setAppConnections,
-            zoomRef,
-            connectionsGroupRef,
-            appCoordinatesRef,
-            topLevelOutlineGroup,
-            timeoutIds,
-            currentZoomLevel,
-            setSelectedCluster,
-            tooltipManager: tooltipManagerRef.current,
-            setHoveredCluster,
-            setContextMenu,
-            colorMode,
-            setSelectedApp
-        });
-
-        // Initialize ClusterManager
-        const clusterManager = new ClusterManager({
-            entityData,
-            svg,
-            zoomRef,
-            setSelectedCluster
-        });
-
-        // Initialize connections group
-        const connectionsGroup = g.append("g")
-            .attr("class", "connections-group");
-        connectionsGroupRef.current = connectionsGroup;
-
-        // Restore previous zoom transform if it exists
-        if (currentTransform.k !== 1 || currentTransform.x !== 0 || currentTransform.y !== 0) {
-            svg.transition()
-                .duration(0) // Immediate transition
-                .call(zoomRef.current.transform, currentTransform);
+            // Initialize ClusterManager
+            const clusterManager = new ClusterManager({
+                entityData,
+                svg,
+                zoomRef,
+                setSelectedCluster
+            });
+
+            // Initialize connections group
+            const connectionsGroup = g.append("g")
+                .attr("class", "connections-group");
+            connectionsGroupRef.current = connectionsGroup;
+
+            // Restore previous zoom transform if it exists
+            if (currentTransform.k !== 1 || currentTransform.x !== 0 || currentTransform.y !== 0) {
+                trackTransition(svg.transition()
+                    .duration(0) // Immediate transition
+                    .call(zoomRef.current.transform, currentTransform), 'zoom restore');
+            }
+        } finally {
+            renderDone();
         }
 
         return () => {
@@ -213,7 +232,7 @@ const HexMap = () => {
             timeoutIds.current.forEach(id => clearTimeout(id));
             timeoutIds.current.length = 0;
         };
-    }, [colorMode]); // Re-render grid when colorMode changes
+    }, [colorMode, layoutVersion]); // Re-render grid when colorMode or the live layout changes
 
     // No custom handlers needed for the info icon anymore, rely on title attribute
 
@@ -1,5 +1,6 @@
 import * as d3 from 'd3';
 import { getClusterColor } from '../utils/colorUtils';
+import { trackTransition } from '../utils/renderStatus';
 
 class ClusterManager {
     constructor({
@@ -27,19 +28,20 @@ class ClusterManager {
             const y = bounds.y + bounds.height / 2;
             const scale = 2.2;
             const translate = [this.width / 2 - scale * x, this.height / 2 - scale * y];
-            this.svg.transition()
+            trackTransition(this.svg.transition()
                 .duration(1000)
                 .ease(d3.easeCubicInOut)
-                .call(this.zoomRef.current.transform, d3.zoomIdentity.translate(translate[0], translate[1]).scale(scale));
+                .call(this.zoomRef.current.transform, d3.zoomIdentity.translate(translate[0], translate[1]).scale(scale)),
+                'zoom to cluster');
         }
     }
 
     clearSelection() {
         this.setSelectedCluster(null);
-        this.svg.transition()
+        trackTransition(this.svg.transition()
             .duration(1000)
             .ease(d3.easeCubicOut)
-            .call(this.zoomRef.current.transform, d3.zoomIdentity.scale(1));
+            .call(this.zoomRef.current.transform, d3.zoomIdentity.scale(1)), 'zoom reset');
     }
 
     getClusterApps(clusterId) {
@@ -2,6 +2,7 @@ import * as d3 from 'd3';
 import HexGrid from '../HexGrid';
 import { getLighterColor } from '../connectionUtils';
 import { getClusterColor, getHexagonFillColor } from '../utils/colorUtils';
+import { trackTransition } from '../utils/renderStatus';
 
 class HexGridRenderer {
     constructor({
@@ -257,7 +258,7 @@ class HexGridRenderer {
 
         // Calculate hexSize so that hexagon width is exactly 22px (width = size * sqrt(3))
         const hexSize = 22 / Math.sqrt(3);
-        const hexGrid = new HexGrid(hexSize, this.width, this.height);
+        const hexGrid = new HexGrid(hexSize, this.width, this.height, this.entityData.geometry);
 
         // Initialize an object to track occupied positions
         const occupiedPositions = {};
@@ -758,14 +759,14 @@ class HexGridRenderer {
                             setTimeout(() => {
                                 // Check if mouse is still outside this cluster
                                 if (!document.querySelector(`#cluster-${clusterId}:hover`)) {
-                                    this.topLevelOutlineGroup.selectAll(`[data-cluster-id="${clusterId}"]`)
+                                    trackTransition(this.topLevelOutlineGroup.selectAll(`[data-cluster-id="${clusterId}"]`)
                                         .transition()
                                         .duration(100)
                                         .attr("opacity", 0)
                                         .on("end", function() {
                                             // Remove only this cluster's outlines
                                             d3.select(this).remove();
-                                        });
+                                        }), 'outline fade');
 
                                     // Clear the hovered cluster state
                                     this.setHoveredCluster(null);
@@ -800,10 +801,11 @@ class HexGridRenderer {
 
             console.log("Zooming to:", {x, y, scale, translate});
 
-            this.svg.transition()
+            trackTransition(this.svg.transition()
                 .duration(1000)
                 .ease(d3.easeCubicInOut)
-                .call(this.zoomRef.current.transform, d3.zoomIdentity.translate(translate[0], translate[1]).scale(scale));
+                .call(this.zoomRef.current.transform, d3.zoomIdentity.translate(translate[0], translate[1]).scale(scale)),
+                'zoom to cluster');
         } else {
             console.error(`Could not find element for cluster ${cluster.id}`);
         }
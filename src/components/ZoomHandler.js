@@ -1,4 +1,5 @@
 import * as d3 from 'd3';
+import { trackTransition } from '../utils/renderStatus';
 
 class ZoomHandler {
     constructor({
@@ -119,7 +120,7 @@ class ZoomHandler {
         }
 
         // Transition to new zoom level
-        this.svg.transition()
+        trackTransition(this.svg.transition()
             .duration(300)
             .ease(d3.easeCubicInOut)
             .call(this.zoom.transform, d3.zoomIdentity.translate(newX, newY).scale(newScale))
@@ -129,7 +130,7 @@ class ZoomHandler {
                     this.topLevelOutlineGroup.selectAll("*").remove();
                     this.topLevelOutlineGroup.attr("opacity", 0);
                 }
-            });
+            }), 'zoom');
 
         // Update the zoom level state when changed via wheel
         this.setCurrentZoomLevel(newScale);
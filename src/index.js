@@ -2,10 +2,20 @@ import React from 'react';
 import ReactDOM from 'react-dom/client';
 import './index.css';
 import App from './App';
+import entityData from './data.json';
+import { loadLiveLayout, watchLiveLayout } from './utils/layoutServer';
 
-const root = ReactDOM.createRoot(document.getElementById('root'));
-root.render(
-    <React.StrictMode>
-        <App />
-    </React.StrictMode>
-);
\ No newline at end of file
+const render = () => {
+    const root = ReactDOM.createRoot(document.getElementById('root'));
+    root.render(
+        <React.StrictMode>
+            <App />
+        </React.StrictMode>
+    );
+};
+
+// With REACT_APP_LAYOUT_SERVER set, render the live layout and follow updates
+loadLiveLayout(entityData).then(() => {
+    render();
+    watchLiveLayout(entityData);
+});
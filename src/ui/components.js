@@ -2,6 +2,7 @@ import React from 'react';
 import * as d3 from 'd3';
 import { getTypeColor } from '../connectionUtils';
 import { getClusterColor } from '../utils/colorUtils';
+import { trackTransition } from '../utils/renderStatus';
 import ClusterInfoPanel from './components/ClusterInfoPanel';
 import ContextMenu from './components/ContextMenu';
 
@@ -58,11 +59,11 @@ export const DetailPanel = ({ selectedCluster, svgRef, zoomRef }) => {
                 <button
                     className="text-gray-500 hover:text-gray-700"
                     onClick={() => {
-                        d3.select(svgRef.current)
+                        trackTransition(d3.select(svgRef.current)
                             .transition()
                             .duration(1000)
                             .ease(d3.easeCubicOut)
-                            .call(zoomRef.current.transform, d3.zoomIdentity.scale(1));
+                            .call(zoomRef.current.transform, d3.zoomIdentity.scale(1)), 'zoom reset');
                     }}
                 >
                     ✕
@@ -413,11 +414,12 @@ export const ClusterLegend = ({ entityData, selectedCluster, setSelectedCluster,
                                 const y = bounds.y + bounds.height / 2;
                                 const scale = 2.2;
                                 const translate = [window.innerWidth / 2 - scale * x, window.innerHeight / 2 - scale * y];
-                                d3.select(svgRef.current)
+                                trackTransition(d3.select(svgRef.current)
                                     .transition()
                                     .duration(1000)
                                     .ease(d3.easeCubicInOut)
-                                    .call(zoomRef.current.transform, d3.zoomIdentity.translate(translate[0], translate[1]).scale(scale));
+                                    .call(zoomRef.current.transform, d3.zoomIdentity.translate(translate[0], translate[1]).scale(scale)),
+                                    'zoom to cluster');
                             }
                         }}
                     >
@@ -0,0 +1,79 @@
+// Apply a layout delta (tools/layout_diff.py, tools/hexmap_status.py) to
+// entityData in place, so the map can redraw without reloading data.json.
+
+// Dispatched on window after a delta has been applied; detail: { version }
+export const LAYOUT_UPDATED_EVENT = 'hexmap:layout-updated';
+
+// Merge patch semantics: null removes a field, anything else replaces it
+const applyPatch = (target, patch = {}) => {
+    Object.entries(patch).forEach(([key, value]) => {
+        if (value === null) {
+            delete target[key];
+        } else {
+            target[key] = value;
+        }
+    });
+};
+
+const indexLayout = (entityData) => {
+    const clusters = new Map();
+    const apps = new Map();
+    entityData.clusters.forEach(cluster => {
+        clusters.set(cluster.id, cluster);
+        (cluster.applications || []).forEach(app => apps.set(app.id, app));
+    });
+    return { clusters, apps };
+};
+
+export const applyLayoutDelta = (entityData, delta) => {
+    const { clusters: clusterDelta = {}, apps: appDelta = {}, connections = {}, root = {} } = delta;
+
+    applyPatch(entityData, root);
+    if (!entityData.clusters) entityData.clusters = [];
+    const { clusters, apps } = indexLayout(entityData);
+
+    (clusterDelta.added || []).forEach(added => {
+        const cluster = { ...added, applications: [] };
+        entityData.clusters.push(cluster);
+        clusters.set(cluster.id, cluster);
+    });
+    Object.entries(clusterDelta.changed || {}).forEach(([id, patch]) => {
+        applyPatch(clusters.get(id), patch);
+    });
+
+    // Take removed apps and apps changing continent out of their clusters
+    const moved = appDelta.moved || {};
+    const leaving = new Set(appDelta.removed || []);
+    Object.entries(moved).forEach(([id, move]) => {
+        if (move.cluster !== undefined) leaving.add(id);
+    });
+    if (leaving.size > 0) {
+        entityData.clusters.forEach(cluster => {
+            cluster.applications = (cluster.applications || []).filter(app => !leaving.has(app.id));
+        });
+    }
+
+    Object.entries(moved).forEach(([id, move]) => {
+        const app = apps.get(id);
+        if (!app) return;
+        if (move.gridPosition !== undefined) app.gridPosition = move.gridPosition;
+        if (move.cluster !== undefined) clusters.get(move.cluster).applications.push(app);
+    });
+    Object.entries(appDelta.changed || {}).forEach(([id, patch]) => {
+        const app = apps.get(id);
+        if (app) applyPatch(app, patch);
+    });
+    Object.entries(connections).forEach(([id, appConnections]) => {
+        const app = apps.get(id);
+        if (app) app.connections = appConnections;
+    });
+    (appDelta.added || []).forEach(({ cluster, ...app }) => {
+        clusters.get(cluster).applications.push(app);
+    });
+
+    const removedClusters = new Set(clusterDelta.removed || []);
+    if (removedClusters.size > 0) {
+        entityData.clusters = entityData.clusters.filter(cluster => !removedClusters.has(cluster.id));
+    }
+    return entityData;
+};
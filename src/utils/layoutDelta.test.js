@@ -0,0 +1,92 @@
+import { applyLayoutDelta } from './layoutDelta';
+
+const makeLayout = () => ({
+    pillboxTooltip: 'info',
+    clusters: [
+        {
+            id: 'continent_0',
+            name: 'Trading',
+            applications: [
+                { id: 'A', name: 'A', status: 90, gridPosition: { q: 0, r: 0 }, connections: [], description: 'first' },
+                { id: 'B', name: 'B', status: 80, gridPosition: { q: 1, r: 0 }, connections: [] }
+            ]
+        },
+        {
+            id: 'continent_1',
+            name: 'Risk',
+            applications: [
+                { id: 'C', name: 'C', status: 70, gridPosition: { q: 5, r: 5 }, connections: [] }
+            ]
+        }
+    ]
+});
+
+const appById = (entityData, id) => {
+    for (const cluster of entityData.clusters) {
+        const app = cluster.applications.find(a => a.id === id);
+        if (app) return { cluster: cluster.id, app };
+    }
+    return null;
+};
+
+describe('layoutDelta', () => {
+    describe('applyLayoutDelta', () => {
+        test('should patch status values from a status-only delta', () => {
+            const entityData = makeLayout();
+            applyLayoutDelta(entityData, { format: 'hexmap-delta', version: 3, apps: { changed: { A: { status: 12 } } } });
+
+            expect(appById(entityData, 'A').app.status).toBe(12);
+            expect(appById(entityData, 'B').app.status).toBe(80);
+        });
+
+        test('should remove fields patched to null', () => {
+            const entityData = makeLayout();
+            applyLayoutDelta(entityData, { apps: { changed: { A: { description: null } } } });
+
+            expect(appById(entityData, 'A').app).not.toHaveProperty('description');
+        });
+
+        test('should add, remove and move apps between clusters', () => {
+            const entityData = makeLayout();
+            applyLayoutDelta(entityData, {
+                apps: {
+                    added: [{ id: 'D', name: 'D', status: 50, gridPosition: { q: 2, r: 2 }, connections: [], cluster: 'continent_1' }],
+                    removed: ['B'],
+                    moved: {
+                        A: { gridPosition: { q: 3, r: 3 } },
+                        C: { gridPosition: { q: 0, r: 1 }, cluster: 'continent_0' }
+                    }
+                },
+                connections: { A: [{ to: 'C', type: 'link', strength: 'medium' }] }
+            });
+
+            expect(appById(entityData, 'B')).toBeNull();
+            expect(appById(entityData, 'A').app.gridPosition).toEqual({ q: 3, r: 3 });
+            expect(appById(entityData, 'A').app.connections).toHaveLength(1);
+            expect(appById(entityData, 'C')).toEqual({
+                cluster: 'continent_0',
+                app: expect.objectContaining({ gridPosition: { q: 0, r: 1 } })
+            });
+            expect(appById(entityData, 'D').cluster).toBe('continent_1');
+            expect(appById(entityData, 'D').app).not.toHaveProperty('cluster');
+        });
+
+        test('should add, change and remove clusters and top-level fields', () => {
+            const entityData = makeLayout();
+            applyLayoutDelta(entityData, {
+                clusters: {
+                    added: [{ id: 'continent_2', name: 'Ops' }],
+                    removed: ['continent_1'],
+                    changed: { continent_0: { name: 'Markets' } }
+                },
+                apps: { moved: { C: { gridPosition: { q: 9, r: 9 }, cluster: 'continent_2' } } },
+                root: { pillboxTooltip: 'updated' }
+            });
+
+            expect(entityData.clusters.map(c => c.id)).toEqual(['continent_0', 'continent_2']);
+            expect(entityData.clusters[0].name).toBe('Markets');
+            expect(appById(entityData, 'C').cluster).toBe('continent_2');
+            expect(entityData.pillboxTooltip).toBe('updated');
+        });
+    });
+});
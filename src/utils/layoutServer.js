@@ -0,0 +1,73 @@
+// Optional live connection to tools/layout_server.py.
+// Enabled by setting REACT_APP_LAYOUT_SERVER (e.g. http://localhost:8765)
+// before `npm start`; without it the bundled data.json is used as before.
+
+import { applyLayoutDelta, LAYOUT_UPDATED_EVENT } from './layoutDelta';
+
+const PENDING_VERSION_KEY = 'hexmapPendingLayoutVersion';
+
+export const getLayoutServerUrl = () => process.env.REACT_APP_LAYOUT_SERVER || null;
+
+// Replace the bundled layout with the server's current one (in place, so
+// every module holding entityData sees the new clusters)
+export const loadLiveLayout = async (entityData, serverUrl = getLayoutServerUrl()) => {
+    if (!serverUrl) return false;
+
+    try {
+        const response = await fetch(`${serverUrl}/data.json`, { cache: 'no-store' });
+        const data = await response.json();
+        Object.assign(entityData, data);
+        return true;
+    } catch (error) {
+        console.warn(`Could not load live layout from ${serverUrl}, using bundled data`, error);
+        return false;
+    }
+};
+
+// Tell the server a version is on screen so it can report edit-to-view latency
+const acknowledgeVersion = (serverUrl, version) => {
+    fetch(`${serverUrl}/ack`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ version: Number(version) })
+    }).catch(() => {});
+};
+
+// Tell the server once the first frame with this version has painted
+const acknowledgeAfterPaint = (serverUrl, version) => {
+    requestAnimationFrame(() => setTimeout(() => acknowledgeVersion(serverUrl, version), 0));
+};
+
+// Follow the server's layout versions: apply the event's delta to entityData
+// when it builds on the version on screen, otherwise reload the page
+export const watchLiveLayout = (entityData = null, serverUrl = getLayoutServerUrl()) => {
+    if (!serverUrl || typeof EventSource === 'undefined') return null;
+
+    const pendingVersion = sessionStorage.getItem(PENDING_VERSION_KEY);
+    if (pendingVersion) {
+        sessionStorage.removeItem(PENDING_VERSION_KEY);
+        acknowledgeAfterPaint(serverUrl, pendingVersion);
+    }
+
+    let loadedVersion = null;
+    const events = new EventSource(`${serverUrl}/events`);
+    events.addEventListener('layout', (event) => {
+        const { version, mode, delta } = JSON.parse(event.data);
+        if (mode === 'current' || loadedVersion === null) {
+            loadedVersion = version;
+            return;
+        }
+        if (entityData && delta && delta.baseVersion === loadedVersion) {
+            applyLayoutDelta(entityData, delta);
+            loadedVersion = version;
+            window.dispatchEvent(new CustomEvent(LAYOUT_UPDATED_EVENT, { detail: { version } }));
+            acknowledgeAfterPaint(serverUrl, version);
+            return;
+        }
+        if (version > loadedVersion) {
+            sessionStorage.setItem(PENDING_VERSION_KEY, version);
+            window.location.reload();
+        }
+    });
+    return events;
+};
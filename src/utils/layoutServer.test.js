@@ -0,0 +1,44 @@
+import { loadLiveLayout, watchLiveLayout } from './layoutServer';
+
+describe('layoutServer', () => {
+    afterEach(() => {
+        delete global.fetch;
+    });
+
+    describe('loadLiveLayout', () => {
+        test('should do nothing without a server URL', async () => {
+            global.fetch = jest.fn();
+            const entityData = { clusters: [] };
+
+            expect(await loadLiveLayout(entityData, null)).toBe(false);
+            expect(global.fetch).not.toHaveBeenCalled();
+        });
+
+        test('should replace clusters in place with the served layout', async () => {
+            const served = { clusters: [{ id: 'continent_0', applications: [] }] };
+            global.fetch = jest.fn().mockResolvedValue({ json: () => Promise.resolve(served) });
+            const entityData = { clusters: [], pillboxTooltip: 'info' };
+
+            expect(await loadLiveLayout(entityData, 'http://localhost:8765')).toBe(true);
+            expect(global.fetch).toHaveBeenCalledWith('http://localhost:8765/data.json', { cache: 'no-store' });
+            expect(entityData.clusters).toBe(served.clusters);
+            expect(entityData.pillboxTooltip).toBe('info');
+        });
+
+        test('should keep bundled data when the server is unreachable', async () => {
+            global.fetch = jest.fn().mockRejectedValue(new Error('offline'));
+            jest.spyOn(console, 'warn').mockImplementation(() => {});
+            const entityData = { clusters: ['bundled'] };
+
+            expect(await loadLiveLayout(entityData, 'http://localhost:8765')).toBe(false);
+            expect(entityData.clusters).toEqual(['bundled']);
+            console.warn.mockRestore();
+        });
+    });
+
+    describe('watchLiveLayout', () => {
+        test('should not connect without a server URL', () => {
+            expect(watchLiveLayout({ clusters: [] }, null)).toBeNull();
+        });
+    });
+});
@@ -0,0 +1,72 @@
+// Render-complete signal for the visual tests and benchmarks.
+//
+// Every render step (drawing the grid, a zoom transition, fading in
+// connections) is tracked while it runs. Once none are left and the next
+// frame has been painted, the map is idle:
+//
+//   <html data-hexmap-render="idle">           ("busy" while steps run)
+//   window.hexmapRender = { idle, started, settled, pending, steps }
+//
+// started counts steps ever begun; settled is the value of started when the
+// map last became idle, so a test that reads started before an action can
+// wait for settled to pass it. steps holds the latest step timings as
+// { label, ms }. The endless projectile animation along connections is not
+// a render step.
+
+const MAX_STEPS = 200;
+
+const status = {
+    idle: false,
+    started: 0,
+    settled: 0,
+    pending: 0,
+    steps: []
+};
+
+const nextFrame = (callback) => (window.requestAnimationFrame || setTimeout)(callback);
+
+const publish = () => {
+    document.documentElement.dataset.hexmapRender = status.idle ? 'idle' : 'busy';
+};
+
+// Start a render step; call the returned function (once) when it is done
+export const beginRenderStep = (label) => {
+    const startedAt = performance.now();
+    status.pending += 1;
+    status.started += 1;
+    status.idle = false;
+    publish();
+
+    let finished = false;
+    return () => {
+        if (finished) return;
+        finished = true;
+
+        status.steps.push({ label, ms: Math.round(performance.now() - startedAt) });
+        if (status.steps.length > MAX_STEPS) status.steps.shift();
+
+        status.pending -= 1;
+        if (status.pending > 0) return;
+
+        // Idle only after a frame with nothing new started, so it has been painted
+        const started = status.started;
+        nextFrame(() => {
+            if (status.pending === 0 && status.started === started) {
+                status.settled = started;
+                status.idle = true;
+                publish();
+            }
+        });
+    };
+};
+
+// Track a d3 transition as a render step until it ends or is interrupted
+export const trackTransition = (transition, label) => {
+    const done = beginRenderStep(label);
+    transition.end().then(done, done);
+    return transition;
+};
+
+export const renderStatus = status;
+
+window.hexmapRender = status;
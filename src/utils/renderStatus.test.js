@@ -0,0 +1,63 @@
+import { beginRenderStep, trackTransition, renderStatus } from './renderStatus';
+
+const renderAttribute = () => document.documentElement.dataset.hexmapRender;
+
+describe('renderStatus', () => {
+    beforeEach(() => {
+        jest.useFakeTimers();
+        window.requestAnimationFrame = (callback) => setTimeout(callback, 16);
+    });
+
+    afterEach(() => {
+        jest.useRealTimers();
+    });
+
+    test('should be busy while a step runs and idle a frame after it ends', () => {
+        const before = renderStatus.started;
+        const done = beginRenderStep('grid');
+
+        expect(renderAttribute()).toBe('busy');
+        expect(renderStatus.started).toBe(before + 1);
+
+        done();
+        expect(renderStatus.idle).toBe(false);
+        jest.advanceTimersByTime(16);
+
+        expect(renderAttribute()).toBe('idle');
+        expect(renderStatus.settled).toBe(before + 1);
+        expect(renderStatus.steps[renderStatus.steps.length - 1].label).toBe('grid');
+    });
+
+    test('should wait for overlapping steps and steps started before the frame', () => {
+        const first = beginRenderStep('zoom');
+        const second = beginRenderStep('connections');
+        first();
+        jest.advanceTimersByTime(16);
+        expect(renderStatus.idle).toBe(false);
+
+        second();
+        const third = beginRenderStep('zoom');
+        jest.advanceTimersByTime(16);
+        expect(renderStatus.idle).toBe(false);
+
+        third();
+        third();
+        jest.advanceTimersByTime(16);
+        expect(renderStatus.idle).toBe(true);
+        expect(renderStatus.pending).toBe(0);
+        expect(renderStatus.settled).toBe(renderStatus.started);
+    });
+
+    test('should end a tracked transition when it ends or is interrupted', async () => {
+        const ended = { end: () => Promise.resolve() };
+        const interrupted = { end: () => Promise.reject(new Error('interrupted')) };
+
+        expect(trackTransition(ended, 'zoom')).toBe(ended);
+        trackTransition(interrupted, 'zoom');
+        expect(renderStatus.pending).toBe(2);
+
+        await Promise.resolve();
+        await Promise.resolve();
+        expect(renderStatus.pending).toBe(0);
+    });
+});
@@ -2,297 +2,423 @@
 Visual and interaction tests for HexMap application.
 Tests zoom, hover, clicks, color modes, and captures screenshots for visual verification.
 
+The suite is split into independent scenarios. Each one opens a fresh page
+in its own browser and writes its screenshots to test-screenshots/<scenario>/.
+Scenarios run in parallel worker processes, one Chromium each. Their results
+are merged into one report: printed at the end and saved as
+test-screenshots/report.json.
+
+A scenario that passed is cached (capture_cache.py). While src/data.json, the
+app sources and the scenario's own code are unchanged, later runs reuse its
+screenshots and results instead of capturing it again.
+
 Run with: python with_server.py --server "npm start" --port 3000 --timeout 60 -- python test_hexmap_visual.py
+     or:  python test_hexmap_visual.py --workers 1                 # one scenario at a time
+     or:  python test_hexmap_visual.py --scenario zoom-pan --scenario responsive-mobile
+     or:  python test_hexmap_visual.py --no-cache                  # capture every scenario again
 """
 
 from playwright.sync_api import sync_playwright, expect
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import argparse
+import json
 import time
 import os
+import sys
 
+import capture_cache
+import label_overlaps
+import render_status
+from label_overlaps import COLLECT_GEOMETRY_JS, find_cross_overlaps, find_overlaps
+from render_status import RenderTimer
 
-def boxes_overlap(box1, box2, padding=2):
-    """Check if two bounding boxes overlap (with optional padding)."""
-    if box1 is None or box2 is None:
-        return False
-    return not (
-        box1['x'] + box1['width'] + padding < box2['x'] or
-        box2['x'] + box2['width'] + padding < box1['x'] or
-        box1['y'] + box1['height'] + padding < box2['y'] or
-        box2['y'] + box2['height'] + padding < box1['y']
-    )
 
+def collect_geometry(page):
+    """All cluster label and hexagon boxes, in one round trip to the browser."""
+    return page.evaluate(COLLECT_GEOMETRY_JS)
 
-def check_label_overlaps(page):
+
+def check_label_overlaps(geometry):
     """
     Check if any cluster labels overlap each other.
     Returns a list of overlapping label pairs.
     """
-    labels = page.locator('.cluster-label')
-    count = labels.count()
+    labels = geometry['labels']
+    return [{
+        'label1': labels[i]['text'],
+        'label2': labels[j]['text'],
+        'box1': labels[i],
+        'box2': labels[j]
+    } for i, j in find_overlaps(labels)]
 
-    if count == 0:
-        return []
 
-    # Collect all label bounding boxes
-    label_boxes = []
-    for i in range(count):
-        label = labels.nth(i)
-        try:
-            box = label.bounding_box()
-            text = label.text_content()
-            if box:
-                label_boxes.append({'box': box, 'text': text, 'index': i})
-        except Exception:
-            pass
-
-    # Check for overlaps
-    overlaps = []
-    for i, label1 in enumerate(label_boxes):
-        for j, label2 in enumerate(label_boxes):
-            if i < j:  # Only check each pair once
-                if boxes_overlap(label1['box'], label2['box']):
-                    overlaps.append({
-                        'label1': label1['text'],
-                        'label2': label2['text'],
-                        'box1': label1['box'],
-                        'box2': label2['box']
-                    })
-
-    return overlaps
+def check_label_hex_overlaps(geometry):
+    """
+    Check if any cluster labels cover hexagons (by bounding box).
+    Returns a list of overlapping label/hexagon pairs.
+    """
+    labels = geometry['labels']
+    hexes = geometry['hexes']
+    return [{
+        'label': labels[i]['text'],
+        'hexagon': hexes[j]['id'],
+        'box1': labels[i],
+        'box2': hexes[j]
+    } for i, j in find_cross_overlaps(labels, hexes)]
 
 # Create screenshots directory (use relative path for cross-platform compatibility)
 SCREENSHOTS_DIR = './test-screenshots'
 os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
 
-def test_hexmap():
-    with sync_playwright() as p:
-        print("🚀 Starting HexMap visual tests...")
+DESKTOP = {'width': 1920, 'height': 1080}
+
+
+class Scenario:
+    """What a scenario function gets: its page, render timer, screenshot helper and stats."""
+
+    def __init__(self, name, page, render, out_dir):
+        self.name = name
+        self.page = page
+        self.render = render
+        self.out_dir = out_dir
+        self.screenshots = []
+        self.stats = {}
+
+    def load(self):
+        port = os.environ.get('PORT', '3333')
+        with self.render.step('initial load', navigation=True):
+            self.page.goto(f'http://localhost:{port}')
+        expect(self.page.locator('svg').first).to_be_visible()
+
+    def screenshot(self, filename):
+        path = os.path.join(self.out_dir, filename)
+        self.page.screenshot(path=path, full_page=True)
+        self.screenshots.append(path)
+
+    def log(self, message):
+        print(f"  [{self.name}] {message}", flush=True)
+
+
+def scenario_load(s):
+    """Initial load, cluster mode, label overlaps and UI elements."""
+    s.load()
+    s.screenshot('01-initial-load.png')
+    s.log("✓ Initial load complete, SVG rendered")
+
+    # Verify hexagons are rendered
+    count = s.page.locator('path.hexagon').count()
+    s.stats['hexagons'] = count
+    s.log(f"✓ Found {count} hexagons rendered")
+    assert count > 0, "No hexagons found!"
+    s.screenshot('02-cluster-mode.png')
+
+    # Label overlap check
+    check_start = time.perf_counter()
+    geometry = collect_geometry(s.page)
+    collected = time.perf_counter()
+    label_overlaps = check_label_overlaps(geometry)
+    hex_overlaps = check_label_hex_overlaps(geometry)
+    checked = time.perf_counter()
+    s.log(f"ℹ {len(geometry['labels'])} labels, {len(geometry['hexes'])} hexagons: "
+          f"collected in {(collected - check_start) * 1000:.0f}ms, "
+          f"checked in {(checked - collected) * 1000:.0f}ms")
+    s.stats['label_overlaps'] = len(label_overlaps)
+    s.stats['labels_covering_hexagons'] = len({overlap['label'] for overlap in hex_overlaps})
+    if hex_overlaps:
+        labels_over_hexes = sorted({overlap['label'] for overlap in hex_overlaps})
+        s.log(f"⚠ {len(labels_over_hexes)} label(s) cover hexagons "
+              f"({len(hex_overlaps)} label/hexagon pairs): "
+              + ", ".join(f"'{label}'" for label in labels_over_hexes[:5]))
+    if label_overlaps:
+        for overlap in label_overlaps:
+            s.log(f"✗ '{overlap['label1']}' overlaps with '{overlap['label2']}'")
+        # Take screenshot of overlap issue
+        s.screenshot('02b-label-overlap-FAIL.png')
+        raise AssertionError(f"Found {len(label_overlaps)} label overlap(s) - see test output for details")
+    s.log("✓ No label overlaps detected")
+
+    # Look for collision notification (if any)
+    if s.page.locator('text=Collision').first.is_visible():
+        s.log("ℹ Collision notification visible")
+        s.screenshot('12-collision-notification.png')
+
+    # Check for legends
+    cluster_legend = s.page.locator('text=Clusters').or_(s.page.locator('text=Legend'))
+    if cluster_legend.count() > 0:
+        s.log("✓ Legend elements found")
+
+    s.screenshot('13-final-state.png')
+
+
+def scenario_color_modes(s):
+    """Status mode toggle and back."""
+    s.load()
+    # Look for the toggle button (assuming it has text "Status" or similar)
+    toggle_button = s.page.get_by_text('Status', exact=False).first
+    if not toggle_button.is_visible():
+        s.log("⚠ Toggle button not found, skipping toggle test")
+        return
+    with s.render.step('status mode'):
+        toggle_button.click()
+    s.screenshot('03-status-mode.png')
+    s.log("✓ Status mode activated")
+
+    # Toggle back to Cluster mode
+    cluster_button = s.page.get_by_text('Cluster', exact=False).first
+    if cluster_button.is_visible():
+        with s.render.step('cluster mode', expect_render=False):
+            cluster_button.click()
+        s.log("✓ Toggled back to Cluster mode")
+
+
+def scenario_hover_click(s):
+    """Hexagon hover and cluster click."""
+    s.load()
+    with s.render.step('hexagon hover', expect_render=False):
+        s.page.locator('path.hexagon').first.hover()
+    s.screenshot('04-hexagon-hover.png')
+    s.log("✓ Hexagon hover triggered")
+
+    # Find a cluster group (they should have IDs like 'cluster-...')
+    cluster_groups = s.page.locator('[id^="cluster-"]')
+    if cluster_groups.count() == 0:
+        s.log("⚠ No cluster groups found")
+        return
+    # Click on first cluster's hexagon
+    with s.render.step('cluster click', expect_render=False):
+        cluster_groups.first.locator('path.hexagon').first.click()
+    s.screenshot('05-cluster-click.png')
+    s.log("✓ Cluster clicked")
+
+
+def scenario_zoom_pan(s):
+    """Wheel zoom in and out, then drag to pan."""
+    s.load()
+    box = s.page.locator('svg').first.bounding_box()
+    assert box, "SVG has no bounding box"
+    center_x = box['x'] + box['width'] / 2
+    center_y = box['y'] + box['height'] / 2
+
+    s.page.mouse.move(center_x, center_y)
+    with s.render.step('zoom in'):
+        s.page.mouse.wheel(0, -500)  # Scroll up to zoom in
+    s.screenshot('06-zoomed-in.png')
+    s.log("✓ Zoomed in")
+
+    with s.render.step('zoom out'):
+        s.page.mouse.wheel(0, 500)  # Scroll down to zoom out
+    s.screenshot('07-zoomed-out.png')
+    s.log("✓ Zoomed out")
+
+    with s.render.step('pan', expect_render=False):
+        s.page.mouse.move(center_x, center_y)
+        s.page.mouse.down()
+        s.page.mouse.move(center_x + 200, center_y + 100, steps=10)
+        s.page.mouse.up()
+    s.screenshot('08-after-pan.png')
+    s.log("✓ Pan/drag completed")
+
+
+def scenario_connections(s):
+    """Hover a hexagon to trigger connection lines."""
+    s.load()
+    hexagons = s.page.locator('path.hexagon')
+    if hexagons.count() <= 5:
+        s.log("ℹ Too few hexagons for the connection check")
+        return
+    with s.render.step('connections hover', expect_render=False):
+        hexagons.nth(5).hover()
+
+    # Check if connection lines appeared
+    connections = s.page.locator('path[id^="connection-"]').count()
+    s.stats['connection_lines'] = connections
+    if connections > 0:
+        s.log(f"✓ Found {connections} connection lines")
+        s.screenshot('09-connections-visible.png')
+    else:
+        s.log("ℹ No connection lines found (may be expected)")
+
+
+def scenario_responsive_1024(s):
+    """Layout at 1024x768."""
+    s.load()
+    s.screenshot('10-responsive-1024.png')
+    s.log("✓ 1024x768 viewport tested")
+
+
+def scenario_responsive_mobile(s):
+    """Layout at 375x667."""
+    s.load()
+    s.screenshot('11-responsive-mobile.png')
+    s.log("✓ Mobile viewport tested")
+
+
+# name -> (function, viewport); every scenario starts from a fresh page
+SCENARIOS = {
+    'load': (scenario_load, DESKTOP),
+    'color-modes': (scenario_color_modes, DESKTOP),
+    'hover-click': (scenario_hover_click, DESKTOP),
+    'zoom-pan': (scenario_zoom_pan, DESKTOP),
+    'connections': (scenario_connections, DESKTOP),
+    'responsive-1024': (scenario_responsive_1024, {'width': 1024, 'height': 768}),
+    'responsive-mobile': (scenario_responsive_mobile, {'width': 375, 'height': 667}),
+}
+
+
+def run_scenario(name):
+    """Run one scenario in its own browser; returns its part of the report."""
+    function, viewport = SCENARIOS[name]
+    out_dir = os.path.join(SCREENSHOTS_DIR, name)
+    os.makedirs(out_dir, exist_ok=True)
+    start = time.perf_counter()
+    result = {'scenario': name, 'viewport': viewport, 'passed': False, 'error': None}
 
-        # Launch browser
+    with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
-        context = browser.new_context(viewport={'width': 1920, 'height': 1080})
+        context = browser.new_context(viewport=viewport)
         page = context.new_page()
+        render = RenderTimer(page)
+        scenario = Scenario(name, page, render, out_dir)
 
         # Enable console logging to catch errors
         console_logs = []
         page.on('console', lambda msg: console_logs.append(f"{msg.type()}: {msg.text()}"))
 
         try:
-            # Test 1: Initial Load
-            port = os.environ.get('PORT', '3333')
-            print(f"\n✓ Test 1: Initial page load (port {port})")
-            page.goto(f'http://localhost:{port}')
-            page.wait_for_load_state('networkidle')
-            time.sleep(2)  # Wait for D3 rendering
-
-            # Verify SVG is rendered
-            svg = page.locator('svg').first
-            expect(svg).to_be_visible()
-
-            page.screenshot(path=f'{SCREENSHOTS_DIR}/01-initial-load.png', full_page=True)
-            print("  ✓ Initial load complete, SVG rendered")
-
-            # Test 2: Cluster Mode (Default)
-            print("\n✓ Test 2: Cluster mode visualization")
-            # Verify hexagons are rendered
-            hexagons = page.locator('path.hexagon')
-            count = hexagons.count()
-            print(f"  ✓ Found {count} hexagons rendered")
-            assert count > 0, "No hexagons found!"
-
-            page.screenshot(path=f'{SCREENSHOTS_DIR}/02-cluster-mode.png', full_page=True)
-
-            # Test 2b: Label overlap check
-            print("\n✓ Test 2b: Label overlap check")
-            label_overlaps = check_label_overlaps(page)
-            if label_overlaps:
-                print(f"  ✗ FAILED: Found {len(label_overlaps)} overlapping label pairs:")
-                for overlap in label_overlaps:
-                    print(f"    - '{overlap['label1']}' overlaps with '{overlap['label2']}'")
-                # Take screenshot of overlap issue
-                page.screenshot(path=f'{SCREENSHOTS_DIR}/02b-label-overlap-FAIL.png', full_page=True)
-            else:
-                print("  ✓ No label overlaps detected")
-
-            # Test 3: Status Mode Toggle
-            print("\n✓ Test 3: Status mode toggle")
-            # Look for the toggle button (assuming it has text "Status" or similar)
-            toggle_button = page.get_by_text('Status', exact=False).first
-            if toggle_button.is_visible():
-                toggle_button.click()
-                time.sleep(1)  # Wait for color transition
-                page.screenshot(path=f'{SCREENSHOTS_DIR}/03-status-mode.png', full_page=True)
-                print("  ✓ Status mode activated")
-
-                # Toggle back to Cluster mode
-                cluster_button = page.get_by_text('Cluster', exact=False).first
-                if cluster_button.is_visible():
-                    cluster_button.click()
-                    time.sleep(1)
-                    print("  ✓ Toggled back to Cluster mode")
-            else:
-                print("  ⚠ Toggle button not found, skipping toggle test")
-
-            # Test 4: Hover on Hexagon
-            print("\n✓ Test 4: Hexagon hover interaction")
-            first_hexagon = page.locator('path.hexagon').first
-
-            # Hover over the hexagon
-            first_hexagon.hover()
-            time.sleep(0.5)  # Wait for tooltip/highlight
-
-            page.screenshot(path=f'{SCREENSHOTS_DIR}/04-hexagon-hover.png', full_page=True)
-            print("  ✓ Hexagon hover triggered")
-
-            # Test 5: Click on Cluster
-            print("\n✓ Test 5: Cluster click interaction")
-            # Find a cluster group (they should have IDs like 'cluster-...')
-            cluster_groups = page.locator('[id^="cluster-"]')
-            if cluster_groups.count() > 0:
-                # Click on first cluster's hexagon
-                cluster_hex = cluster_groups.first.locator('path.hexagon').first
-                cluster_hex.click()
-                time.sleep(1)  # Wait for any animations
-
-                page.screenshot(path=f'{SCREENSHOTS_DIR}/05-cluster-click.png', full_page=True)
-                print("  ✓ Cluster clicked")
-            else:
-                print("  ⚠ No cluster groups found")
-
-            # Test 6: Zoom Testing
-            print("\n✓ Test 6: Zoom functionality")
-            svg_element = page.locator('svg').first
-
-            # Get bounding box for zoom operations
-            box = svg_element.bounding_box()
-            if box:
-                center_x = box['x'] + box['width'] / 2
-                center_y = box['y'] + box['height'] / 2
-
-                # Zoom in with mouse wheel
-                page.mouse.move(center_x, center_y)
-                page.mouse.wheel(0, -500)  # Scroll up to zoom in
-                time.sleep(1)
-
-                page.screenshot(path=f'{SCREENSHOTS_DIR}/06-zoomed-in.png', full_page=True)
-                print("  ✓ Zoomed in")
-
-                # Zoom out
-                page.mouse.wheel(0, 500)  # Scroll down to zoom out
-                time.sleep(1)
-
-                page.screenshot(path=f'{SCREENSHOTS_DIR}/07-zoomed-out.png', full_page=True)
-                print("  ✓ Zoomed out")
-
-            # Test 7: Pan/Drag Testing
-            print("\n✓ Test 7: Pan/drag functionality")
-            if box:
-                # Drag to pan
-                page.mouse.move(center_x, center_y)
-                page.mouse.down()
-                page.mouse.move(center_x + 200, center_y + 100, steps=10)
-                page.mouse.up()
-                time.sleep(0.5)
-
-                page.screenshot(path=f'{SCREENSHOTS_DIR}/08-after-pan.png', full_page=True)
-                print("  ✓ Pan/drag completed")
-
-            # Test 8: Connection Lines (if visible)
-            print("\n✓ Test 8: Connection lines visibility")
-            # Hover on a hexagon to potentially trigger connection lines
-            hexagons = page.locator('path.hexagon')
-            if hexagons.count() > 5:
-                hexagons.nth(5).hover()
-                time.sleep(1)
-
-                # Check if connection lines appeared
-                connections = page.locator('path[id^="connection-"]')
-                if connections.count() > 0:
-                    print(f"  ✓ Found {connections.count()} connection lines")
-                    page.screenshot(path=f'{SCREENSHOTS_DIR}/09-connections-visible.png', full_page=True)
-                else:
-                    print("  ℹ No connection lines found (may be expected)")
-
-            # Test 9: Responsive Layout
-            print("\n✓ Test 9: Responsive layout test")
-            # Test with smaller viewport
-            page.set_viewport_size({'width': 1024, 'height': 768})
-            time.sleep(1)
-            page.screenshot(path=f'{SCREENSHOTS_DIR}/10-responsive-1024.png', full_page=True)
-            print("  ✓ 1024x768 viewport tested")
-
-            # Test with mobile viewport
-            page.set_viewport_size({'width': 375, 'height': 667})
-            time.sleep(1)
-            page.screenshot(path=f'{SCREENSHOTS_DIR}/11-responsive-mobile.png', full_page=True)
-            print("  ✓ Mobile viewport tested")
-
-            # Reset viewport
-            page.set_viewport_size({'width': 1920, 'height': 1080})
-
-            # Test 10: Console Errors Check
-            print("\n✓ Test 10: Console errors check")
-            errors = [log for log in console_logs if 'error' in log.lower()]
-            warnings = [log for log in console_logs if 'warning' in log.lower()]
-
-            if errors:
-                print(f"  ⚠ Found {len(errors)} console errors:")
-                for error in errors[:5]:  # Show first 5
-                    print(f"    - {error}")
-            else:
-                print("  ✓ No console errors found")
-
-            if warnings:
-                print(f"  ℹ Found {len(warnings)} console warnings")
-
-            # Test 11: Check for collision notifications
-            print("\n✓ Test 11: Check UI elements")
-
-            # Look for collision notification (if any)
-            collision_notification = page.locator('text=Collision').first
-            if collision_notification.is_visible():
-                print("  ℹ Collision notification visible")
-                page.screenshot(path=f'{SCREENSHOTS_DIR}/12-collision-notification.png', full_page=True)
-
-            # Check for legends
-            cluster_legend = page.locator('text=Clusters').or_(page.locator('text=Legend'))
-            if cluster_legend.count() > 0:
-                print("  ✓ Legend elements found")
-
-            # Final screenshot
-            page.screenshot(path=f'{SCREENSHOTS_DIR}/13-final-state.png', full_page=True)
-
-            print("\n" + "="*60)
-            print("✅ All visual tests completed successfully!")
-            print(f"📸 Screenshots saved to: {SCREENSHOTS_DIR}")
-            print("="*60)
-
-            # Summary
-            print("\n Test Summary:")
-            print(f"  - Hexagons rendered: {count}")
-            print(f"  - Label overlaps: {len(label_overlaps)}")
-            print(f"  - Console errors: {len(errors)}")
-            print(f"  - Console warnings: {len(warnings)}")
-            print(f"  - Screenshots captured: 13")
-
-            # Fail test if there are label overlaps
-            if label_overlaps:
-                raise AssertionError(f"Found {len(label_overlaps)} label overlap(s) - see test output for details")
-
+            function(scenario)
+            result['passed'] = True
         except Exception as e:
-            print(f"\n❌ Test failed with error: {e}")
-            page.screenshot(path=f'{SCREENSHOTS_DIR}/ERROR-screenshot.png', full_page=True)
-
-            # Print recent console logs for debugging
-            print("\n📝 Recent console logs:")
-            for log in console_logs[-10:]:
-                print(f"  {log}")
-
-            raise
-
+            result['error'] = f"{type(e).__name__}: {e}"
+            scenario.log(f"❌ Failed: {e}")
+            try:
+                scenario.screenshot('ERROR-screenshot.png')
+            except Exception:
+                pass
+            result['recent_console'] = console_logs[-10:]
         finally:
             browser.close()
-            print("\n🏁 Browser closed")
+
+    result.update({
+        'seconds': round(time.perf_counter() - start, 2),
+        'screenshots': scenario.screenshots,
+        'stats': scenario.stats,
+        'render': render.timings,
+        'console_errors': [log for log in console_logs if 'error' in log.lower()],
+        'console_warnings': len([log for log in console_logs if 'warning' in log.lower()]),
+    })
+    return result
+
+
+def scenario_key(name):
+    """Cache key for a scenario: its function and viewport plus the shared harness code."""
+    function, viewport = SCENARIOS[name]
+    return capture_cache.cache_key(function, viewport, Scenario, run_scenario,
+                                   render_status, label_overlaps)
+
+
+def print_report(results, wall_seconds):
+    """Merged summary of every scenario."""
+    print("\n" + "=" * 60)
+    print(" Test Summary:")
+    for result in results:
+        mark = "✅" if result['passed'] else "❌"
+        print(f"  {mark} {result['scenario']:<18} {result['seconds']:>6.1f}s  "
+              f"{len(result['screenshots'])} screenshot(s)"
+              + ("  (cached)" if result.get('cached') else "")
+              + (f"  - {result['error']}" if result['error'] else ""))
+        for log in result.get('recent_console', []):
+            print(f"      {log}")
+
+    stats = {}
+    for result in results:
+        stats.update(result['stats'])
+    for key, value in stats.items():
+        print(f"  - {key.replace('_', ' ').capitalize()}: {value}")
+
+    errors = [error for result in results for error in result['console_errors']]
+    if errors:
+        print(f"  ⚠ Found {len(errors)} console errors:")
+        for error in errors[:5]:  # Show first 5
+            print(f"    - {error}")
+    else:
+        print("  ✓ No console errors found")
+
+    timings = [(result['scenario'], timing) for result in results for timing in result['render']]
+    print("\n Render latency per step (slowest first):")
+    for scenario, timing in sorted(timings, key=lambda item: -item[1]['ms'])[:10]:
+        print(f"  - {scenario} / {timing['step']}: {timing['ms']}ms")
+
+    serial_seconds = sum(result['seconds'] for result in results if not result.get('cached'))
+    print(f"\n⏱ {len(results)} scenario(s) in {wall_seconds:.1f}s "
+          f"({serial_seconds:.1f}s of scenario time)")
+    print(f"📸 Screenshots saved to: {SCREENSHOTS_DIR}/<scenario>/")
+    print("=" * 60)
+
+
+def test_hexmap(names=None, workers=None, use_cache=True):
+    names = names or list(SCENARIOS)
+    start = time.perf_counter()
+
+    keys = {name: scenario_key(name) for name in names}
+    cached = {}
+    if use_cache:
+        for name in names:
+            result = capture_cache.restore(name, keys[name])
+            if result is not None:
+                cached[name] = dict(result, cached=True)
+    to_run = [name for name in names if name not in cached]
+    if cached:
+        print(f"♻ Reusing cached captures for unchanged scenario(s): {', '.join(cached)}")
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(to_run) or 1))
+    if to_run:
+        print(f"🚀 Starting HexMap visual tests: {len(to_run)} scenario(s), {workers} worker(s)...")
+    if workers == 1:
+        fresh = [run_scenario(name) for name in to_run]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_scenario, name) for name in to_run]
+            for future in as_completed(futures):
+                result = future.result()
+                print(f"  {'✓' if result['passed'] else '✗'} {result['scenario']} "
+                      f"finished in {result['seconds']:.1f}s", flush=True)
+            fresh = [future.result() for future in futures]
+    wall_seconds = time.perf_counter() - start
+
+    for result in fresh:
+        if result['passed']:
+            capture_cache.store(result['scenario'], keys[result['scenario']], result,
+                                result['screenshots'])
+    fresh = {result['scenario']: result for result in fresh}
+    results = [cached.get(name) or fresh[name] for name in names]
+
+    report = {'wall_seconds': round(wall_seconds, 2), 'workers': workers, 'scenarios': results}
+    with open(os.path.join(SCREENSHOTS_DIR, 'report.json'), 'w') as f:
+        json.dump(report, f, indent=2)
+    print_report(results, wall_seconds)
+
+    failed = [result['scenario'] for result in results if not result['passed']]
+    if failed:
+        raise AssertionError(f"{len(failed)} scenario(s) failed: {', '.join(failed)}")
+    print("✅ All visual tests completed successfully!")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HexMap visual and interaction tests')
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS),
+                        help='Run only this scenario (can be repeated)')
+    parser.add_argument('--workers', type=int,
+                        help='Parallel browser processes (default: one per CPU core)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Capture every scenario even if its inputs are unchanged')
+    args = parser.parse_args()
+    try:
+        test_hexmap(args.scenario, args.workers, use_cache=not args.no_cache)
+    except AssertionError as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+
 
 if __name__ == "__main__":
-    test_hexmap()
+    main()
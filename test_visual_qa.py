@@ -2,63 +2,77 @@
 Visual QA Screenshot Capture for HexMap.
 Captures screenshots at key states for Claude Code to analyze.
 
+After capture, each screenshot is compared with its baseline
+(see visual_regression.py); a regression fails the run. While src/data.json,
+the app sources and the capture code are unchanged, the screenshots of the
+last capture are reused instead (see capture_cache.py).
+
 Run with: python with_server.py --server "npm start" --port 3000 --timeout 60 -- python test_visual_qa.py
+Accept changed screenshots: ... -- python test_visual_qa.py --update-baselines
+Capture even if nothing changed: ... -- python test_visual_qa.py --no-cache
 """
 
+import argparse
+import json
 import os
 import sys
 from datetime import datetime
 from playwright.sync_api import sync_playwright
 
+import capture_cache
+import render_status
+from render_status import RenderTimer
+from visual_regression import run_stage
+
 # Create screenshots directory
 SCREENSHOTS_DIR = './test-screenshots'
 os.makedirs(SCREENSHOTS_DIR, exist_ok=True)
+MANIFEST_PATH = f'{SCREENSHOTS_DIR}/qa-manifest.json'
+TIMINGS_PATH = f'{SCREENSHOTS_DIR}/qa-render-timings.json'
 
 
-def run_screenshot_capture():
-    """Capture screenshots at key application states for visual QA."""
-    print("=" * 60)
-    print("HexMap Visual QA - Screenshot Capture")
-    print("=" * 60)
+def save_capture(page, name, screenshots_captured):
+    """Screenshot the page and record it, with its viewport, for the regression stage."""
+    path = f'{SCREENSHOTS_DIR}/{name}.png'
+    page.screenshot(path=path, full_page=True)
+    screenshots_captured.append({'path': path, 'viewport': page.viewport_size})
+    print(f"  Saved: {path}")
+
 
+def capture_screenshots():
+    """Capture screenshots at key application states; returns the captures."""
     screenshots_captured = []
 
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=True)
         context = browser.new_context(viewport={'width': 1920, 'height': 1080})
         page = context.new_page()
+        render = RenderTimer(page)
 
         try:
             # Load the application (use PORT env var or default to 3333)
             port = os.environ.get('PORT', '3333')
             print(f"\n[1/6] Loading application on port {port}...")
-            page.goto(f'http://localhost:{port}')
-            page.wait_for_load_state('networkidle')
-            page.wait_for_timeout(2000)  # Wait for D3 rendering
+            with render.step('initial load', navigation=True):
+                page.goto(f'http://localhost:{port}')
 
             # Screenshot 1: Initial load - Cluster mode (default)
             print("[2/6] Capturing Cluster mode (default view)...")
-            path = f'{SCREENSHOTS_DIR}/qa-01-cluster-mode.png'
-            page.screenshot(path=path, full_page=True)
-            screenshots_captured.append(path)
-            print(f"  Saved: {path}")
+            save_capture(page, 'qa-01-cluster-mode', screenshots_captured)
 
             # Screenshot 2: Status mode
             print("[3/6] Capturing Status mode...")
             toggle = page.get_by_text('Status', exact=False).first
             if toggle.is_visible():
-                toggle.click()
-                page.wait_for_timeout(1000)
-            path = f'{SCREENSHOTS_DIR}/qa-02-status-mode.png'
-            page.screenshot(path=path, full_page=True)
-            screenshots_captured.append(path)
-            print(f"  Saved: {path}")
+                with render.step('status mode'):
+                    toggle.click()
+            save_capture(page, 'qa-02-status-mode', screenshots_captured)
 
             # Switch back to Cluster mode
             cluster_btn = page.get_by_text('Cluster', exact=False).first
             if cluster_btn.is_visible():
-                cluster_btn.click()
-                page.wait_for_timeout(500)
+                with render.step('cluster mode', expect_render=False):
+                    cluster_btn.click()
 
             # Screenshot 3: Zoomed in view
             print("[4/6] Capturing zoomed in view...")
@@ -68,16 +82,13 @@ def run_screenshot_capture():
                 center_x = box['x'] + box['width'] / 2
                 center_y = box['y'] + box['height'] / 2
                 page.mouse.move(center_x, center_y)
-                page.mouse.wheel(0, -400)  # Zoom in
-                page.wait_for_timeout(1000)
-            path = f'{SCREENSHOTS_DIR}/qa-03-zoomed-in.png'
-            page.screenshot(path=path, full_page=True)
-            screenshots_captured.append(path)
-            print(f"  Saved: {path}")
+                with render.step('zoom in'):
+                    page.mouse.wheel(0, -400)  # Zoom in
+            save_capture(page, 'qa-03-zoomed-in', screenshots_captured)
 
             # Reset zoom
-            page.mouse.wheel(0, 400)
-            page.wait_for_timeout(500)
+            with render.step('zoom reset'):
+                page.mouse.wheel(0, 400)
 
             # Screenshot 4: Hover state (show tooltip/connections)
             print("[5/6] Capturing hover interaction...")
@@ -85,8 +96,8 @@ def run_screenshot_capture():
                 # Click on center cluster to zoom and center it
                 clusters = page.locator('[id^="cluster-"]')
                 if clusters.count() > 0:
-                    clusters.nth(2).click()  # Click middle cluster
-                    page.wait_for_timeout(1500)
+                    with render.step('cluster click', expect_render=False):
+                        clusters.nth(2).click()  # Click middle cluster
 
                 # Now find a visible hexagon and hover
                 hexagons = page.locator('path.hexagon')
@@ -95,8 +106,8 @@ def run_screenshot_capture():
                     try:
                         hex_elem = hexagons.nth(i)
                         if hex_elem.is_visible():
-                            hex_elem.hover(timeout=3000)
-                            page.wait_for_timeout(500)
+                            with render.step('hexagon hover', expect_render=False):
+                                hex_elem.hover(timeout=3000)
                             hovered = True
                             break
                     except Exception:
@@ -105,43 +116,67 @@ def run_screenshot_capture():
                 if not hovered:
                     print("  Warning: Could not hover any hexagon")
 
-                path = f'{SCREENSHOTS_DIR}/qa-04-hover-state.png'
-                page.screenshot(path=path, full_page=True)
-                screenshots_captured.append(path)
-                print(f"  Saved: {path}")
+                save_capture(page, 'qa-04-hover-state', screenshots_captured)
             except Exception as e:
                 print(f"  Warning: Hover test failed: {e}")
 
             # Reset - go back to initial view by reloading
-            page.reload()
-            page.wait_for_load_state('networkidle')
-            page.wait_for_timeout(1000)
+            with render.step('reload', navigation=True):
+                page.reload()
 
             # Screenshot 5: Mobile responsive view
             print("[6/6] Capturing mobile responsive view...")
-            page.set_viewport_size({'width': 375, 'height': 667})
-            page.wait_for_timeout(1000)
-            path = f'{SCREENSHOTS_DIR}/qa-05-mobile.png'
-            page.screenshot(path=path, full_page=True)
-            screenshots_captured.append(path)
-            print(f"  Saved: {path}")
+            with render.step('resize mobile', expect_render=False):
+                page.set_viewport_size({'width': 375, 'height': 667})
+            save_capture(page, 'qa-05-mobile', screenshots_captured)
+
+            render.summary()
+            render.save(TIMINGS_PATH)
 
         finally:
             browser.close()
 
+    return screenshots_captured
+
+
+def run_screenshot_capture(update_baselines=False, use_cache=True):
+    """Capture (or reuse) screenshots for visual QA and compare them with their baselines."""
+    print("=" * 60)
+    print("HexMap Visual QA - Screenshot Capture")
+    print("=" * 60)
+
+    key = capture_cache.cache_key(capture_screenshots, save_capture, render_status)
+    screenshots_captured = capture_cache.restore('qa', key) if use_cache else None
+    if screenshots_captured is not None:
+        print("\n♻ Data, app sources and capture code unchanged: reusing the last capture")
+    else:
+        screenshots_captured = capture_screenshots()
+        capture_cache.store('qa', key, screenshots_captured,
+                            [capture['path'] for capture in screenshots_captured] + [TIMINGS_PATH])
+
     # Print summary
     print("\n" + "=" * 60)
     print("SCREENSHOT CAPTURE COMPLETE")
     print("=" * 60)
     print(f"Captured {len(screenshots_captured)} screenshots:")
-    for path in screenshots_captured:
-        print(f"  - {path}")
+    for capture in screenshots_captured:
+        print(f"  - {capture['path']}")
     print("\nTo analyze these screenshots, ask Claude Code:")
     print('  "Analyze the screenshots in test-screenshots/ for visual issues"')
     print("=" * 60)
 
-    return 0
+    with open(MANIFEST_PATH, 'w') as f:
+        json.dump(screenshots_captured, f, indent=2)
+    passed = run_stage(screenshots_captured, out_dir=SCREENSHOTS_DIR, update=update_baselines)
+
+    return 0 if passed else 1
 
 
 if __name__ == '__main__':
-    sys.exit(run_screenshot_capture())
+    parser = argparse.ArgumentParser(description='Capture HexMap screenshots and compare them with their baselines')
+    parser.add_argument('--update-baselines', action='store_true',
+                        help='Accept changed screenshots as the new baselines')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Capture even if data, app sources and capture code are unchanged')
+    args = parser.parse_args()
+    sys.exit(run_screenshot_capture(args.update_baselines, use_cache=not args.no_cache))
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+HexMap Batch Layout
+
+Builds many maps from one inventory in a single run. A JSON manifest lists
+the inputs and one entry per map: which apps it shows (by business and/or
+region), engine parameters and an output path. The inventory is parsed
+once, handed to each worker process once, and the maps are laid out in
+parallel, largest first. A per-map timing summary is printed at the end.
+
+Manifest format (relative paths are relative to the manifest file):
+
+    {
+      "inputs": ["exports/*.csv"],
+      "defaults": {"water_gap": 2, "seed": 42},
+      "maps": [
+        {"name": "markets", "business": ["Trading", "Risk*"],
+         "output": "maps/markets.json"},
+        {"name": "emea", "region": "EMEA", "output": "maps/emea.json",
+         "jitter": 4.0}
+      ]
+    }
+
+"business" and "region" take a name, a glob pattern or a list of them; a
+map with neither shows the whole inventory. Connections to apps outside
+a map are dropped from it. Any key of ENGINE_PARAMS may be set in
+"defaults" or on a map; unknown keys and values the engine rejects fail
+the manifest before anything is laid out. A map that fails is reported in
+the summary and makes the exit status 1; the other maps are still built.
+
+Usage:
+    python batch_layout.py manifest.json
+    python batch_layout.py manifest.json --jobs 8 --only markets emea
+"""
+
+import argparse
+import inspect
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from continent_layout import App, ContinentLayoutEngine, load_inputs
+from hexmap_io import write_json_atomic
+
+# Manifest keys passed through to ContinentLayoutEngine: its constructor's arguments
+ENGINE_PARAMS = tuple(name for name in inspect.signature(ContinentLayoutEngine).parameters
+                      if name != 'verbose')
+
+MAP_KEYS = {'name', 'business', 'region', 'output', *ENGINE_PARAMS}
+
+
+def _patterns(value) -> List[str]:
+    if value is None:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+def load_manifest(path: Path) -> Dict:
+    """
+    Read and validate a manifest, resolving paths against its directory.
+
+    Raises ValueError for unknown keys, engine parameters the engine
+    rejects, missing outputs and duplicate map names or outputs.
+    """
+    with open(path) as f:
+        manifest = json.load(f)
+
+    base = path.parent
+    defaults = manifest.get('defaults', {})
+    unknown = set(defaults) - set(ENGINE_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown defaults: {', '.join(sorted(unknown))}")
+
+    maps = []
+    names = set()
+    outputs = set()
+    for i, entry in enumerate(manifest.get('maps', [])):
+        unknown = set(entry) - MAP_KEYS
+        if unknown:
+            raise ValueError(f"Map {i}: unknown keys: {', '.join(sorted(unknown))}")
+        if 'output' not in entry:
+            raise ValueError(f"Map {i}: no output")
+
+        output = (base / entry['output']).resolve()
+        name = entry.get('name', output.stem)
+        if name in names:
+            raise ValueError(f"Duplicate map name: {name}")
+        if output in outputs:
+            raise ValueError(f"Map {name}: output {output} is used by another map")
+        names.add(name)
+        outputs.add(output)
+
+        params = dict(defaults)
+        params.update((key, entry[key]) for key in ENGINE_PARAMS if key in entry)
+        try:
+            ContinentLayoutEngine(verbose=False, **params)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Map {name}: bad engine parameters: {e}")
+        maps.append({
+            "name": name,
+            "business": _patterns(entry.get('business')),
+            "region": _patterns(entry.get('region')),
+            "output": output,
+            "params": params,
+        })
+
+    inputs = [str(base / pattern) for pattern in _patterns(manifest.get('inputs'))]
+    return {"inputs": inputs, "maps": maps}
+
+
+def _matches(value: str, patterns: List[str]) -> bool:
+    return not patterns or any(fnmatchcase(value, pattern) for pattern in patterns)
+
+
+def app_matches(app: App, business: List[str], region: List[str]) -> bool:
+    """Whether an app matches any business pattern and any region pattern
+    (an empty list matches everything)."""
+    return _matches(app.business, business) and _matches(app.region, region)
+
+
+def select_apps(apps: List[App], business: List[str], region: List[str]) -> List[App]:
+    """
+    The apps matching the filter (see app_matches), with connections to
+    apps outside the selection dropped.
+    """
+    selected = [app for app in apps if app_matches(app, business, region)]
+    if len(selected) == len(apps):
+        return selected
+
+    ids = {app.id for app in selected}
+    return [replace(app, connections=[target for target in app.connections if target in ids])
+            for app in selected]
+
+
+# Per-process inventory for build_map workers (set once by the pool initializer)
+_batch_apps: List[App] = []
+
+
+def _init_batch_worker(apps: List[App]):
+    global _batch_apps
+    _batch_apps = apps
+
+
+def build_map(spec: Dict) -> Dict:
+    """Worker: lay out and write one map; returns its timings (seconds)."""
+    timings = {}
+    start = time.perf_counter()
+    apps = select_apps(_batch_apps, spec["business"], spec["region"])
+    timings["select"] = time.perf_counter() - start
+    if not apps:
+        return {"name": spec["name"], "apps": 0, "error": "no apps match the filter"}
+
+    engine = ContinentLayoutEngine(verbose=False, **spec["params"])
+    engine.load_apps(apps)
+    output = engine.generate_layout(timings)
+
+    start = time.perf_counter()
+    spec["output"].parent.mkdir(parents=True, exist_ok=True)
+    write_json_atomic(output, spec["output"])
+    timings["write"] = time.perf_counter() - start
+
+    return {"name": spec["name"], "apps": len(apps), "continents": len(output["clusters"]),
+            "timings": timings}
+
+
+def run_batch(apps: List[App], maps: List[Dict], jobs: int = 1) -> List[Dict]:
+    """
+    Build every map, across a process pool when jobs > 1.
+
+    Maps are submitted largest first so a big map does not start last, but
+    results are returned in manifest order. A map that raises gets a result
+    with an "error" entry instead; the other maps are still built.
+    """
+    sizes = [sum(app_matches(app, spec["business"], spec["region"]) for app in apps)
+             for spec in maps]
+    order = sorted(range(len(maps)), key=lambda i: -sizes[i])
+    results: List[Optional[Dict]] = [None] * len(maps)
+
+    def failed(i, error):
+        return {"name": maps[i]["name"], "apps": sizes[i],
+                "error": f"{type(error).__name__}: {error}"}
+
+    jobs = max(1, min(jobs, len(maps)))
+    if jobs == 1:
+        _init_batch_worker(apps)
+        for i in order:
+            try:
+                results[i] = build_map(maps[i])
+            except Exception as e:
+                results[i] = failed(i, e)
+        return results
+
+    with ProcessPoolExecutor(max_workers=jobs,
+                             initializer=_init_batch_worker,
+                             initargs=(apps,)) as pool:
+        futures = {i: pool.submit(build_map, maps[i]) for i in order}
+        for i, future in futures.items():
+            try:
+                results[i] = future.result()
+            except Exception as e:
+                results[i] = failed(i, e)
+    return results
+
+
+def print_summary(results: List[Dict], elapsed: float):
+    """Per-map timing table, followed by the totals."""
+    phases = {"select": "select", "centroids": "centroid", "territories": "territory",
+              "placement": "place", "collisions": "collide", "output": "output",
+              "write": "write"}
+    print(f"\n{'map':<24} {'apps':>7} {'cont':>5} "
+          + " ".join(f"{label:>9}" for label in phases.values()) + f" {'total':>8}")
+    busy = 0.0
+    for result in results:
+        if "error" in result:
+            print(f"{result['name']:<24} {result['apps']:>7}  error: {result['error']}")
+            continue
+        timings = result["timings"]
+        total = sum(timings.values())
+        busy += total
+        print(f"{result['name']:<24} {result['apps']:>7} {result['continents']:>5} "
+              + " ".join(f"{timings.get(phase, 0) * 1000:>7.0f}ms" for phase in phases)
+              + f" {total * 1000:>6.0f}ms")
+
+    print(f"\n{len(results)} maps in {elapsed:.2f}s wall time "
+          f"({busy:.2f}s of layout work, {busy / elapsed if elapsed else 0:.1f}x parallel)")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Build many HexMap layouts from one inventory',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python batch_layout.py nightly.json
+  python batch_layout.py nightly.json --jobs 8
+  python batch_layout.py nightly.json --only markets emea
+  python batch_layout.py nightly.json --input exports/today.csv
+        """
+    )
+    parser.add_argument('manifest', help='Manifest JSON file')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--only', nargs='+', metavar='NAME',
+                        help='Only build these maps')
+    parser.add_argument('--input', nargs='+', default=None,
+                        help="Input files or globs (default: the manifest's inputs)")
+
+    args = parser.parse_args()
+
+    try:
+        manifest = load_manifest(Path(args.manifest))
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    maps = manifest["maps"]
+    if args.only:
+        missing = set(args.only) - {spec["name"] for spec in maps}
+        if missing:
+            print(f"Error: No such maps: {', '.join(sorted(missing))}")
+            return 1
+        maps = [spec for spec in maps if spec["name"] in args.only]
+    inputs = args.input or manifest["inputs"]
+    if not maps or not inputs:
+        print("Error: The manifest needs at least one map and one input")
+        return 1
+
+    start = time.perf_counter()
+    try:
+        apps = load_inputs(inputs, args.jobs)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+    print(f"Parsed inventory in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    results = run_batch(apps, maps, args.jobs)
+    print_summary(results, time.perf_counter() - start)
+
+    for spec, result in zip(maps, results):
+        if "error" not in result:
+            print(f"  {spec['output']}")
+    return 1 if any("error" in result for result in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+HexMap Layout Benchmark
+
+Times the layout tools on synthetic banks of increasing size and keeps a
+JSON history of results so regressions can be spotted against a baseline.
+
+For every map size a fresh worker process:
+- builds synthetic apps with generate_test_data (or generate_enterprise.py)
+- runs each ContinentLayoutEngine phase (timed separately)
+- runs continent_layout.py and convert_to_hexmap.py end to end on a CSV
+- records wall times, peak RSS and output sizes
+
+Usage:
+    python benchmark_layout.py run                        # 1k, 10k, 50k, 200k apps
+    python benchmark_layout.py run --sizes 1000 5000      # Custom sizes
+    python benchmark_layout.py baseline                   # Promote latest run to baseline
+    python benchmark_layout.py compare --threshold 0.2    # Flag regressions vs baseline
+"""
+
+import argparse
+import contextlib
+import csv
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import convert_to_hexmap
+from continent_layout import ContinentLayoutEngine, generate_test_data, load_from_csv
+from generate_enterprise import EnterpriseModel
+
+SCRIPT_DIR = Path(__file__).parent
+
+DEFAULT_SIZES = [1000, 10000, 50000, 200000]
+DEFAULT_HISTORY = SCRIPT_DIR / "benchmarks" / "history.json"
+DEFAULT_BASELINE = SCRIPT_DIR / "benchmarks" / "baseline.json"
+
+# Timings shorter than this are treated as noise when comparing runs
+NOISE_FLOOR_SECONDS = 0.05
+
+
+def write_apps_csv(apps, filepath):
+    """Write apps to a CSV readable by both continent_layout and the converter."""
+    with open(filepath, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['app_name', 'cluster', 'status', 'description', 'connects_to'])
+        for app in apps:
+            writer.writerow([app.id, app.business, app.status, app.description,
+                             ';'.join(app.connections)])
+
+
+def _peak_rss_mb():
+    """Peak resident set size of this process in MB (Linux reports KB)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def benchmark_size(num_apps, params):
+    """Run every benchmark stage for one map size and return the result record."""
+    timings = {}
+    output_bytes = {}
+
+    # The tools are chatty; keep the benchmark report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        if params.get('generator') == 'enterprise':
+            apps = list(EnterpriseModel(num_apps, seed=params['seed']).iter_apps())
+        else:
+            apps = generate_test_data(num_apps, params['seed'],
+                                      max_internal=params['max_internal'],
+                                      external_rate=params['external_rate'])
+        timings['generate'] = time.perf_counter() - start
+
+        # Engine phases
+        engine = ContinentLayoutEngine(seed=params['seed'])
+        start = time.perf_counter()
+        engine.load_apps(apps)
+        timings['load_apps'] = time.perf_counter() - start
+
+        phase_timings = {}
+        output = engine.generate_layout(timings=phase_timings)
+        for phase, seconds in phase_timings.items():
+            timings[f'phase_{phase}'] = seconds
+
+        start = time.perf_counter()
+        output_bytes['layout'] = len(json.dumps(output, indent=2))
+        timings['serialize'] = time.perf_counter() - start
+
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = Path(tmp) / 'apps.csv'
+            write_apps_csv(apps, csv_path)
+            output_bytes['input_csv'] = csv_path.stat().st_size
+            del apps, engine, output
+
+            # continent_layout.py end to end: CSV -> layout -> data.json
+            start = time.perf_counter()
+            engine = ContinentLayoutEngine(seed=params['seed'])
+            engine.load_apps(load_from_csv(csv_path))
+            with open(Path(tmp) / 'layout.json', 'w') as f:
+                json.dump(engine.generate_layout(), f, indent=2)
+            timings['layout_e2e'] = time.perf_counter() - start
+            del engine
+
+            # convert_to_hexmap.py end to end (needs pandas)
+            if convert_to_hexmap.HAS_PANDAS:
+                start = time.perf_counter()
+                df = convert_to_hexmap.read_input_file(csv_path)
+                df = convert_to_hexmap.normalize_columns(df)
+                df = convert_to_hexmap.validate_data(df)
+                converted_path = Path(tmp) / 'converted.json'
+                with open(converted_path, 'w') as f:
+                    json.dump(convert_to_hexmap.convert_to_hexmap_format(df), f, indent=2)
+                timings['converter_e2e'] = time.perf_counter() - start
+                output_bytes['converter'] = converted_path.stat().st_size
+
+    return {
+        "num_apps": num_apps,
+        "timings": timings,
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+        "output_bytes": output_bytes,
+    }
+
+
+def _worker(conn, num_apps, params):
+    """Process entry point: run one size and send the result back."""
+    try:
+        conn.send(benchmark_size(num_apps, params))
+    except Exception as e:
+        conn.send({"num_apps": num_apps, "error": f"{type(e).__name__}: {e}"})
+    finally:
+        conn.close()
+
+
+def run_in_subprocess(num_apps, params, timeout):
+    """
+    Benchmark one size in a fresh process so peak RSS is per size and a
+    runaway layout can be stopped at the timeout.
+    """
+    ctx = multiprocessing.get_context('spawn')
+    parent_conn, child_conn = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_worker, args=(child_conn, num_apps, params))
+    process.start()
+    child_conn.close()
+
+    try:
+        if parent_conn.poll(timeout):
+            result = parent_conn.recv()
+        else:
+            result = {"num_apps": num_apps, "timed_out": True, "timeout": timeout}
+    except EOFError:
+        result = {"num_apps": num_apps, "error": "worker exited without a result"}
+    finally:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+
+    return result
+
+
+def load_history(path):
+    """Load the list of recorded runs (empty if the file does not exist)."""
+    path = Path(path)
+    if not path.exists():
+        return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_json(data, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def print_result(result):
+    """Print one size's result as a short table."""
+    num_apps = result['num_apps']
+    if result.get('timed_out'):
+        print(f"\n{num_apps} apps: TIMED OUT after {result['timeout']}s")
+        return
+    if result.get('error'):
+        print(f"\n{num_apps} apps: ERROR {result['error']}")
+        return
+
+    print(f"\n{num_apps} apps (peak RSS {result['peak_rss_mb']} MB)")
+    for name, seconds in result['timings'].items():
+        print(f"  {name:<22} {seconds:10.3f} s")
+    for name, size in result['output_bytes'].items():
+        print(f"  {name + ' bytes':<22} {size:10d}")
+
+
+def cmd_run(args):
+    params = {
+        "generator": args.generator,
+        "seed": args.seed,
+        "max_internal": args.max_internal,
+        "external_rate": args.external_rate,
+    }
+
+    run = {
+        "timestamp": datetime.now().isoformat(timespec='seconds'),
+        "label": args.label,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "params": params,
+        "results": [],
+    }
+
+    print(f"Benchmarking sizes {args.sizes} with {params}")
+    for num_apps in args.sizes:
+        result = run_in_subprocess(num_apps, params, args.timeout)
+        print_result(result)
+        run['results'].append(result)
+
+    history = load_history(args.history)
+    history.append(run)
+    save_json(history, args.history)
+    print(f"\nAppended run to: {args.history}")
+    return 0
+
+
+def cmd_baseline(args):
+    history = load_history(args.history)
+    if not history:
+        print(f"Error: No runs recorded in {args.history}")
+        return 1
+    save_json(history[-1], args.baseline)
+    print(f"Baseline set to run from {history[-1]['timestamp']}: {args.baseline}")
+    return 0
+
+
+def compare_runs(baseline, current, threshold):
+    """
+    Compare two runs size by size.
+
+    Returns a list of (num_apps, metric, baseline_value, current_value)
+    tuples for every metric that got worse by more than the threshold.
+    """
+    baseline_by_size = {r['num_apps']: r for r in baseline['results']}
+    regressions = []
+
+    for result in current['results']:
+        base = baseline_by_size.get(result['num_apps'])
+        if base is None or 'timings' not in base:
+            continue
+        if 'timings' not in result:
+            regressions.append((result['num_apps'], 'completed', 'yes', 'no'))
+            continue
+
+        metrics = []
+        for name, seconds in result['timings'].items():
+            if name in base['timings']:
+                metrics.append((name, base['timings'][name], seconds, NOISE_FLOOR_SECONDS))
+        metrics.append(('peak_rss_mb', base['peak_rss_mb'], result['peak_rss_mb'], 1.0))
+        for name, size in result['output_bytes'].items():
+            # Input size is set by the run parameters, not by the tools
+            if name in base['output_bytes'] and name != 'input_csv':
+                metrics.append((f'{name}_bytes', base['output_bytes'][name], size, 0))
+
+        for name, old, new, floor in metrics:
+            if new > old * (1 + threshold) and new - old > floor:
+                regressions.append((result['num_apps'], name, old, new))
+
+    return regressions
+
+
+def cmd_compare(args):
+    history = load_history(args.history)
+    if not history:
+        print(f"Error: No runs recorded in {args.history}")
+        return 1
+    if not Path(args.baseline).exists():
+        print(f"Error: No baseline at {args.baseline} (run 'baseline' first)")
+        return 1
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    current = history[-1]
+
+    print(f"Baseline: {baseline['timestamp']}  Current: {current['timestamp']}  "
+          f"Threshold: {args.threshold:.0%}")
+    if baseline['params'] != current['params']:
+        print(f"Warning: parameters differ ({baseline['params']} vs {current['params']})")
+
+    regressions = compare_runs(baseline, current, args.threshold)
+    if not regressions:
+        print("No regressions")
+        return 0
+
+    print(f"\n{len(regressions)} regression(s):")
+    for num_apps, metric, old, new in regressions:
+        if isinstance(old, (int, float)) and old:
+            change = f"{(new - old) / old:+.0%}"
+        else:
+            change = ""
+        print(f"  {num_apps:>7} apps  {metric:<22} {old} -> {new} {change}")
+    return 1
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the HexMap layout tools',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python benchmark_layout.py run --sizes 1000 10000
+  python benchmark_layout.py run --max-internal 6 --external-rate 0.8 --label dense
+  python benchmark_layout.py baseline
+  python benchmark_layout.py compare --threshold 0.15
+        """
+    )
+    parser.add_argument('--history', default=str(DEFAULT_HISTORY),
+                        help='JSON history file (default: benchmarks/history.json)')
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE),
+                        help='JSON baseline file (default: benchmarks/baseline.json)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Run the benchmark and append to history')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                            help='Map sizes in apps (default: 1000 10000 50000 200000)')
+    run_parser.add_argument('-s', '--seed', type=int, default=42,
+                            help='Random seed (default: 42)')
+    run_parser.add_argument('--generator', choices=['test', 'enterprise'], default='test',
+                            help='generate_test_data or the power-law EnterpriseModel '
+                                 '(default: test)')
+    run_parser.add_argument('--max-internal', type=int, default=3,
+                            help='Max connections within a business per app (default: 3)')
+    run_parser.add_argument('--external-rate', type=float, default=0.4,
+                            help='Share of apps with cross-business connections (default: 0.4)')
+    run_parser.add_argument('--timeout', type=float, default=1800,
+                            help='Seconds allowed per map size (default: 1800)')
+    run_parser.add_argument('--label', default='',
+                            help='Free-form label stored with the run')
+
+    subparsers.add_parser('baseline', help='Store the latest run as the baseline')
+
+    compare_parser = subparsers.add_parser('compare', help='Compare latest run with the baseline')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help='Allowed relative slowdown/growth (default: 0.10)')
+
+    args = parser.parse_args()
+
+    commands = {'run': cmd_run, 'baseline': cmd_baseline, 'compare': cmd_compare}
+    return commands[args.command](args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
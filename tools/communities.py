@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Continent Discovery
+
+Derives continents from the app connection graph, for inventories (such as
+discovery feeds) that have connections but no business/cluster column.
+
+Communities are found with the Louvain method on a sparse, undirected,
+weighted adjacency: apps repeatedly move to the neighbouring community that
+most increases modularity, then each community is collapsed into a single
+node and the process repeats on the smaller graph. Every sweep costs
+O(edges), and the graph shrinks quickly from level to level, so the whole
+run is near-linear; a million edges take well under a minute in pure
+Python. The visiting order is shuffled with a fixed seed, so results are
+reproducible.
+
+Apps that already have a business keep it and act as fixed labels, so a
+partly owned inventory grows its known continents over the unowned apps
+linked to them. Afterwards, apps without any connection are grouped as
+"Unconnected", communities below min_size are merged into the neighbouring
+community they link to most, and only the max_communities largest are kept
+(the rest go to "Other"). A discovered community is named after its most
+connected app.
+
+Usage:
+    python communities.py discovery_feed.csv
+    python communities.py discovery_feed.csv --min-size 10 -o with_business.csv
+"""
+
+import argparse
+import csv
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+UNCONNECTED = "Unconnected"
+OTHER = "Other"
+
+
+def build_adjacency(nodes: Sequence[str],
+                    links: Sequence[Sequence[str]]) -> List[Dict[int, int]]:
+    """
+    Undirected weighted adjacency over node indices.
+
+    links[i] lists the names node i connects to; unknown names and self
+    links are ignored, and a pair linked both ways (or several times) gets
+    a higher weight.
+    """
+    index = {name: i for i, name in enumerate(nodes)}
+    adjacency: List[Dict[int, int]] = [{} for _ in nodes]
+    for i, targets in enumerate(links):
+        for target in targets:
+            j = index.get(target)
+            if j is None or j == i:
+                continue
+            adjacency[i][j] = adjacency[i].get(j, 0) + 1
+            adjacency[j][i] = adjacency[j].get(i, 0) + 1
+    return adjacency
+
+
+def _move_nodes(adjacency: List[Dict[int, int]], weights: List[float], total: float,
+                community: List[int], fixed: Sequence[bool], rng: random.Random,
+                max_sweeps: int = 20) -> bool:
+    """
+    Louvain local moving phase, in place on community; returns whether any
+    node moved.
+
+    Each node moves to the neighbouring community with the best modularity
+    gain (ties keep the earlier candidate, the current community first).
+    Fixed nodes never move, but other nodes may join their communities.
+    """
+    community_weight = defaultdict(float)
+    for node, weight in enumerate(weights):
+        community_weight[community[node]] += weight
+
+    order = [node for node in range(len(adjacency)) if not fixed[node] and adjacency[node]]
+    rng.shuffle(order)
+    moved_any = False
+
+    for _ in range(max_sweeps):
+        moved = 0
+        for node in order:
+            current = community[node]
+            node_weight = weights[node]
+            links: Dict[int, float] = {}
+            for neighbour, weight in adjacency[node].items():
+                other = community[neighbour]
+                links[other] = links.get(other, 0) + weight
+
+            community_weight[current] -= node_weight
+            scale = node_weight / total
+            best = current
+            best_gain = links.get(current, 0) - community_weight[current] * scale
+            for other, weight in links.items():
+                gain = weight - community_weight[other] * scale
+                if gain > best_gain + 1e-12:
+                    best, best_gain = other, gain
+            community_weight[best] += node_weight
+
+            if best != current:
+                community[node] = best
+                moved += 1
+        if not moved:
+            break
+        moved_any = True
+    return moved_any
+
+
+def _aggregate(adjacency: List[Dict[int, int]], loops: List[float], community: List[int]):
+    """Collapse each community into one node; returns the new graph and node mapping."""
+    renumber: Dict[int, int] = {}
+    for label in community:
+        renumber.setdefault(label, len(renumber))
+
+    new_adjacency: List[Dict[int, float]] = [{} for _ in renumber]
+    new_loops = [0.0] * len(renumber)
+    for node, neighbours in enumerate(adjacency):
+        source = renumber[community[node]]
+        new_loops[source] += loops[node]
+        edges = new_adjacency[source]
+        for neighbour, weight in neighbours.items():
+            target = renumber[community[neighbour]]
+            if target == source:
+                new_loops[source] += weight
+            else:
+                edges[target] = edges.get(target, 0) + weight
+    return new_adjacency, new_loops, [renumber[label] for label in community]
+
+
+def louvain(adjacency: List[Dict[int, int]], groups: Sequence[int], fixed: Sequence[bool],
+            seed: int = 42) -> Tuple[List[int], int]:
+    """
+    Louvain community detection.
+
+    groups gives each node's starting community; fixed nodes stay in theirs
+    (so fixed nodes that start together always end together, and two fixed
+    groups never merge). Returns (community per node, number of levels).
+    """
+    rng = random.Random(seed)
+    loops = [0.0] * len(adjacency)
+    weights = [float(sum(neighbours.values())) for neighbours in adjacency]
+    total = sum(weights)
+    if not total:
+        return list(groups), 0
+
+    # node_of[i]: node of original node i in the current (aggregated) graph
+    adjacency, loops, node_of = _aggregate(adjacency, loops, list(groups))
+    fixed_nodes = [False] * len(adjacency)
+    for original, is_fixed in enumerate(fixed):
+        if is_fixed:
+            fixed_nodes[node_of[original]] = True
+
+    levels = 0
+    while True:
+        weights = [sum(neighbours.values()) + loop for neighbours, loop in zip(adjacency, loops)]
+        community = list(range(len(adjacency)))
+        levels += 1
+        if not _move_nodes(adjacency, weights, total, community, fixed_nodes, rng):
+            break
+        adjacency, loops, mapping = _aggregate(adjacency, loops, community)
+        node_of = [mapping[node] for node in node_of]
+        next_fixed = [False] * len(adjacency)
+        for node, is_fixed in enumerate(fixed_nodes):
+            if is_fixed:
+                next_fixed[mapping[node]] = True
+        fixed_nodes = next_fixed
+
+    return node_of, levels
+
+
+def detect_communities(nodes: Sequence[str], links: Sequence[Sequence[str]],
+                       known: Optional[Dict[str, str]] = None,
+                       min_size: int = 5, max_communities: int = 24,
+                       seed: int = 42, verbose: bool = True) -> Dict[str, str]:
+    """
+    Assign every node a community name.
+
+    nodes are unique names, links[i] the names node i connects to and known
+    maps nodes that already belong to a continent to its name. Returns
+    {node: community name}; known nodes keep their continent.
+    """
+    start = time.perf_counter()
+    known = known or {}
+    adjacency = build_adjacency(nodes, links)
+    degree = [sum(neighbours.values()) for neighbours in adjacency]
+    num_edges = sum(degree) // 2
+
+    # Apps of the same known continent start as one fixed group
+    group_of_known: Dict[str, int] = {}
+    groups = []
+    for i, name in enumerate(nodes):
+        continent = known.get(name)
+        groups.append(group_of_known.setdefault(continent, i) if continent else i)
+    fixed = [name in known for name in nodes]
+
+    labels, levels = louvain(adjacency, groups, fixed, seed=seed)
+    known_labels = {continent: labels[i] for continent, i in group_of_known.items()}
+    known_names = sorted(known_labels)
+
+    members = defaultdict(list)
+    for node, label in enumerate(labels):
+        members[label].append(node)
+
+    # Apps without connections (and not known) have nothing to cluster on
+    unconnected = [node for node in range(len(nodes)) if not fixed[node] and not degree[node]]
+    for node in unconnected:
+        members.pop(labels[node], None)
+
+    known_label_set = set(known_labels.values())
+
+    def is_known(label):
+        return label in known_label_set
+
+    # Merge small communities into the neighbour they link to most
+    # (smallest first, so chains of small communities collapse together)
+    for label in sorted(members, key=lambda l: (len(members[l]), l)):
+        group = members.get(label)
+        if group is None or is_known(label) or len(group) >= min_size:
+            continue
+        links_to = defaultdict(int)
+        for node in group:
+            for neighbour, weight in adjacency[node].items():
+                other = labels[neighbour]
+                if other != label and other in members:
+                    links_to[other] += weight
+        if not links_to:
+            continue
+        target = min(links_to, key=lambda l: (-links_to[l], l))
+        for node in group:
+            labels[node] = target
+        members[target].extend(group)
+        del members[label]
+
+    # Keep the largest discovered communities; ones that are still small
+    # (no neighbours to merge into) or beyond the limit become "Other"
+    discovered = sorted((label for label in members
+                         if not is_known(label) and len(members[label]) >= min_size),
+                        key=lambda l: (-len(members[l]), l))
+    kept = discovered[:max(0, max_communities - len(known_names))]
+
+    names = {label: name for name, label in known_labels.items()}
+    taken = set(known_names) | {UNCONNECTED, OTHER}
+    for label in kept:
+        hub = min(members[label], key=lambda node: (-degree[node], nodes[node]))
+        name = f"{nodes[hub]} community"
+        suffix = 2
+        while name in taken:
+            name = f"{nodes[hub]} community {suffix}"
+            suffix += 1
+        taken.add(name)
+        names[label] = name
+
+    result = {name: names.get(labels[node], OTHER) for node, name in enumerate(nodes)}
+    for node in unconnected:
+        result[nodes[node]] = UNCONNECTED
+
+    if verbose:
+        print(f"Detected {len(kept)} communities among {len(nodes)} apps "
+              f"({num_edges} links, {levels} levels) in {time.perf_counter() - start:.2f}s")
+        if unconnected:
+            print(f"  {len(unconnected)} apps without connections -> {UNCONNECTED}")
+        other = sum(1 for name in result.values() if name == OTHER)
+        if other:
+            print(f"  {other} apps in small communities -> {OTHER}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Derive business continents from app connections',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python communities.py discovery_feed.csv
+  python communities.py discovery_feed.csv -o with_business.csv
+  python continent_layout.py discovery_feed.csv --communities
+        """
+    )
+    parser.add_argument('input', help='Input CSV/TSV/XLSX file')
+    parser.add_argument('-o', '--output', default=None,
+                        help='Write the inventory with a filled-in business column here')
+    parser.add_argument('--min-size', type=int, default=5,
+                        help='Merge smaller communities into a neighbour (default: 5)')
+    parser.add_argument('--max-communities', type=int, default=24,
+                        help='Keep at most this many continents (default: 24)')
+    parser.add_argument('-s', '--seed', type=int, default=42,
+                        help='Seed for the visiting order (default: 42)')
+
+    args = parser.parse_args()
+
+    from continent_layout import assign_communities, load_inventory
+
+    try:
+        apps = load_inventory(args.input, verbose=False, require_business=False)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    assign_communities(apps, min_size=args.min_size,
+                       max_communities=args.max_communities, seed=args.seed)
+
+    sizes = defaultdict(int)
+    for app in apps:
+        sizes[app.business] += 1
+    for name, size in sorted(sizes.items(), key=lambda item: (-item[1], item[0])):
+        print(f"  {name}: {size}")
+
+    if args.output:
+        with open(args.output, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['app_name', 'business', 'status', 'description', 'connects_to'])
+            for app in apps:
+                writer.writerow([app.name, app.business, app.status, app.description,
+                                 ';'.join(app.connections)])
+        print(f"Written to: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -14,17 +14,35 @@ Usage:
 """
 
 import argparse
-import json
+import glob
+import io
 import math
+import os
 import random
 import hashlib
+import heapq
+import time
 from collections import defaultdict
-from dataclasses import dataclass, field
-from typing import Dict, List, Set, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, redirect_stdout
+from pathlib import Path
+from dataclasses import dataclass, field, replace
+from functools import partial
+from typing import Dict, Iterable, List, Set, Tuple, Optional
+
+from communities import build_adjacency, detect_communities
+from hexmap_geometry import add_geometry
+from hexmap_io import HAS_BROTLI, FileWatcher, gc_paused, write_json_atomic, write_layout
+from hexmap_svg import write_svg
+from layout_diff import delta_summary, diff_layouts
+from multilevel_layout import hex_to_xy, multilevel_layout
 
 # Hex directions for grid operations (pointy-top, odd-r offset)
 HEX_DIRECTIONS = [(1, 0), (0, 1), (-1, 1), (-1, 0), (0, -1), (1, -1)]
 
+# Separates levels of a sub_business path ("Cards > Issuing")
+NESTED_SEPARATOR = '>'
+
 # Business functions for test data (universal bank)
 BUSINESS_FUNCTIONS = [
     "Trading",
@@ -37,6 +55,21 @@ BUSINESS_FUNCTIONS = [
     "Technology & Infrastructure",
 ]
 
+# App name prefixes by business function (test data)
+APP_PREFIXES = {
+    "Trading": ["TRD", "FX", "EQ", "FI", "DERIV", "ALGO", "OMS", "EMS"],
+    "Risk Management": ["RISK", "VAR", "CREDIT", "MARKET", "OPS", "STRESS", "LIMIT"],
+    "Retail Banking": ["RET", "ACCT", "LOAN", "MORT", "SAVE", "CHECK", "MOBILE"],
+    "Wealth Management": ["WM", "PORT", "INVEST", "TRUST", "PLAN", "ADV"],
+    "Cards & Payments": ["CARD", "PAY", "AUTH", "FRAUD", "SETTLE", "CLEAR"],
+    "Corporate Banking": ["CORP", "LEND", "CASH", "TRADE", "FIN", "TREAS"],
+    "Operations": ["OPS", "SETTLE", "RECON", "CONFIRM", "CUSTODY", "CLEAR"],
+    "Technology & Infrastructure": ["INFRA", "DATA", "API", "SEC", "CLOUD", "NET"],
+}
+
+APP_SUFFIXES = ["Hub", "Engine", "Platform", "Service", "System", "Gateway",
+                "Manager", "Processor", "Core", "Plus", "Pro", "Central"]
+
 # Color palette for continents
 CONTINENT_COLORS = [
     "#1f78b4",  # Blue - Trading
@@ -49,6 +82,21 @@ CONTINENT_COLORS = [
     "#fdbf6f",  # Light Orange - Tech
 ]
 
+# Weights for combining layout quality metrics into one score (lower is better)
+SCORE_WEIGHTS = {
+    "connection_length": 1.0,   # Total hex distance along app connections
+    "gap_violations": 50.0,     # Hexes closer to another continent than allowed
+    "unmet_target": 20.0,       # Territory hexes short of target_size
+    "unplaced_apps": 100.0,     # Apps left without a position
+    "bbox_area": 0.1,           # Area of the map's bounding box
+}
+
+# Initial centroid jitter used by --search-seeds when --jitter is not given
+DEFAULT_SEARCH_JITTER = 8.0
+
+# How apps are placed within territories (see ContinentLayoutEngine._place_apps)
+PLACEMENTS = ('spiral', 'multilevel')
+
 
 @dataclass
 class App:
@@ -61,6 +109,8 @@ class App:
     description: str = ""
     grid_position: Optional[Tuple[int, int]] = None
     show_position_indicator: bool = False  # Dot marker on hexagon
+    region: str = ""  # Optional, used to filter batch maps
+    sub_business: str = ""  # Optional sub-continent path ("Cards > Issuing")
 
     # Calculated properties
     external_connection_count: int = 0  # Connections to other businesses
@@ -82,6 +132,9 @@ class Continent:
     # Connections to other continents (for force calculation)
     connections: Dict[str, int] = field(default_factory=dict)  # continent_id -> strength
 
+    # Nested continents inside this one (hierarchical layouts only)
+    subcontinents: List['Continent'] = field(default_factory=list)
+
 
 class ContinentLayoutEngine:
     """
@@ -95,7 +148,15 @@ class ContinentLayoutEngine:
                  force_iterations: int = 100,   # Force-directed iterations
                  seed: int = 42,                # Random seed for reproducibility
                  collision_rate: float = 0.01,  # % of apps to create collisions for (~1 collision)
-                 indicator_rate: float = 0.15): # % of apps to show position indicators
+                 indicator_rate: float = 0.15,  # % of apps to show position indicators
+                 jitter: float = 0.0,           # Max seeded offset of initial centroids
+                 hierarchical: bool = False,    # Nest sub-continents by sub_business
+                 nested_gap: int = 1,           # Gap between sub-continents
+                 placement: str = 'spiral',     # App placement, one of PLACEMENTS
+                 verbose: bool = True):         # Print progress while laying out
+
+        if placement not in PLACEMENTS:
+            raise ValueError(f"Unknown placement {placement!r} (expected one of {PLACEMENTS})")
 
         self.water_gap = water_gap
         self.connected_gap = connected_gap
@@ -104,16 +165,35 @@ class ContinentLayoutEngine:
         self.seed = seed
         self.collision_rate = collision_rate
         self.indicator_rate = indicator_rate
+        self.jitter = jitter
+        self.hierarchical = hierarchical
+        self.nested_gap = nested_gap
+        self.placement = placement
+        self.verbose = verbose
 
         self.apps: Dict[str, App] = {}
         self.continents: Dict[str, Continent] = {}
-        self.occupied_hexes: Set[Tuple[int, int]] = set()
+        # Owner continent id of every claimed hex
+        self.hex_owner: Dict[Tuple[int, int], str] = {}
+        self._gap_offsets_cache = self._gap_offsets()
+        self.last_update_incremental = False
 
-        random.seed(seed)
+        # Per-engine RNG so concurrent engines never share random state
+        self.rng = random.Random(seed)
+
+    def _log(self, message: str):
+        if self.verbose:
+            print(message)
 
     def load_apps(self, apps: List[App]):
         """Load applications and organize by continent."""
+        # Work on copies so a layout never mutates the caller's App objects
+        self._load_own_apps([replace(app, connections=list(app.connections)) for app in apps])
+
+    def _load_own_apps(self, apps: List[App]):
+        """load_apps for apps the engine may modify."""
         self.apps = {app.id: app for app in apps}
+        self.continents = {}
 
         # Group apps by business function
         business_apps = defaultdict(list)
@@ -179,12 +259,25 @@ class ContinentLayoutEngine:
         y = (int(h[8:16], 16) / 0xFFFFFFFF - 0.5) * scale
         return (x, y)
 
+    def _shows_indicator(self, app_id: str) -> bool:
+        """
+        Whether an app gets a position indicator: a deterministic draw from the
+        seed and app id, so adding or moving one app never flips another's.
+        """
+        h = hashlib.md5(f"{self.seed}:{app_id}".encode()).hexdigest()
+        return int(h[:8], 16) / 0xFFFFFFFF < self.indicator_rate
+
     def _position_continent_centroids(self):
         """Use force-directed layout to position continent centroids."""
         # Initialize positions from name hash (deterministic)
         positions = {}
         for continent in self.continents.values():
-            positions[continent.id] = self._hash_position(continent.name)
+            x, y = self._hash_position(continent.name)
+            if self.jitter > 0:
+                # Seeded perturbation, used to explore alternative layouts
+                x += self.rng.uniform(-self.jitter, self.jitter)
+                y += self.rng.uniform(-self.jitter, self.jitter)
+            positions[continent.id] = (x, y)
 
         # Force-directed iterations
         for iteration in range(self.force_iterations):
@@ -268,18 +361,18 @@ class ContinentLayoutEngine:
         # Find nearest unoccupied hex to start
         start_q, start_r = self._find_nearest_empty(start_q, start_r)
 
+        # Frontier as a heap ordered by distance to centroid (grow roughly
+        # circular), ties in insertion order
         territory = set()
-        frontier = [(start_q, start_r)]
+        frontier = [((start_q - cx)**2 + (start_r - cy)**2, 0, start_q, start_r)]
         visited = {(start_q, start_r)}
+        pushed = 1
 
         while len(territory) < continent.target_size and frontier:
-            # Sort frontier by distance to centroid (grow roughly circular)
-            frontier.sort(key=lambda h: (h[0]-cx)**2 + (h[1]-cy)**2)
-
-            q, r = frontier.pop(0)
+            _, _, q, r = heapq.heappop(frontier)
 
             # Check if this hex is available
-            if (q, r) in self.occupied_hexes:
+            if (q, r) in self.hex_owner:
                 continue
 
             # Check water gap from other continents
@@ -288,41 +381,49 @@ class ContinentLayoutEngine:
 
             # Claim this hex
             territory.add((q, r))
-            self.occupied_hexes.add((q, r))
+            self.hex_owner[(q, r)] = continent.id
 
             # Add neighbors to frontier
             for dq, dr in HEX_DIRECTIONS:
                 nq, nr = q + dq, r + dr
                 if (nq, nr) not in visited:
                     visited.add((nq, nr))
-                    frontier.append((nq, nr))
+                    heapq.heappush(frontier, ((nq - cx)**2 + (nr - cy)**2, pushed, nq, nr))
+                    pushed += 1
 
         return territory
 
+    def _gap_offsets(self) -> List[Tuple[int, int, int]]:
+        """(dq, dr, distance) of every hex closer than the largest required gap."""
+        max_gap = max(self.water_gap, self.connected_gap)
+        offsets = []
+        for dq in range(-max_gap, max_gap + 1):
+            for dr in range(-max_gap, max_gap + 1):
+                dist = self._hex_distance(0, 0, dq, dr)
+                if 0 < dist < max_gap:
+                    offsets.append((dq, dr, dist))
+        return offsets
+
     def _too_close_to_others(self, q: int, r: int, my_continent_id: str) -> bool:
         """Check if hex is too close to another continent's territory."""
         my_continent = self.continents[my_continent_id]
 
-        for other in self.continents.values():
-            if other.id == my_continent_id:
-                continue
-
-            if not other.territory:
+        # Only hexes within the largest gap can conflict, so look those up
+        # in the owner index rather than scanning every other territory
+        for dq, dr, dist in self._gap_offsets_cache:
+            owner = self.hex_owner.get((q + dq, r + dr))
+            if owner is None or owner == my_continent_id:
                 continue
 
             # Determine required gap
             connection_strength = (
-                my_continent.connections.get(other.id, 0) +
-                other.connections.get(my_continent_id, 0)
+                my_continent.connections.get(owner, 0) +
+                self.continents[owner].connections.get(my_continent_id, 0)
             )
 
             required_gap = self.connected_gap if connection_strength > 0 else self.water_gap
-
-            # Check distance to other's territory
-            for oq, or_ in other.territory:
-                dist = self._hex_distance(q, r, oq, or_)
-                if dist < required_gap:
-                    return True
+            if dist < required_gap:
+                return True
 
         return False
 
@@ -338,14 +439,14 @@ class ContinentLayoutEngine:
 
     def _find_nearest_empty(self, q: int, r: int) -> Tuple[int, int]:
         """Find nearest unoccupied hex using spiral search."""
-        if (q, r) not in self.occupied_hexes:
+        if (q, r) not in self.hex_owner:
             return (q, r)
 
         for radius in range(1, 100):
             for dq in range(-radius, radius + 1):
                 for dr in range(-radius, radius + 1):
                     nq, nr = q + dq, r + dr
-                    if (nq, nr) not in self.occupied_hexes:
+                    if (nq, nr) not in self.hex_owner:
                         return (nq, nr)
 
         return (q, r)
@@ -380,10 +481,12 @@ class ContinentLayoutEngine:
 
         assigned = set()
         assigned_positions = []  # Track for collision creation
+        # Hexes before each list's cursor are all assigned, so every search
+        # resumes there instead of rescanning from the start
+        cursors = {id(territory_by_distance): 0, id(territory_center_first): 0}
 
         for app in sorted_apps:
-            # Randomly assign position indicator
-            if random.random() < self.indicator_rate:
+            if self._shows_indicator(app.id):
                 app.show_position_indicator = True
 
             # Choose position based on externality
@@ -395,24 +498,19 @@ class ContinentLayoutEngine:
                 candidates = territory_center_first
 
             # Find first unassigned hex
-            for hex_pos in candidates:
-                if hex_pos not in assigned:
-                    app.grid_position = hex_pos
-                    assigned.add(hex_pos)
-                    assigned_positions.append(hex_pos)
-                    break
-
-
-    def generate_layout(self) -> Dict:
-        """Generate the complete layout."""
-        print(f"Generating layout for {len(self.continents)} continents, {len(self.apps)} apps")
-
-        # Phase 1: Position continent centroids
-        print("Phase 1: Positioning continent centroids...")
-        self._position_continent_centroids()
-
-        # Phase 2: Grow territories (in order of size, largest first)
-        print("Phase 2: Growing territories...")
+            i = cursors[id(candidates)]
+            while i < len(candidates) and candidates[i] in assigned:
+                i += 1
+            cursors[id(candidates)] = i
+            if i < len(candidates):
+                hex_pos = candidates[i]
+                app.grid_position = hex_pos
+                assigned.add(hex_pos)
+                assigned_positions.append(hex_pos)
+
+
+    def _grow_territories(self):
+        """Grow all territories, largest continent first."""
         sorted_continents = sorted(
             self.continents.values(),
             key=lambda c: c.target_size,
@@ -420,51 +518,367 @@ class ContinentLayoutEngine:
         )
 
         for continent in sorted_continents:
+            if self._is_nested(continent):
+                self._compose_subcontinents(continent)
+                self._log(f"  {continent.name}: {len(continent.territory)} hexes "
+                          f"in {len(continent.subcontinents)} sub-continents")
+                continue
             continent.territory = self._grow_territory(continent)
-            print(f"  {continent.name}: {len(continent.territory)} hexes "
+            self._log(f"  {continent.name}: {len(continent.territory)} hexes "
                   f"(target: {continent.target_size})")
 
-        # Phase 3: Place apps within territories
-        print("Phase 3: Placing apps...")
-        for continent in self.continents.values():
+    def _is_nested(self, continent: Continent) -> bool:
+        return self.hierarchical and any(app.sub_business for app in continent.apps)
+
+    def _compose_subcontinents(self, continent: Continent):
+        """
+        Lay out a continent as nested sub-continents.
+
+        A child engine lays out the continent's apps grouped by the first
+        level of their sub_business (recursing for deeper levels), so each
+        level only grows small territories. The child's combined territory
+        is then placed as close to this continent's centroid as the gaps to
+        the continents placed before it allow.
+        """
+        child_apps = []
+        for app in continent.apps:
+            head, _, rest = app.sub_business.partition(NESTED_SEPARATOR)
+            child_apps.append(replace(app, business=head.strip() or continent.name,
+                                      sub_business=rest.strip(),
+                                      connections=list(app.connections)))
+
+        child = ContinentLayoutEngine(
+            water_gap=self.nested_gap,
+            connected_gap=self.nested_gap,
+            padding_ratio=self.padding_ratio,
+            force_iterations=self.force_iterations,
+            seed=self.seed,
+            collision_rate=0,
+            indicator_rate=self.indicator_rate,
+            jitter=self.jitter,
+            hierarchical=True,
+            nested_gap=self.nested_gap,
+            placement=self.placement,
+            verbose=False
+        )
+        child._load_own_apps(child_apps)
+        child._lay_out()
+
+        footprint = set(child.hex_owner)
+        if not footprint:
+            return
+        mean_q = int(round(sum(h[0] for h in footprint) / len(footprint)))
+        mean_r = int(round(sum(h[1] for h in footprint) / len(footprint)))
+        cx, cy = continent.centroid
+        dq, dr = self._free_offset(continent, footprint,
+                                   int(round(cx)) - mean_q, int(round(cy)) - mean_r)
+
+        continent.territory = {(q + dq, r + dr) for q, r in footprint}
+        self.hex_owner.update(dict.fromkeys(continent.territory, continent.id))
+
+        for child_app in child.apps.values():
+            app = self.apps[child_app.id]
+            if child_app.grid_position:
+                q, r = child_app.grid_position
+                app.grid_position = (q + dq, r + dr)
+            app.show_position_indicator = child_app.show_position_indicator
+
+        continent.subcontinents = [
+            self._adopt_subcontinent(sub, continent, dq, dr)
+            for sub in sorted(child.continents.values(), key=lambda c: c.name)
+        ]
+
+    def _adopt_subcontinent(self, sub: Continent, parent: Continent,
+                            dq: int, dr: int) -> Continent:
+        """A child engine's continent, moved by (dq, dr) and renamed under parent."""
+        def nested_id(child_id):
+            return parent.id + child_id[len("continent"):]
+
+        return replace(
+            sub,
+            id=nested_id(sub.id),
+            color=parent.color,
+            apps=[self.apps[app.id] for app in sub.apps],
+            centroid=(sub.centroid[0] + dq, sub.centroid[1] + dr),
+            territory={(q + dq, r + dr) for q, r in sub.territory},
+            connections={nested_id(cid): n for cid, n in sub.connections.items()},
+            subcontinents=[self._adopt_subcontinent(s, parent, dq, dr)
+                           for s in sub.subcontinents],
+        )
+
+    def _free_offset(self, continent: Continent, footprint: Set[Tuple[int, int]],
+                     base_q: int, base_r: int) -> Tuple[int, int]:
+        """
+        Nearest offset to (base_q, base_r) at which footprint overlaps no
+        claimed hex and keeps the required gaps to other continents.
+        """
+        # Any hex too close to the footprint is also too close to one of
+        # its boundary hexes, so only those need the gap check
+        boundary = [(q, r) for q, r in footprint
+                    if any((q + a, r + b) not in footprint for a, b in HEX_DIRECTIONS)]
+
+        def conflicts(q, r):
+            return (q, r) in self.hex_owner or self._too_close_to_others(q, r, continent.id)
+
+        # Neighbouring offsets tend to fail on the same hex, so the hex that
+        # rejected the previous offset is checked first
+        last_conflict = boundary[0]
+        radius = 0
+        while True:
+            for oq, or_ in self._hex_ring(base_q, base_r, radius):
+                if conflicts(last_conflict[0] + oq, last_conflict[1] + or_):
+                    continue
+                conflict = next((h for h in boundary if conflicts(h[0] + oq, h[1] + or_)), None)
+                if conflict is not None:
+                    last_conflict = conflict
+                    continue
+                if not any((q + oq, r + or_) in self.hex_owner for q, r in footprint):
+                    return oq, or_
+            radius += 1
+
+    @staticmethod
+    def _hex_ring(q: int, r: int, radius: int):
+        """Hexes at exactly radius steps from (q, r)."""
+        if radius == 0:
+            yield (q, r)
+            return
+        q += HEX_DIRECTIONS[4][0] * radius
+        r += HEX_DIRECTIONS[4][1] * radius
+        for dq, dr in HEX_DIRECTIONS:
+            for _ in range(radius):
+                yield (q, r)
+                q, r = q + dq, r + dr
+
+    def _place_apps(self):
+        """Place apps within every continent's territory."""
+        # Apps of nested continents were placed by their sub-continents
+        continents = [c for c in self.continents.values() if not c.subcontinents]
+        if self.placement == 'multilevel':
+            self._place_apps_multilevel(continents)
+            return
+        for continent in continents:
             self._place_apps_in_territory(continent)
 
+    def _place_apps_multilevel(self, continents: List[Continent]):
+        """
+        Place apps so connected apps sit close together (see multilevel_layout.py).
+
+        Unlike the spiral placement, this uses every app-to-app connection,
+        including those to apps in other continents.
+        """
+        continents = [c for c in continents if c.territory]
+        apps = [app for continent in continents for app in continent.apps]
+        territories = [sorted(continent.territory) for continent in continents]
+        group = [i for i, continent in enumerate(continents) for _ in continent.apps]
+
+        adjacency = build_adjacency([app.id for app in apps], [app.connections for app in apps])
+        stats = {}
+        cells = multilevel_layout(adjacency, group,
+                                  [[hex_to_xy(q, r) for q, r in hexes] for hexes in territories],
+                                  seed=self.seed, stats=stats)
+        self._log(f"  Multilevel placement: {len(stats['levels'])} levels "
+                  f"({' -> '.join(str(n) for n in stats['levels'])} nodes)")
+
+        for app, g, c in zip(apps, group, cells):
+            if self._shows_indicator(app.id):
+                app.show_position_indicator = True
+            if c >= 0:
+                app.grid_position = territories[g][c]
+
+    def _create_collisions(self):
+        """Create demo collisions (two apps on one hex within the same cluster)."""
+        if self.collision_rate <= 0:
+            return
+
+        total_apps = sum(len(c.apps) for c in self.continents.values())
+        num_collisions = max(1, int(total_apps * self.collision_rate))
+        collisions_created = 0
+
+        # Find clusters with enough apps for internal collision
+        for continent in self.continents.values():
+            if collisions_created >= num_collisions:
+                break
+            apps_with_pos = [a for a in continent.apps if a.grid_position]
+            if len(apps_with_pos) >= 3:
+                # Create collision within this cluster
+                apps_with_pos[0].grid_position = apps_with_pos[1].grid_position
+                collisions_created += 1
+                self._log(f"  Created collision in {continent.name}")
+
+        if collisions_created > 0:
+            self._log(f"  Total: {collisions_created} collision(s)")
+
+    @staticmethod
+    @contextmanager
+    def _timed(name: str, timings: Optional[Dict[str, float]]):
+        """Record the wall time of a block into ``timings`` (if given)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if timings is not None:
+                timings[name] = time.perf_counter() - start
+
+    def generate_layout(self, timings: Optional[Dict[str, float]] = None) -> Dict:
+        """
+        Generate the complete layout.
+
+        If a ``timings`` dict is passed, the wall time of each phase (in
+        seconds) is recorded into it under the phase name.
+
+        All state lives on the engine, so separate engines can run in
+        parallel threads, and calling this again gives the same layout.
+        """
+        self._lay_out(timings)
+
+        # Phase 4: Build output
+        self._log("Phase 4: Building output...")
+        with self._timed("output", timings):
+            return self._build_output()
+
+    def _lay_out(self, timings: Optional[Dict[str, float]] = None):
+        """Phases 1-3 of generate_layout: position, grow and place."""
+        self.rng = random.Random(self.seed)
+        self.hex_owner = {}
+        self._gap_offsets_cache = self._gap_offsets()
+        for continent in self.continents.values():
+            continent.territory = set()
+            continent.subcontinents = []
+
+        self._log(f"Generating layout for {len(self.continents)} continents, {len(self.apps)} apps")
+
+        # Phase 1: Position continent centroids
+        self._log("Phase 1: Positioning continent centroids...")
+        with self._timed("centroids", timings):
+            self._position_continent_centroids()
+
+        # Phase 2: Grow territories (in order of size, largest first)
+        self._log("Phase 2: Growing territories...")
+        with self._timed("territories", timings):
+            self._grow_territories()
+
+        # Phase 3: Place apps within territories
+        self._log("Phase 3: Placing apps...")
+        with self._timed("placement", timings):
+            self._place_apps()
+
         # Phase 3b: Create a single collision for demo purposes (within same cluster)
-        if self.collision_rate > 0:
-            total_apps = sum(len(c.apps) for c in self.continents.values())
-            num_collisions = max(1, int(total_apps * self.collision_rate))
-            collisions_created = 0
-
-            # Find clusters with enough apps for internal collision
-            for continent in self.continents.values():
-                if collisions_created >= num_collisions:
+        with self._timed("collisions", timings):
+            self._create_collisions()
+
+    def territories(self) -> Dict[str, Tuple[Tuple[float, float], Set[Tuple[int, int]]]]:
+        """Centroid and territory hexes per business name, after a layout."""
+        return {c.name: (c.centroid, set(c.territory))
+                for c in self.continents.values() if c.territory}
+
+    def update_layout(self, apps: List[App],
+                      timings: Optional[Dict[str, float]] = None,
+                      territories: Optional[Dict] = None) -> Dict:
+        """
+        Re-lay out after an inventory change, keeping existing territories.
+
+        If the set of businesses is unchanged and every continent's
+        territory still has room for its apps, centroids and territories
+        are reused and only app placement is redone. Otherwise (or on the
+        first call) a full layout is generated. Sets last_update_incremental
+        to say which path was taken.
+
+        territories (as returned by territories()) replaces the engine's
+        own, e.g. to continue from a layout persisted by another process.
+        """
+        previous = territories if territories is not None else self.territories()
+        self.load_apps(apps)
+
+        # Reusing territories would flatten nested layouts, so those always rerun
+        reusable = bool(previous) and not any(
+            self._is_nested(c) for c in self.continents.values()
+        ) and set(previous) == {
+            c.name for c in self.continents.values()
+        } and all(
+            len(previous[c.name][1]) >= len(c.apps)
+            for c in self.continents.values()
+        )
+
+        self.last_update_incremental = reusable
+        if not reusable:
+            return self.generate_layout(timings)
+
+        self._log(f"Updating layout for {len(self.continents)} continents, "
+                  f"{len(self.apps)} apps (reusing territories)")
+        self.rng = random.Random(self.seed)
+        self.hex_owner = {}
+        for continent in self.continents.values():
+            continent.centroid, continent.territory = previous[continent.name]
+            self.hex_owner.update(dict.fromkeys(continent.territory, continent.id))
+
+        with self._timed("placement", timings):
+            self._place_apps()
+        with self._timed("collisions", timings):
+            self._create_collisions()
+        with self._timed("output", timings):
+            return self._build_output()
+
+    def layout_metrics(self) -> Dict[str, float]:
+        """
+        Measure the quality of the current layout (after generate_layout).
+
+        Returns the raw metrics named in SCORE_WEIGHTS plus their weighted
+        sum as "score"; lower is better.
+        """
+        positions = {app.id: app.grid_position
+                     for app in self.apps.values() if app.grid_position}
+
+        connection_length = 0
+        for app_id, (q, r) in positions.items():
+            for target_id in self.apps[app_id].connections:
+                target = positions.get(target_id)
+                if target:
+                    connection_length += self._hex_distance(q, r, target[0], target[1])
+
+        hex_owner = {}
+        for continent in self.continents.values():
+            for hex_pos in continent.territory:
+                hex_owner[hex_pos] = continent.id
+
+        gap_offsets = self._gap_offsets()
+        gap_violations = 0
+        for (q, r), owner in hex_owner.items():
+            for dq, dr, dist in gap_offsets:
+                other = hex_owner.get((q + dq, r + dr))
+                if other is None or other == owner:
+                    continue
+                connected = (self.continents[owner].connections.get(other, 0) +
+                             self.continents[other].connections.get(owner, 0)) > 0
+                required_gap = self.connected_gap if connected else self.water_gap
+                if dist < required_gap:
+                    gap_violations += 1
                     break
-                apps_with_pos = [a for a in continent.apps if a.grid_position]
-                if len(apps_with_pos) >= 3:
-                    # Create collision within this cluster
-                    apps_with_pos[0].grid_position = apps_with_pos[1].grid_position
-                    collisions_created += 1
-                    print(f"  Created collision in {continent.name}")
 
-            if collisions_created > 0:
-                print(f"  Total: {collisions_created} collision(s)")
+        unmet_target = sum(max(0, c.target_size - len(c.territory))
+                           for c in self.continents.values())
 
-        # Phase 4: Build output
-        print("Phase 4: Building output...")
-        return self._build_output()
+        if hex_owner:
+            qs = [h[0] for h in hex_owner]
+            rs = [h[1] for h in hex_owner]
+            bbox_area = (max(qs) - min(qs) + 1) * (max(rs) - min(rs) + 1)
+        else:
+            bbox_area = 0
+
+        metrics = {
+            "connection_length": connection_length,
+            "gap_violations": gap_violations,
+            "unmet_target": unmet_target,
+            "unplaced_apps": len(self.apps) - len(positions),
+            "bbox_area": bbox_area,
+        }
+        metrics["score"] = sum(SCORE_WEIGHTS[name] * value for name, value in metrics.items())
+        return metrics
 
     def _build_output(self) -> Dict:
         """Build HexMap-compatible JSON output."""
         clusters = []
 
         for continent in sorted(self.continents.values(), key=lambda c: c.name):
-            # Calculate actual centroid from territory
-            if continent.territory:
-                avg_q = sum(h[0] for h in continent.territory) / len(continent.territory)
-                avg_r = sum(h[1] for h in continent.territory) / len(continent.territory)
-            else:
-                avg_q, avg_r = continent.centroid
-
             apps_data = []
             for app in continent.apps:
                 if app.grid_position:
@@ -493,36 +907,52 @@ class ContinentLayoutEngine:
                 "name": continent.name,
                 "color": continent.color,
                 "hexCount": len(apps_data),
-                "gridPosition": {
-                    "q": int(round(avg_q)),
-                    "r": int(round(avg_r))
-                },
+                "gridPosition": self._territory_center(continent),
                 "priority": "Normal",
                 "applications": apps_data
             }
+            if continent.subcontinents:
+                cluster["subClusters"] = [self._subcluster_output(sub)
+                                          for sub in continent.subcontinents]
             clusters.append(cluster)
 
         return {"clusters": clusters}
 
+    @staticmethod
+    def _territory_center(continent: Continent) -> Dict[str, int]:
+        """Actual centroid of a continent's territory, as a grid position."""
+        if continent.territory:
+            avg_q = sum(h[0] for h in continent.territory) / len(continent.territory)
+            avg_r = sum(h[1] for h in continent.territory) / len(continent.territory)
+        else:
+            avg_q, avg_r = continent.centroid
+        return {"q": int(round(avg_q)), "r": int(round(avg_r))}
+
+    def _subcluster_output(self, sub: Continent) -> Dict:
+        """Nested cluster structure: ids and positions; apps stay in the top cluster."""
+        data = {
+            "id": sub.id,
+            "name": sub.name,
+            "hexCount": sum(1 for app in sub.apps if app.grid_position),
+            "gridPosition": self._territory_center(sub),
+        }
+        if sub.subcontinents:
+            data["subClusters"] = [self._subcluster_output(s) for s in sub.subcontinents]
+        else:
+            data["applicationIds"] = [app.id for app in sub.apps if app.grid_position]
+        return data
 
-def generate_test_data(num_apps: int = 200, seed: int = 42) -> List[App]:
-    """Generate realistic test data for a universal bank."""
-    random.seed(seed)
 
-    # App name prefixes by business function
-    app_prefixes = {
-        "Trading": ["TRD", "FX", "EQ", "FI", "DERIV", "ALGO", "OMS", "EMS"],
-        "Risk Management": ["RISK", "VAR", "CREDIT", "MARKET", "OPS", "STRESS", "LIMIT"],
-        "Retail Banking": ["RET", "ACCT", "LOAN", "MORT", "SAVE", "CHECK", "MOBILE"],
-        "Wealth Management": ["WM", "PORT", "INVEST", "TRUST", "PLAN", "ADV"],
-        "Cards & Payments": ["CARD", "PAY", "AUTH", "FRAUD", "SETTLE", "CLEAR"],
-        "Corporate Banking": ["CORP", "LEND", "CASH", "TRADE", "FIN", "TREAS"],
-        "Operations": ["OPS", "SETTLE", "RECON", "CONFIRM", "CUSTODY", "CLEAR"],
-        "Technology & Infrastructure": ["INFRA", "DATA", "API", "SEC", "CLOUD", "NET"],
-    }
+def generate_test_data(num_apps: int = 200, seed: int = 42,
+                       max_internal: int = 3,
+                       external_rate: float = 0.4) -> List[App]:
+    """
+    Generate realistic test data for a universal bank.
 
-    app_suffixes = ["Hub", "Engine", "Platform", "Service", "System", "Gateway",
-                    "Manager", "Processor", "Core", "Plus", "Pro", "Central"]
+    Each app gets 0..max_internal connections within its business, and
+    with probability external_rate a further 0-2 cross-business connections.
+    """
+    rng = random.Random(seed)
 
     # Distribute apps across businesses (roughly)
     apps_per_business = {}
@@ -536,7 +966,7 @@ def generate_test_data(num_apps: int = 200, seed: int = 42) -> List[App]:
             # Vary the distribution a bit
             base = num_apps // len(businesses)
             variance = int(base * 0.5)
-            count = base + random.randint(-variance, variance)
+            count = base + rng.randint(-variance, variance)
             count = max(5, min(count, remaining - (len(businesses) - i - 1) * 5))
             apps_per_business[business] = count
             remaining -= count
@@ -548,14 +978,18 @@ def generate_test_data(num_apps: int = 200, seed: int = 42) -> List[App]:
     app_ids = set()
 
     for business, count in apps_per_business.items():
-        prefixes = app_prefixes[business]
+        prefixes = APP_PREFIXES[business]
+
+        # Widen the numeric range for large businesses so the name space
+        # never runs out (small datasets keep the original 1-99 range)
+        max_num = max(99, math.ceil(2 * count / (len(prefixes) * len(APP_SUFFIXES))))
 
         for i in range(count):
             # Generate unique app name
             while True:
-                prefix = random.choice(prefixes)
-                suffix = random.choice(app_suffixes)
-                num = random.randint(1, 99)
+                prefix = rng.choice(prefixes)
+                suffix = rng.choice(APP_SUFFIXES)
+                num = rng.randint(1, max_num)
                 app_id = f"{prefix}_{suffix}_{num}".replace(" ", "_")
                 if app_id not in app_ids:
                     app_ids.add(app_id)
@@ -565,7 +999,7 @@ def generate_test_data(num_apps: int = 200, seed: int = 42) -> List[App]:
                 id=app_id,
                 name=app_id.replace("_", " "),
                 business=business,
-                status=random.randint(50, 100),
+                status=rng.randint(50, 100),
                 description=f"{business} application"
             )
             apps.append(app)
@@ -575,32 +1009,194 @@ def generate_test_data(num_apps: int = 200, seed: int = 42) -> List[App]:
     # 2. External connections (cross-business) - less common, but important
 
     app_by_business = defaultdict(list)
+    business_index = {}
     for app in apps:
+        business_index[app.id] = len(app_by_business[app.business])
         app_by_business[app.business].append(app)
 
     for app in apps:
-        num_internal = random.randint(0, 3)
-        num_external = random.randint(0, 2) if random.random() < 0.4 else 0
-
-        # Internal connections
-        same_business = [a for a in app_by_business[app.business] if a.id != app.id]
-        if same_business:
-            for target in random.sample(same_business, min(num_internal, len(same_business))):
+        num_internal = rng.randint(0, max_internal)
+        num_external = rng.randint(0, 2) if rng.random() < external_rate else 0
+
+        # Internal connections: sample indices into the business list with
+        # this app left out, rather than copying the list for every app
+        same_business = app_by_business[app.business]
+        own_index = business_index[app.id]
+        num_others = len(same_business) - 1
+        if num_others > 0:
+            for i in rng.sample(range(num_others), min(num_internal, num_others)):
+                target = same_business[i if i < own_index else i + 1]
                 app.connections.append(target.id)
 
         # External connections
         if num_external > 0:
             other_businesses = [b for b in BUSINESS_FUNCTIONS if b != app.business]
             for _ in range(num_external):
-                other_biz = random.choice(other_businesses)
+                other_biz = rng.choice(other_businesses)
                 if app_by_business[other_biz]:
-                    target = random.choice(app_by_business[other_biz])
+                    target = rng.choice(app_by_business[other_biz])
                     app.connections.append(target.id)
 
     return apps
 
 
-def load_from_csv(filepath: str) -> List[App]:
+# Per-process state for search_seeds workers (set once by the pool initializer)
+_search_apps: List[App] = []
+_search_engine_kwargs: Dict = {}
+
+
+def _init_search_worker(apps: List[App], engine_kwargs: Dict):
+    global _search_apps, _search_engine_kwargs
+    _search_apps = apps
+    _search_engine_kwargs = engine_kwargs
+
+
+def _layout_with_seed(seed: int) -> Tuple[int, Dict[str, float], Dict]:
+    """Search worker: lay out the shared apps with one seed."""
+    engine = ContinentLayoutEngine(seed=seed, verbose=False, **_search_engine_kwargs)
+    engine.load_apps(_search_apps)
+    output = engine.generate_layout()
+    return seed, engine.layout_metrics(), output
+
+
+def search_seeds(apps: List[App], seeds: List[int], jobs: int = 1,
+                 **engine_kwargs) -> Tuple[Tuple[int, Dict[str, float], Dict],
+                                           List[Tuple[int, Dict[str, float]]]]:
+    """
+    Lay out the same apps once per seed across a process pool.
+
+    Returns ((best_seed, best_metrics, best_output), [(seed, metrics), ...]).
+    The best layout has the lowest score; ties go to the lower seed, so the
+    result does not depend on the number of jobs.
+    """
+    best = None
+    results = []
+
+    with ProcessPoolExecutor(max_workers=jobs,
+                             initializer=_init_search_worker,
+                             initargs=(apps, engine_kwargs)) as pool:
+        for seed, metrics, output in pool.map(_layout_with_seed, seeds):
+            results.append((seed, metrics))
+            if best is None or (metrics["score"], seed) < (best[1]["score"], best[0]):
+                best = (seed, metrics, output)
+
+    return best, results
+
+
+# Accepted column names per field, in priority order. Includes the aliases of
+# convert_to_hexmap.py's normalize_columns, so exports written for either
+# tool load the same way.
+COLUMN_ALIASES = {
+    'app_name': ('app_name', 'app', 'application', 'name', 'application_name'),
+    'business': ('business', 'cluster', 'group', 'domain', 'business_function',
+                 'cluster_name', 'group_name', 'category'),
+    'status': ('status', 'health', 'score', 'health_score'),
+    'description': ('description', 'desc', 'details'),
+    'connects_to': ('connects_to', 'connections', 'dependencies', 'linked_to'),
+    'show_indicator': ('show_indicator', 'indicator'),
+    'region': ('region', 'geography', 'location'),
+    'sub_business': ('sub_business', 'sub_domain', 'subdomain', 'capability',
+                     'sub_function'),
+}
+
+
+def _column_value(row: Dict[str, str], field_name: str) -> str:
+    """First non-empty value among a field's aliases."""
+    for alias in COLUMN_ALIASES[field_name]:
+        value = row.get(alias)
+        if value:
+            return value
+    return ''
+
+
+def apps_from_rows(rows: Iterable[Dict[str, str]], start_row: int = 2,
+                   require_business: bool = True) -> List[App]:
+    """
+    Build apps from CSV-style rows (dicts keyed by column name).
+
+    Column names are normalized and the usual aliases accepted (see
+    load_from_csv). Rows without an app name or business, and duplicate
+    app names, are skipped with a warning; start_row is the row number
+    reported for the first row. With require_business=False, rows without
+    a business are kept with an empty one (see assign_communities).
+    """
+    apps = []
+    app_ids = set()
+    fieldnames_map = {}
+
+    for row_num, row in enumerate(rows, start=start_row):
+        # Normalize keys (cached per distinct column name)
+        normalized_row = {}
+        for k, v in row.items():
+            if k is None:
+                continue
+            if k not in fieldnames_map:
+                fieldnames_map[k] = k.lower().strip().replace(' ', '_').replace('-', '_')
+            normalized_row[fieldnames_map[k]] = v
+
+        # Get app name (required)
+        app_name = _column_value(normalized_row, 'app_name').strip()
+
+        if not app_name:
+            print(f"Warning: Row {row_num} has no app_name, skipping")
+            continue
+
+        # Get business/cluster (required)
+        business = _column_value(normalized_row, 'business').strip()
+
+        if not business and require_business:
+            print(f"Warning: Row {row_num} ({app_name}) has no business, skipping")
+            continue
+
+        # Generate unique ID
+        app_id = app_name.replace(' ', '_')
+        if app_id in app_ids:
+            print(f"Warning: Duplicate app_name '{app_name}' at row {row_num}, skipping")
+            continue
+        app_ids.add(app_id)
+
+        # Get optional fields
+        status_str = (_column_value(normalized_row, 'status') or '100').strip()
+        try:
+            status = int(float(status_str)) if status_str else 100
+            status = max(0, min(100, status))  # Clamp to 0-100
+        except ValueError:
+            status = 100
+
+        description = _column_value(normalized_row, 'description').strip()
+
+        # Parse connections (semicolon or comma separated)
+        connects_str = _column_value(normalized_row, 'connects_to').strip()
+
+        connections = []
+        if connects_str:
+            for target in connects_str.replace(',', ';').split(';'):
+                target = target.strip().replace(' ', '_')
+                if target:
+                    connections.append(target)
+
+        # Parse show_indicator flag
+        indicator_str = _column_value(normalized_row, 'show_indicator').strip().lower()
+        show_indicator = indicator_str in ('true', '1', 'yes', 'y')
+
+        app = App(
+            id=app_id,
+            name=app_name,
+            business=business,
+            status=status,
+            description=description,
+            connections=connections,
+            show_position_indicator=show_indicator,
+            region=_column_value(normalized_row, 'region').strip(),
+            sub_business=_column_value(normalized_row, 'sub_business').strip()
+        )
+        apps.append(app)
+
+    return apps
+
+
+def load_from_csv(filepath: str, verbose: bool = True,
+                  require_business: bool = True) -> List[App]:
     """
     Load applications from a CSV file.
 
@@ -610,6 +1206,9 @@ def load_from_csv(filepath: str) -> List[App]:
         - status (optional): Health score 0-100, default 100
         - description (optional): App description
         - connects_to (optional): Semicolon-separated list of app_names this app connects to
+        - region (optional): Region, used to filter maps in batch_layout.py
+        - sub_business (optional): Sub-continent within the business, for
+          --hierarchical layouts; nest deeper levels with ">"
 
     Example CSV:
         app_name,business,status,description,connects_to
@@ -618,15 +1217,11 @@ def load_from_csv(filepath: str) -> List[App]:
         Market Data,Trading,100,Market data feed,
     """
     import csv
-    from pathlib import Path
 
     filepath = Path(filepath)
     if not filepath.exists():
         raise FileNotFoundError(f"CSV file not found: {filepath}")
 
-    apps = []
-    app_ids = set()
-
     # Detect delimiter (comma or tab)
     with open(filepath, 'r', encoding='utf-8-sig') as f:
         sample = f.read(2048)
@@ -635,98 +1230,411 @@ def load_from_csv(filepath: str) -> List[App]:
         else:
             delimiter = ','
 
-    with open(filepath, 'r', encoding='utf-8-sig') as f:
+    with open(filepath, 'r', encoding='utf-8-sig') as f, gc_paused():
         reader = csv.DictReader(f, delimiter=delimiter)
+        apps = apps_from_rows(reader, require_business=require_business)
 
-        # Normalize column names
-        if reader.fieldnames:
-            fieldnames_map = {}
-            for fn in reader.fieldnames:
-                normalized = fn.lower().strip().replace(' ', '_').replace('-', '_')
-                fieldnames_map[fn] = normalized
-
-        for row_num, row in enumerate(reader, start=2):
-            # Normalize keys
-            normalized_row = {fieldnames_map.get(k, k.lower()): v for k, v in row.items()}
-
-            # Get app name (required)
-            app_name = (normalized_row.get('app_name') or
-                       normalized_row.get('app') or
-                       normalized_row.get('application') or
-                       normalized_row.get('name') or '').strip()
-
-            if not app_name:
-                print(f"Warning: Row {row_num} has no app_name, skipping")
-                continue
+    if verbose:
+        print(f"Loaded {len(apps)} apps from {filepath}")
+        _print_business_counts(apps)
+    return apps
 
-            # Get business/cluster (required)
-            business = (normalized_row.get('business') or
-                       normalized_row.get('cluster') or
-                       normalized_row.get('group') or
-                       normalized_row.get('domain') or
-                       normalized_row.get('business_function') or '').strip()
 
-            if not business:
-                print(f"Warning: Row {row_num} ({app_name}) has no business, skipping")
-                continue
+def load_from_excel(filepath: str, verbose: bool = True,
+                    require_business: bool = True) -> List[App]:
+    """Load applications from an Excel sheet (same columns as load_from_csv; needs pandas)."""
+    try:
+        import pandas as pd
+    except ImportError:
+        raise ImportError("Reading Excel files requires pandas: pip install pandas openpyxl")
+
+    filepath = Path(filepath)
+    if not filepath.exists():
+        raise FileNotFoundError(f"Excel file not found: {filepath}")
+
+    df = pd.read_excel(filepath, dtype=str, keep_default_na=False)
+    apps = apps_from_rows(df.to_dict('records'), require_business=require_business)
+
+    if verbose:
+        print(f"Loaded {len(apps)} apps from {filepath}")
+        _print_business_counts(apps)
+    return apps
+
+
+def load_inventory(filepath: str, verbose: bool = True,
+                   require_business: bool = True) -> List[App]:
+    """Load applications from a CSV/TSV or Excel file, chosen by extension."""
+    if Path(filepath).suffix.lower() in ('.xlsx', '.xls'):
+        return load_from_excel(filepath, verbose, require_business)
+    return load_from_csv(filepath, verbose, require_business)
+
+
+def expand_inputs(patterns: Iterable[str]) -> List[Path]:
+    """Expand glob patterns (matches sorted by name), keeping argument order and dropping repeats."""
+    paths = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            matches = sorted(glob.glob(pattern))
+            if not matches:
+                raise FileNotFoundError(f"No files match: {pattern}")
+        else:
+            matches = [pattern]
+        for match in matches:
+            path = Path(match)
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def _parse_inventory_file(path: Path, require_business: bool = True) -> Tuple[List[App], str]:
+    """Worker: parse one file, returning its apps and the warnings it printed."""
+    log = io.StringIO()
+    with redirect_stdout(log):
+        apps = load_inventory(path, verbose=False, require_business=require_business)
+    return apps, log.getvalue()
+
 
-            # Generate unique ID
-            app_id = app_name.replace(' ', '_')
-            if app_id in app_ids:
-                print(f"Warning: Duplicate app_name '{app_name}' at row {row_num}, skipping")
+def merge_inventories(sources: List[Tuple[str, List[App]]]
+                      ) -> Tuple[List[App], List[Dict], List[Tuple[str, str]]]:
+    """
+    Merge per-file inventories into one.
+
+    Sources are merged in the order given, so the result does not depend on
+    which file finished parsing first. When an app id appears in several
+    sources the first one wins and the others are reported as conflicts.
+    Connections are then resolved across all sources; a target that only
+    differs in case from exactly one known app id is mapped to it.
+
+    Returns (apps, conflicts, unresolved (app id, target) pairs).
+    """
+    merged: Dict[str, App] = {}
+    origin: Dict[str, str] = {}
+    conflicts = []
+    for source, apps in sources:
+        for app in apps:
+            kept = merged.get(app.id)
+            if kept is not None:
+                conflicts.append({
+                    "app_name": app.name,
+                    "kept": origin[app.id],
+                    "kept_business": kept.business,
+                    "dropped": source,
+                    "dropped_business": app.business,
+                    "identical": app == kept,
+                })
                 continue
-            app_ids.add(app_id)
+            merged[app.id] = app
+            origin[app.id] = source
+
+    by_lower = defaultdict(list)
+    for app_id in merged:
+        by_lower[app_id.lower()].append(app_id)
+
+    unresolved = []
+    for app in merged.values():
+        resolved = []
+        for target in app.connections:
+            if target not in merged:
+                matches = by_lower.get(target.lower(), [])
+                if len(matches) == 1:
+                    target = matches[0]
+                else:
+                    unresolved.append((app.id, target))
+            resolved.append(target)
+        app.connections = resolved
+
+    return list(merged.values()), conflicts, unresolved
+
+
+def load_inventories(patterns: Iterable[str], jobs: int = 1,
+                     require_business: bool = True) -> List[App]:
+    """
+    Load and merge several inventory files (paths or globs).
 
-            # Get optional fields
-            status_str = normalized_row.get('status', '100').strip()
-            try:
-                status = int(float(status_str)) if status_str else 100
-                status = max(0, min(100, status))  # Clamp to 0-100
-            except ValueError:
-                status = 100
-
-            description = (normalized_row.get('description') or
-                          normalized_row.get('desc') or '').strip()
-
-            # Parse connections (semicolon or comma separated)
-            connects_str = (normalized_row.get('connects_to') or
-                           normalized_row.get('connections') or
-                           normalized_row.get('dependencies') or '').strip()
-
-            connections = []
-            if connects_str:
-                for target in connects_str.replace(',', ';').split(';'):
-                    target = target.strip().replace(' ', '_')
-                    if target:
-                        connections.append(target)
-
-            # Parse show_indicator flag
-            indicator_str = (normalized_row.get('show_indicator') or
-                            normalized_row.get('indicator') or '').strip().lower()
-            show_indicator = indicator_str in ('true', '1', 'yes', 'y')
+    Files are parsed in parallel worker processes and merged in argument
+    order with merge_inventories; conflicts and unresolved connections are
+    reported.
+    """
+    paths = expand_inputs(patterns)
+    for path in paths:
+        if not path.exists():
+            raise FileNotFoundError(f"Input file not found: {path}")
+
+    start = time.perf_counter()
+    parse = partial(_parse_inventory_file, require_business=require_business)
+    jobs = max(1, min(jobs, len(paths)))
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            # map() yields in submission order, whatever order workers finish in
+            parsed = list(pool.map(parse, paths))
+    else:
+        parsed = [parse(path) for path in paths]
+
+    for path, (apps, warnings) in zip(paths, parsed):
+        print(f"  {path}: {len(apps)} apps")
+        for line in warnings.splitlines():
+            print(f"    {line}")
+
+    apps, conflicts, unresolved = merge_inventories(
+        [(str(path), apps) for path, (apps, _) in zip(paths, parsed)])
+    print(f"Loaded {len(apps)} apps from {len(paths)} files with {jobs} worker(s) "
+          f"in {time.perf_counter() - start:.2f}s")
+
+    if conflicts:
+        print(f"Warning: {len(conflicts)} app names appear in more than one source "
+              f"(first source kept):")
+        for conflict in conflicts[:20]:
+            same = " (identical)" if conflict["identical"] else ""
+            print(f"  {conflict['app_name']}: kept {conflict['kept']} "
+                  f"[{conflict['kept_business']}], dropped {conflict['dropped']} "
+                  f"[{conflict['dropped_business']}]{same}")
+        if len(conflicts) > 20:
+            print(f"  ... and {len(conflicts) - 20} more")
+    if unresolved:
+        examples = ", ".join(f"{app_id} -> {target}" for app_id, target in unresolved[:5])
+        print(f"Warning: {len(unresolved)} connections point to apps not in any source "
+              f"(e.g. {examples})")
+
+    _print_business_counts(apps)
+    return apps
 
-            app = App(
-                id=app_id,
-                name=app_name,
-                business=business,
-                status=status,
-                description=description,
-                connections=connections,
-                show_position_indicator=show_indicator
-            )
-            apps.append(app)
 
-    print(f"Loaded {len(apps)} apps from {filepath}")
+def load_inputs(inputs: List[str], jobs: int = 1, communities: bool = False) -> List[App]:
+    """
+    Load a single inventory file as before, or merge several.
+
+    With communities, rows without a business are kept and assigned one
+    by assign_communities.
+    """
+    if len(inputs) == 1 and not glob.has_magic(inputs[0]):
+        apps = load_inventory(inputs[0], require_business=not communities)
+    else:
+        apps = load_inventories(inputs, jobs, require_business=not communities)
+    if communities:
+        assign_communities(apps)
+        _print_business_counts(apps)
+    return apps
+
+
+def assign_communities(apps: List[App], min_size: int = 5, max_communities: int = 24,
+                       seed: int = 42) -> int:
+    """
+    Give apps without a business one derived from the connection graph.
+
+    Apps that have a business keep it and seed their continent (see
+    communities.py). Returns the number of apps assigned.
+    """
+    unowned = sum(1 for app in apps if not app.business)
+    if not unowned:
+        return 0
+
+    known = {app.id: app.business for app in apps if app.business}
+    assigned = detect_communities([app.id for app in apps],
+                                  [app.connections for app in apps],
+                                  known=known, min_size=min_size,
+                                  max_communities=max_communities, seed=seed)
+    for app in apps:
+        if not app.business:
+            app.business = assigned[app.id]
+    return unowned
+
 
-    # Summary by business
+def _print_business_counts(apps: List[App]):
     business_counts = defaultdict(int)
     for app in apps:
         business_counts[app.business] += 1
     print("Apps per business:")
     for biz, count in sorted(business_counts.items()):
-        print(f"  {biz}: {count}")
+        print(f"  {biz or '(none yet)'}: {count}")
 
-    return apps
+
+def run_seed_search(apps: List[App], args) -> Dict:
+    """Run --search-seeds and return the best layout."""
+    jitter = args.jitter if args.jitter > 0 else DEFAULT_SEARCH_JITTER
+    seeds = list(range(args.layout_seed, args.layout_seed + args.search_seeds))
+
+    print(f"Searching {len(seeds)} seeds on {args.jobs} process(es) (jitter {jitter})...")
+    start = time.perf_counter()
+    (best_seed, best_metrics, output), results = search_seeds(
+        apps, seeds, jobs=args.jobs,
+        water_gap=args.water_gap,
+        connected_gap=args.connected_gap,
+        jitter=jitter,
+        hierarchical=args.hierarchical,
+        nested_gap=args.nested_gap,
+        placement=args.placement
+    )
+    print(f"Searched in {time.perf_counter() - start:.1f}s")
+
+    print("\nTop layouts (lower score is better):")
+    print(f"  {'seed':>6} {'score':>10} {'conn len':>9} {'gaps':>5} "
+          f"{'unmet':>6} {'unplaced':>8} {'bbox':>7}")
+    for seed, metrics in sorted(results, key=lambda r: (r[1]["score"], r[0]))[:5]:
+        print(f"  {seed:>6} {metrics['score']:>10.1f} {metrics['connection_length']:>9} "
+              f"{metrics['gap_violations']:>5} {metrics['unmet_target']:>6} "
+              f"{metrics['unplaced_apps']:>8} {metrics['bbox_area']:>7}")
+
+    print(f"\nBest seed: {best_seed} (reproduce with --layout-seed {best_seed} --jitter {jitter})")
+    return output
+
+
+def watch_layout(args, output_path: Path, delta_path: Optional[Path] = None):
+    """
+    --watch: regenerate the layout whenever an input file changes.
+
+    Each stage reuses the previous run's result where it can: the file is
+    only re-parsed when its content hash changes, the layout only reruns
+    when the parsed apps differ (reusing territories that still fit), and
+    the output is only rewritten when it changed. With delta_path, each
+    new version's delta against the previous one is written there too;
+    with --svg, each new version is rendered there.
+    """
+    engine = ContinentLayoutEngine(
+        water_gap=args.water_gap,
+        connected_gap=args.connected_gap,
+        seed=args.layout_seed,
+        jitter=args.jitter,
+        hierarchical=args.hierarchical,
+        nested_gap=args.nested_gap,
+        placement=args.placement,
+        verbose=False
+    )
+    paths = expand_inputs(args.input)
+    svg = svg_path(args)
+    watcher = FileWatcher(paths, poll_interval=args.poll_interval,
+                          debounce=args.debounce)
+    last_apps = None
+    last_output = None
+    version = 0
+
+    def regenerate():
+        nonlocal last_apps, last_output, version
+        timings = {}
+
+        start = time.perf_counter()
+        apps = load_inputs(args.input, args.jobs, args.communities)
+        timings['parse'] = time.perf_counter() - start
+
+        if apps == last_apps:
+            print("Apps unchanged, layout skipped")
+            return
+        last_apps = apps
+
+        start = time.perf_counter()
+        output = engine.update_layout(apps)
+        timings['layout'] = time.perf_counter() - start
+        mode = "incremental" if engine.last_update_incremental else "full"
+        if args.geometry:
+            start = time.perf_counter()
+            add_geometry(output)
+            timings['geometry'] = time.perf_counter() - start
+
+        if output == last_output:
+            print(f"Layout unchanged ({mode}), write skipped")
+        else:
+            version += 1
+            if delta_path and last_output is not None:
+                start = time.perf_counter()
+                delta = diff_layouts(last_output, output, version, version - 1)
+                write_json_atomic(delta, delta_path, indent=None)
+                timings['diff'] = time.perf_counter() - start
+                print(f"Delta v{version}: {delta_summary(delta)}")
+
+            start = time.perf_counter()
+            write_layout(output, output_path, **output_format(args))
+            timings['write'] = time.perf_counter() - start
+            last_output = output
+
+            if svg:
+                start = time.perf_counter()
+                write_svg(output, svg)
+                timings['svg'] = time.perf_counter() - start
+
+        stages = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in timings.items())
+        print(f"Regenerated {output_path} in {sum(timings.values()) * 1000:.0f}ms "
+              f"({mode} layout; {stages})")
+
+    watched = ", ".join(str(path) for path in paths)
+    print(f"Watching {watched} (Ctrl+C to stop)")
+    try:
+        while True:
+            try:
+                regenerate()
+            except Exception as e:
+                # A file caught mid-edit can fail in any reader (csv.Error,
+                # zipfile.BadZipFile, pandas and openpyxl errors share no base
+                # class); report it and keep watching
+                print(f"Error: {e} (waiting for the next change)")
+            watcher.wait()
+            print("\nInput changed")
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+
+
+def layout_from_store(args, output_path: Path):
+    """
+    --db: lay out from a SQLite inventory store (see inventory_store.py).
+
+    The input files, if given, are ingested first; only changed rows are
+    written. Territories persisted by the previous run are reused when they
+    still fit, and the new layout is saved back to the store.
+
+    Placement always runs over the full inventory: an app's position depends
+    on the connections of every app in its continent, so there is no cheaper
+    update for a changed subset. The changed/removed count since the stored
+    layout revision is printed for information only.
+    """
+    from inventory_store import InventoryStore
+
+    with InventoryStore(Path(args.db)) as store:
+        if args.input:
+            counts = store.ingest_apps(load_inputs(args.input, args.jobs, args.communities))
+            print(f"Ingested {', '.join(args.input)} into {args.db}: "
+                  + ", ".join(f"{count} {kind}" for kind, count in counts.items()))
+
+        start = time.perf_counter()
+        apps = store.load_apps()
+        print(f"Loaded {len(apps)} apps from {args.db} "
+              f"in {(time.perf_counter() - start) * 1000:.0f}ms")
+        if not apps:
+            print("Error: The store is empty; pass an input file to ingest")
+            return
+
+        engine = ContinentLayoutEngine(
+            water_gap=args.water_gap,
+            connected_gap=args.connected_gap,
+            seed=args.layout_seed,
+            jitter=args.jitter,
+            hierarchical=args.hierarchical,
+            nested_gap=args.nested_gap,
+            placement=args.placement
+        )
+        territories = store.load_territories(engine)
+        if territories is None:
+            engine.load_apps(apps)
+            output = engine.generate_layout()
+        else:
+            # Informational: placement below still takes every app
+            changed, removed = store.changes_since(store.layout_revision())
+            print(f"{len(changed)} apps changed and {len(removed)} removed since the last layout")
+            output = engine.update_layout(apps, territories=territories)
+            print("Reused persisted territories" if engine.last_update_incremental
+                  else "Persisted territories no longer fit, ran a full layout")
+        store.save_layout(engine)
+
+    if args.geometry:
+        add_geometry(output)
+    write_output(output, output_path, args)
+
+
+def svg_path(args) -> Optional[Path]:
+    """--svg, resolved like --output."""
+    return Path(__file__).parent / args.svg if args.svg else None
+
+
+def output_format(args) -> Dict[str, bool]:
+    """write_layout options from --minify, --canonical and --compress."""
+    return {'minify': args.minify, 'canonical': args.canonical, 'compress': args.compress}
 
 
 def main():
@@ -744,9 +1652,31 @@ Examples:
   # Load from CSV with custom parameters
   python continent_layout.py apps.csv --water-gap 3 --seed 123
 
+  # Try 32 seeds on 8 processes and keep the best-scoring layout
+  python continent_layout.py apps.csv --search-seeds 32 --jobs 8
+
+  # Keep running and regenerate on every save of apps.csv
+  python continent_layout.py apps.csv --watch
+
+  # Discovery feed without a business column: derive continents from connections
+  python continent_layout.py discovery_feed.csv --communities
+
+  # Nest sub-continents (sub_business column, "Cards > Issuing" for deeper levels)
+  python continent_layout.py apps.csv --hierarchical
+
+  # Precompute pixel centres and collisions for the frontend
+  python continent_layout.py apps.csv --geometry
+
+  # Place connected apps close together (multilevel coarsen-and-refine)
+  python continent_layout.py apps.csv --placement multilevel
+
+  # Merge several exports (parsed in parallel; the first file wins on duplicates)
+  python continent_layout.py exports/*.csv extra_apps.xlsx --jobs 4
+
 CSV Format:
   Required columns: app_name, business
-  Optional columns: status (0-100), description, connects_to (semicolon-separated)
+  Optional columns: status (0-100), description, connects_to (semicolon-separated),
+                    region, sub_business
 
   Example:
     app_name,business,status,connects_to
@@ -754,7 +1684,8 @@ CSV Format:
     Risk Engine,Risk Management,88,
         """
     )
-    parser.add_argument('input', nargs='?', help='Input CSV/TSV file')
+    parser.add_argument('input', nargs='*',
+                        help='Input CSV/TSV/XLSX files or glob patterns (merged in the order given)')
     parser.add_argument('-g', '--generate', action='store_true',
                         help='Generate synthetic test data')
     parser.add_argument('-n', '--num-apps', type=int, default=200,
@@ -767,13 +1698,69 @@ CSV Format:
                         help='Hex gap between unconnected continents (default: 2)')
     parser.add_argument('--connected-gap', type=int, default=1,
                         help='Hex gap between connected continents (default: 1)')
+    parser.add_argument('--layout-seed', type=int, default=None,
+                        help='Seed for the layout engine only (default: --seed)')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help='Max seeded offset of initial continent positions (default: 0)')
+    parser.add_argument('--communities', action='store_true',
+                        help='Derive continents from connections for apps without a business')
+    parser.add_argument('--hierarchical', action='store_true',
+                        help='Nest sub-continents by the sub_business column')
+    parser.add_argument('--nested-gap', type=int, default=1,
+                        help='Hex gap between sub-continents with --hierarchical (default: 1)')
+    parser.add_argument('--placement', choices=PLACEMENTS, default='spiral',
+                        help='App placement within territories: spiral (external apps on '
+                             'the shore) or multilevel (connected apps close together; '
+                             'slower) (default: spiral)')
+    parser.add_argument('--search-seeds', type=int, default=0, metavar='N',
+                        help='Lay out N seeds (from --layout-seed) and keep the best score')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes for --search-seeds and for parsing '
+                             'several input files (default: CPU count)')
+    parser.add_argument('-w', '--watch', action='store_true',
+                        help='Regenerate whenever an input file changes')
+    parser.add_argument('--poll-interval', type=float, default=0.5,
+                        help='Seconds between checks in --watch mode (default: 0.5)')
+    parser.add_argument('--debounce', type=float, default=0.3,
+                        help='Quiet period before regenerating in --watch mode (default: 0.3)')
+    parser.add_argument('--db', default=None,
+                        help='SQLite inventory store: ingest the input into it (if given), '
+                             'lay out from it and persist the layout')
+    parser.add_argument('--geometry', action='store_true',
+                        help='Also write pixel centres and the collision '
+                             'list, so the frontend does no geometry work at startup')
+    parser.add_argument('--delta', default=None,
+                        help='In --watch mode, also write each new version as a delta to this file')
+    parser.add_argument('--svg', default=None,
+                        help='Also render the layout to this SVG file (see hexmap_svg.py)')
+    parser.add_argument('--minify', action='store_true',
+                        help='Write compact JSON without indentation')
+    parser.add_argument('--canonical', action='store_true',
+                        help='Sort object keys, so equal layouts are written as equal bytes')
+    parser.add_argument('--compress', action='store_true',
+                        help='Also write precompressed .gz and (with brotli installed) .br copies')
 
     args = parser.parse_args()
+    if args.layout_seed is None:
+        args.layout_seed = args.seed
+
+    output_path = Path(__file__).parent / args.output
+
+    if args.watch:
+        if not args.input or args.search_seeds > 0:
+            print("Error: --watch needs an input file and cannot be combined with --search-seeds")
+            return
+        delta_path = Path(__file__).parent / args.delta if args.delta else None
+        watch_layout(args, output_path, delta_path)
+        return
+
+    if args.db:
+        return layout_from_store(args, output_path)
 
     # Load apps from CSV or generate synthetic data
     if args.input:
-        print(f"Loading apps from: {args.input}")
-        apps = load_from_csv(args.input)
+        print(f"Loading apps from: {', '.join(args.input)}")
+        apps = load_inputs(args.input, args.jobs, args.communities)
     elif args.generate:
         print(f"Generating synthetic test data with {args.num_apps} apps...")
         apps = generate_test_data(args.num_apps, args.seed)
@@ -782,26 +1769,44 @@ CSV Format:
         print("\nError: Provide an input CSV file or use --generate for synthetic data")
         return
 
-    # Create layout engine
-    engine = ContinentLayoutEngine(
-        water_gap=args.water_gap,
-        connected_gap=args.connected_gap,
-        seed=args.seed
-    )
+    if args.search_seeds > 0:
+        output = run_seed_search(apps, args)
+    else:
+        # Create layout engine
+        engine = ContinentLayoutEngine(
+            water_gap=args.water_gap,
+            connected_gap=args.connected_gap,
+            seed=args.layout_seed,
+            jitter=args.jitter,
+            hierarchical=args.hierarchical,
+            nested_gap=args.nested_gap,
+            placement=args.placement
+        )
 
-    # Load apps and generate layout
-    engine.load_apps(apps)
-    output = engine.generate_layout()
+        # Load apps and generate layout
+        engine.load_apps(apps)
+        output = engine.generate_layout()
+
+    if args.geometry:
+        add_geometry(output)
+    write_output(output, output_path, args)
 
-    # Write output
-    from pathlib import Path
-    output_path = Path(__file__).parent / args.output
-    output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(output_path, 'w') as f:
-        json.dump(output, f, indent=2)
+def write_output(output: Dict, output_path: Path, args):
+    """Write the layout (and its SVG preview, if asked for) and print a summary."""
+    # Write output (atomically, so a running dev server never sees a partial file)
+    written = write_layout(output, output_path, **output_format(args))
 
     print(f"\nWritten to: {output_path}")
+    if len(written) > 1:
+        sizes = ", ".join(f"{path.suffix} {path.stat().st_size / 1024:.0f} KB" for path in written)
+        print(f"Sizes: {sizes}")
+    if args.compress and not HAS_BROTLI:
+        print("No .br written: brotli is not installed (pip install brotli)")
+    svg = svg_path(args)
+    if svg:
+        write_svg(output, svg)
+        print(f"Preview: {svg}")
     print(f"Continents: {len(output['clusters'])}")
     total_apps = sum(len(c['applications']) for c in output['clusters'])
     print(f"Applications: {total_apps}")
@@ -8,6 +8,9 @@ Usage:
     python convert_to_hexmap.py input.csv
     python convert_to_hexmap.py input.xlsx --output ../src/data.json
     python convert_to_hexmap.py input.tsv --preview
+    python convert_to_hexmap.py input.tsv --preview --svg preview.svg
+    python convert_to_hexmap.py input.xlsx --watch
+    python convert_to_hexmap.py discovery_feed.csv --communities
 
 See README.md for input format documentation.
 """
@@ -17,9 +20,15 @@ import json
 import math
 import os
 import sys
+import time
 from pathlib import Path
 from collections import defaultdict
 
+from communities import detect_communities
+from hexmap_geometry import add_geometry
+from hexmap_io import HAS_BROTLI, FileWatcher, write_layout
+from hexmap_svg import write_svg
+
 # Optional dependencies - check at runtime
 try:
     import pandas as pd
@@ -133,9 +142,14 @@ def normalize_columns(df):
     return df
 
 
-def validate_data(df):
-    """Validate the input data has required columns."""
-    required = ['app_name', 'cluster']
+def validate_data(df, communities=False):
+    """
+    Validate the input data has required columns.
+
+    With communities, the cluster column is optional: missing clusters are
+    derived from the connections afterwards (see fill_clusters).
+    """
+    required = ['app_name'] if communities else ['app_name', 'cluster']
     missing = [col for col in required if col not in df.columns]
 
     if missing:
@@ -143,7 +157,7 @@ def validate_data(df):
         print(f"Found columns: {list(df.columns)}")
         print("\nRequired columns:")
         print("  - app_name (or: app, application, name)")
-        print("  - cluster (or: group, category)")
+        print("  - cluster (or: group, category; optional with --communities)")
         print("\nOptional columns:")
         print("  - status (0-100, default: 100)")
         print("  - description")
@@ -158,6 +172,42 @@ def validate_data(df):
     return df
 
 
+def fill_clusters(df):
+    """
+    Fill in missing cluster values from the connection graph (--communities).
+
+    Rows that already have a cluster keep it and anchor their communities.
+    """
+    df = df.copy()
+    if 'cluster' not in df.columns:
+        df['cluster'] = ''
+    df['cluster'] = df['cluster'].fillna('').astype(str).str.strip()
+
+    names = []
+    links = []
+    known = {}
+    seen = set()
+    for _, row in df.iterrows():
+        name = str(row['app_name']).strip()
+        if name in seen:
+            continue
+        seen.add(name)
+        names.append(name)
+        links.append([c["to"] for c in parse_connections(row['connects_to'])]
+                     if 'connects_to' in row else [])
+        if row['cluster']:
+            known[name] = row['cluster']
+
+    if len(known) == len(names):
+        return df
+
+    assigned = detect_communities(names, links, known=known)
+    missing = df['cluster'] == ''
+    df.loc[missing, 'cluster'] = df.loc[missing, 'app_name'].map(
+        lambda name: assigned[str(name).strip()])
+    return df
+
+
 def generate_spiral_positions(count, center_q=0, center_r=0):
     """Generate hex grid positions in a spiral pattern."""
     positions = [(center_q, center_r)]
@@ -313,6 +363,84 @@ def preview_output(data):
     print("\n" + "=" * 60)
 
 
+def resolve_output_path(output):
+    """Resolve the output path relative to the script location."""
+    output_path = Path(output)
+    if not output_path.is_absolute():
+        output_path = Path(__file__).parent / output_path
+    return output_path
+
+
+def watch_and_convert(args):
+    """
+    --watch: reconvert whenever the input file changes.
+
+    The file is only re-read when its content hash changes, the conversion
+    only reruns when the normalized data differs from the previous read,
+    and the output (and the --svg preview) is only rewritten (atomically)
+    when it changed.
+    """
+    output_path = resolve_output_path(args.output)
+    svg_path = resolve_output_path(args.svg) if args.svg else None
+    watcher = FileWatcher([args.input], poll_interval=args.poll_interval,
+                          debounce=args.debounce)
+    last_df = None
+    last_data = None
+
+    def regenerate():
+        nonlocal last_df, last_data
+        timings = {}
+
+        start = time.perf_counter()
+        df = validate_data(normalize_columns(read_input_file(args.input)), args.communities)
+        timings['read'] = time.perf_counter() - start
+
+        if last_df is not None and df.equals(last_df):
+            print("Data unchanged, conversion skipped")
+            return
+        last_df = df
+
+        start = time.perf_counter()
+        if args.communities:
+            df = fill_clusters(df)
+        data = convert_to_hexmap_format(df)
+        if args.geometry:
+            add_geometry(data)
+        timings['convert'] = time.perf_counter() - start
+
+        if data == last_data:
+            print("Output unchanged, write skipped")
+        else:
+            start = time.perf_counter()
+            write_layout(data, output_path, minify=args.minify, canonical=args.canonical,
+                         compress=args.compress)
+            timings['write'] = time.perf_counter() - start
+            last_data = data
+
+            if svg_path:
+                start = time.perf_counter()
+                write_svg(data, svg_path)
+                timings['svg'] = time.perf_counter() - start
+
+        stages = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in timings.items())
+        total_apps = sum(len(c['applications']) for c in data['clusters'])
+        print(f"Regenerated {output_path} ({total_apps} apps) in "
+              f"{sum(timings.values()) * 1000:.0f}ms ({stages})")
+
+    print(f"Watching {args.input} (Ctrl+C to stop)")
+    try:
+        while True:
+            try:
+                regenerate()
+            except SystemExit:
+                # The readers exit on bad input; keep watching for a fix
+                print("Waiting for the next change...")
+            watcher.wait()
+            print(f"\n{args.input} changed")
+    except KeyboardInterrupt:
+        print("\nStopped watching")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Convert CSV/TSV/Excel to HexMap data.json format',
@@ -322,9 +450,13 @@ Examples:
   python convert_to_hexmap.py apps.csv
   python convert_to_hexmap.py apps.xlsx --output ../src/data.json
   python convert_to_hexmap.py apps.tsv --preview
+  python convert_to_hexmap.py apps.tsv --preview --svg preview.svg
+  python convert_to_hexmap.py apps.xlsx --watch
+  python convert_to_hexmap.py apps.csv --minify --compress
+  python convert_to_hexmap.py discovery_feed.csv --communities
 
 Input file format:
-  Required columns: app_name, cluster
+  Required columns: app_name, cluster (cluster optional with --communities)
   Optional columns: status (0-100), description, connects_to (semicolon-separated)
         """
     )
@@ -339,12 +471,45 @@ Input file format:
     parser.add_argument('-v', '--verbose',
                         action='store_true',
                         help='Verbose output')
+    parser.add_argument('-w', '--watch',
+                        action='store_true',
+                        help='Reconvert whenever the input file changes')
+    parser.add_argument('--communities',
+                        action='store_true',
+                        help='Derive missing clusters from the connection graph')
+    parser.add_argument('--geometry',
+                        action='store_true',
+                        help='Also write pixel centres and the collision list')
+    parser.add_argument('--svg',
+                        help='Also render the output to this SVG file (see hexmap_svg.py)')
+    parser.add_argument('--minify',
+                        action='store_true',
+                        help='Write compact JSON without indentation')
+    parser.add_argument('--canonical',
+                        action='store_true',
+                        help='Sort object keys, so equal data is written as equal bytes')
+    parser.add_argument('--compress',
+                        action='store_true',
+                        help='Also write precompressed .gz and (with brotli installed) .br copies')
+    parser.add_argument('--poll-interval',
+                        type=float, default=0.5,
+                        help='Seconds between checks in --watch mode (default: 0.5)')
+    parser.add_argument('--debounce',
+                        type=float, default=0.3,
+                        help='Quiet period before reconverting in --watch mode (default: 0.3)')
 
     args = parser.parse_args()
 
     # Check dependencies
     check_dependencies()
 
+    if args.watch:
+        if args.preview:
+            print("Error: --watch cannot be combined with --preview")
+            sys.exit(1)
+        watch_and_convert(args)
+        return
+
     # Read input
     if args.verbose:
         print(f"Reading: {args.input}")
@@ -356,7 +521,9 @@ Input file format:
 
     # Normalize and validate
     df = normalize_columns(df)
-    df = validate_data(df)
+    df = validate_data(df, args.communities)
+    if args.communities:
+        df = fill_clusters(df)
 
     if args.verbose:
         print(f"Columns: {list(df.columns)}")
@@ -364,30 +531,34 @@ Input file format:
 
     # Convert
     data = convert_to_hexmap_format(df)
+    if args.geometry:
+        add_geometry(data)
 
     # Preview or write
     if args.preview:
         preview_output(data)
         print(json.dumps(data, indent=2)[:2000] + "\n...")
     else:
-        # Resolve output path relative to script location
-        script_dir = Path(__file__).parent
-        output_path = Path(args.output)
-        if not output_path.is_absolute():
-            output_path = script_dir / output_path
-
-        # Ensure output directory exists
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path = resolve_output_path(args.output)
 
-        # Write output
-        with open(output_path, 'w') as f:
-            json.dump(data, f, indent=2)
+        # Write output (atomically, so a running dev server never sees a partial file)
+        written = write_layout(data, output_path, minify=args.minify, canonical=args.canonical,
+                               compress=args.compress)
 
         print(f"Written: {output_path}")
+        for path in written[1:]:
+            print(f"  Compressed: {path} ({path.stat().st_size / 1024:.0f} KB)")
+        if args.compress and not HAS_BROTLI:
+            print("  No .br written: brotli is not installed (pip install brotli)")
         print(f"  Clusters: {len(data['clusters'])}")
         total_apps = sum(len(c['applications']) for c in data['clusters'])
         print(f"  Applications: {total_apps}")
 
+    if args.svg:
+        svg_path = resolve_output_path(args.svg)
+        write_svg(data, svg_path)
+        print(f"Preview: {svg_path}")
+
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Scalable Synthetic Enterprise Generator
+
+Streams large synthetic app inventories to CSV for load testing the
+layout tools. Unlike generate_test_data in continent_layout.py, this
+generator runs in O(n) time and O(1) memory per app:
+
+- App names are derived from (business, index), so they are unique
+  without a lookup table and connection targets can be named before
+  the target row has been written
+- Out-degrees follow a heavy-tailed (Pareto) distribution
+- A small share of "hub" apps per business receives most inbound links
+- A tunable share of edges crosses business boundaries
+- Every business has its own RNG stream, so businesses can be generated
+  in parallel and the output is identical for any --jobs value
+
+Usage:
+    python generate_enterprise.py --num-apps 1000000 -o apps.csv
+    python generate_enterprise.py -n 5000000 --jobs 8 --cross-business 0.2 -o big.csv
+"""
+
+import argparse
+import bisect
+import csv
+import multiprocessing
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+from continent_layout import App, APP_PREFIXES, APP_SUFFIXES, BUSINESS_FUNCTIONS
+
+CSV_COLUMNS = ['app_name', 'business', 'status', 'description', 'connects_to']
+
+
+def business_names(num_businesses: int) -> List[str]:
+    """Bank business functions, padded with generic units if more are requested."""
+    names = list(BUSINESS_FUNCTIONS[:num_businesses])
+    for i in range(len(names), num_businesses):
+        names.append(f"Business Unit {i + 1}")
+    return names
+
+
+def split_apps(num_apps: int, businesses: List[str], seed: int) -> List[int]:
+    """Split num_apps across businesses with some variance (sums exactly)."""
+    rng = random.Random(f"{seed}:sizes")
+    weights = [rng.uniform(0.5, 1.5) for _ in businesses]
+    total = sum(weights)
+    counts = [int(num_apps * w / total) for w in weights]
+
+    # Hand out the rounding remainder one app at a time
+    for i in range(num_apps - sum(counts)):
+        counts[i % len(counts)] += 1
+    return counts
+
+
+def app_id(business_index: int, index: int, num_businesses: int, prefixes: List[str]) -> str:
+    """
+    Deterministic unique app id for the index-th app of a business.
+
+    The trailing number encodes the business index, so ids stay unique
+    even where businesses share name prefixes.
+    """
+    prefix = prefixes[index % len(prefixes)]
+    suffix = APP_SUFFIXES[(index // len(prefixes)) % len(APP_SUFFIXES)]
+    serial = index // (len(prefixes) * len(APP_SUFFIXES))
+    return f"{prefix}_{suffix}_{serial * num_businesses + business_index + 1}"
+
+
+class EnterpriseModel:
+    """Parameters and derived lookup tables shared by every business stream."""
+
+    def __init__(self,
+                 num_apps: int,
+                 num_businesses: int = len(BUSINESS_FUNCTIONS),
+                 seed: int = 42,
+                 avg_degree: float = 2.0,     # Mean outbound connections per app
+                 alpha: float = 2.5,          # Pareto shape (lower = heavier tail)
+                 max_degree: int = 200,       # Cap on outbound connections per app
+                 hub_fraction: float = 0.01,  # Share of apps in a business that are hubs
+                 hub_share: float = 0.5,      # Share of edges that target a hub
+                 cross_business: float = 0.1  # Share of edges to another business
+                 ):
+        if alpha <= 1:
+            raise ValueError("alpha must be > 1 for a finite mean degree")
+
+        self.num_apps = num_apps
+        self.seed = seed
+        self.avg_degree = avg_degree
+        self.alpha = alpha
+        self.max_degree = max_degree
+        self.hub_fraction = hub_fraction
+        self.hub_share = hub_share
+        self.cross_business = cross_business
+
+        self.businesses = business_names(num_businesses)
+        self.counts = split_apps(num_apps, self.businesses, seed)
+        self.prefixes = [APP_PREFIXES.get(b, [f"BU{i + 1}"])
+                         for i, b in enumerate(self.businesses)]
+
+        # Cumulative counts for size-weighted choice of a target business
+        self.cumulative = []
+        running = 0
+        for count in self.counts:
+            running += count
+            self.cumulative.append(running)
+
+        # Lomax(alpha, scale) has mean scale / (alpha - 1)
+        self.degree_scale = avg_degree * (alpha - 1)
+
+    def _id(self, business_index: int, index: int) -> str:
+        return app_id(business_index, index, len(self.businesses),
+                      self.prefixes[business_index])
+
+    def _pick_index(self, rng: random.Random, count: int) -> int:
+        """Pick an app index in a business, biased towards its hubs."""
+        hubs = max(1, int(count * self.hub_fraction))
+        if rng.random() < self.hub_share:
+            return rng.randrange(hubs)
+        return rng.randrange(count)
+
+    def _pick_other_business(self, rng: random.Random, business_index: int) -> int:
+        """Pick another business weighted by app count."""
+        while True:
+            target = bisect.bisect_right(self.cumulative, rng.randrange(self.num_apps))
+            if target != business_index or len(self.businesses) == 1:
+                return target
+
+    def iter_business(self, business_index: int) -> Iterator[Tuple[str, str, int, str, List[str]]]:
+        """
+        Yield (app_id, business, status, description, connections) rows
+        for one business from its own RNG stream.
+        """
+        business = self.businesses[business_index]
+        count = self.counts[business_index]
+        rng = random.Random(f"{self.seed}:{business}")
+        description = f"{business} application"
+
+        for index in range(count):
+            degree = round(self.degree_scale * (rng.paretovariate(self.alpha) - 1))
+            degree = min(degree, self.max_degree)
+
+            targets = []
+            seen = {index}
+            for _ in range(degree):
+                if self.cross_business > 0 and rng.random() < self.cross_business:
+                    other = self._pick_other_business(rng, business_index)
+                    if other != business_index:
+                        targets.append(self._id(other, self._pick_index(rng, self.counts[other])))
+                        continue
+                if count < 2:
+                    continue
+                target = self._pick_index(rng, count)
+                if target not in seen:
+                    seen.add(target)
+                    targets.append(self._id(business_index, target))
+
+            yield (self._id(business_index, index), business,
+                   rng.randint(50, 100), description, targets)
+
+    def iter_apps(self) -> Iterator[App]:
+        """Yield App objects for every business in order."""
+        for business_index in range(len(self.businesses)):
+            for app_id_, business, status, description, targets in self.iter_business(business_index):
+                yield App(id=app_id_, name=app_id_.replace("_", " "), business=business,
+                          status=status, description=description, connections=targets)
+
+
+def write_business_rows(model: EnterpriseModel, business_index: int, f) -> int:
+    """Write one business's rows to an open CSV file; returns the row count."""
+    writer = csv.writer(f)
+    rows = 0
+    for app_id_, business, status, description, targets in model.iter_business(business_index):
+        writer.writerow([app_id_.replace("_", " "), business, status, description,
+                         ';'.join(t.replace("_", " ") for t in targets)])
+        rows += 1
+    return rows
+
+
+def _write_business_part(task):
+    """Process pool entry point: write one business to its own part file."""
+    model, business_index, part_path = task
+    with open(part_path, 'w', newline='', encoding='utf-8') as f:
+        write_business_rows(model, business_index, f)
+    return part_path
+
+
+def write_enterprise_csv(model: EnterpriseModel, output_path, jobs: int = 1) -> int:
+    """
+    Stream the whole inventory to a CSV file.
+
+    With jobs > 1 each business is written to a part file by a worker
+    process and the parts are concatenated in business order, so the
+    output does not depend on which worker finishes first.
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    business_indices = range(len(model.businesses))
+
+    with open(output_path, 'w', newline='', encoding='utf-8') as out:
+        csv.writer(out).writerow(CSV_COLUMNS)
+
+        if jobs <= 1:
+            for business_index in business_indices:
+                write_business_rows(model, business_index, out)
+            return model.num_apps
+
+        with tempfile.TemporaryDirectory(dir=output_path.parent) as tmp:
+            tasks = [(model, i, Path(tmp) / f"part_{i:04d}.csv") for i in business_indices]
+            with multiprocessing.Pool(jobs) as pool:
+                # imap preserves task order, so parts are appended in sequence
+                for part_path in pool.imap(_write_business_part, tasks):
+                    with open(part_path, 'r', newline='', encoding='utf-8') as part:
+                        shutil.copyfileobj(part, out)
+
+    return model.num_apps
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Stream a large synthetic enterprise inventory to CSV',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python generate_enterprise.py -n 100000 -o apps.csv
+  python generate_enterprise.py -n 2000000 --businesses 24 --jobs 8 -o big.csv
+  python generate_enterprise.py -n 50000 --alpha 1.8 --hub-share 0.7 -o hubby.csv
+
+The output has the columns app_name, business, status, description,
+connects_to and can be fed straight to continent_layout.py.
+        """
+    )
+    parser.add_argument('-n', '--num-apps', type=int, default=100000,
+                        help='Number of apps to generate (default: 100000)')
+    parser.add_argument('-o', '--output', default='enterprise_apps_large.csv',
+                        help='Output CSV file (default: enterprise_apps_large.csv)')
+    parser.add_argument('-s', '--seed', type=int, default=42,
+                        help='Random seed for reproducibility (default: 42)')
+    parser.add_argument('-b', '--businesses', type=int, default=len(BUSINESS_FUNCTIONS),
+                        help=f'Number of businesses (default: {len(BUSINESS_FUNCTIONS)})')
+    parser.add_argument('--avg-degree', type=float, default=2.0,
+                        help='Mean outbound connections per app (default: 2.0)')
+    parser.add_argument('--alpha', type=float, default=2.5,
+                        help='Pareto shape of the degree distribution, > 1 (default: 2.5)')
+    parser.add_argument('--max-degree', type=int, default=200,
+                        help='Max outbound connections per app (default: 200)')
+    parser.add_argument('--hub-fraction', type=float, default=0.01,
+                        help='Share of apps per business acting as hubs (default: 0.01)')
+    parser.add_argument('--hub-share', type=float, default=0.5,
+                        help='Share of connections that target a hub (default: 0.5)')
+    parser.add_argument('--cross-business', type=float, default=0.1,
+                        help='Share of connections to another business (default: 0.1)')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Worker processes, one business per task (default: 1)')
+
+    args = parser.parse_args()
+
+    try:
+        model = EnterpriseModel(
+            num_apps=args.num_apps,
+            num_businesses=args.businesses,
+            seed=args.seed,
+            avg_degree=args.avg_degree,
+            alpha=args.alpha,
+            max_degree=args.max_degree,
+            hub_fraction=args.hub_fraction,
+            hub_share=args.hub_share,
+            cross_business=args.cross_business,
+        )
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+
+    print(f"Generating {args.num_apps} apps across {len(model.businesses)} businesses "
+          f"({args.jobs} job(s))...")
+    start = time.perf_counter()
+    write_enterprise_csv(model, args.output, jobs=args.jobs)
+    elapsed = time.perf_counter() - start
+
+    print(f"Written: {args.output}")
+    print(f"  {args.num_apps} apps in {elapsed:.1f}s "
+          f"({args.num_apps / max(elapsed, 1e-9):,.0f} apps/s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
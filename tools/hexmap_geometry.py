@@ -0,0 +1,109 @@
+"""
+Precomputed HexMap geometry.
+
+Adds what the frontend would otherwise work out for every hex at startup
+to a layout (HexMap data.json format), so the browser does no geometry
+work before drawing:
+
+- "pixel" on every placed app: its hex centre in pixels relative to the
+  grid origin (the frontend adds its viewport centre), for HexGrid.js's
+  pointy-top odd-r grid with hexagons HEX_WIDTH px wide
+- "hasCollision" and "collidesWith" on apps sharing a hex with an earlier
+  app, taking clusters and apps in output order like
+  HexGrid.generateHexCoords
+- a top-level "geometry" section:
+
+    {"hexSize": 12.70..., "hexWidth": 22, "orientation": "pointy-odd-r",
+     "collisions": [{"app", "cluster", "position", "collidesWithApp",
+                     "collidesWithCluster"}]}
+
+  Collision entries match the frontend's collision list.
+
+Everything is computed column by column over flat lists of all apps
+(one pass per column, one dict lookup per app), so it is O(n). The passes
+are plain Python loops, not NumPy, since the layout tools have no required
+dependencies and the results are written onto each app's JSON object
+anyway. No neighbour index is written: the frontend never reads one.
+"""
+
+import math
+from typing import Dict, List, Tuple
+
+HEX_WIDTH = 22                           # Hexagon width in px, as in HexGridRenderer.js
+HEX_SIZE = HEX_WIDTH / math.sqrt(3)      # Centre-to-corner radius
+
+# Fields added by add_geometry (removed again by strip_geometry)
+APP_GEOMETRY_FIELDS = ('pixel', 'hasCollision', 'collidesWith')
+
+
+def pixel_centres(qs: List[int], rs: List[int],
+                  hex_width: float = HEX_WIDTH) -> Tuple[List[float], List[float]]:
+    """Pixel centres of hexes (qs[i], rs[i]), as HexGrid.gridToPixel without its offset."""
+    row_height = 1.5 * hex_width / math.sqrt(3)
+    xs = [round(hex_width * (q + 0.5 * (r & 1)), 3) for q, r in zip(qs, rs)]
+    ys = [round(row_height * r, 3) for r in rs]
+    return xs, ys
+
+
+def strip_geometry(layout: Dict) -> Dict:
+    """Remove what add_geometry added, in place; returns layout."""
+    layout.pop('geometry', None)
+    for cluster in layout.get('clusters', []):
+        for app in cluster.get('applications', []):
+            for field_name in APP_GEOMETRY_FIELDS:
+                app.pop(field_name, None)
+    return layout
+
+
+def add_geometry(layout: Dict, hex_width: float = HEX_WIDTH) -> Dict:
+    """Add pixel centres and collisions, in place; returns layout."""
+    strip_geometry(layout)
+
+    # Flat columns over every placed app, in output order
+    apps = []
+    clusters = []
+    qs = []
+    rs = []
+    for cluster in layout.get('clusters', []):
+        for app in cluster.get('applications', []):
+            position = app.get('gridPosition')
+            if not position:
+                continue
+            apps.append(app)
+            clusters.append(cluster)
+            qs.append(position['q'])
+            rs.append(position['r'])
+
+    xs, ys = pixel_centres(qs, rs, hex_width)
+    for app, x, y in zip(apps, xs, ys):
+        app['pixel'] = {'x': x, 'y': y}
+
+    # Hex -> apps on it; the first one owns it, later ones collide with it
+    occupants: Dict[Tuple[int, int], List[int]] = {}
+    collisions = []
+    for i, hex_pos in enumerate(zip(qs, rs)):
+        on_hex = occupants.setdefault(hex_pos, [])
+        if on_hex:
+            owner = on_hex[0]
+            apps[i]['hasCollision'] = True
+            apps[i]['collidesWith'] = {
+                'name': apps[owner].get('name', apps[owner]['id']),
+                'clusterId': clusters[owner]['id'],
+                'clusterName': clusters[owner]['name'],
+            }
+            collisions.append({
+                'app': apps[i].get('name', apps[i]['id']),
+                'cluster': clusters[i]['name'],
+                'position': f"({qs[i]}, {rs[i]})",
+                'collidesWithApp': apps[owner].get('name', apps[owner]['id']),
+                'collidesWithCluster': clusters[owner]['name'],
+            })
+        on_hex.append(i)
+
+    layout['geometry'] = {
+        'hexSize': hex_width / math.sqrt(3),
+        'hexWidth': hex_width,
+        'orientation': 'pointy-odd-r',
+        'collisions': collisions,
+    }
+    return layout
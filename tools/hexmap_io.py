@@ -0,0 +1,255 @@
+"""
+Shared file helpers for the HexMap tools.
+
+- write_json_atomic: write via a temp file and rename, so a dev server
+  watching the output never reads a half-written file
+- atomic_writer: the same for output written in pieces
+- write_layout: stream a layout as indented or minified JSON, optionally
+  with sorted keys and precompressed .gz / .br siblings
+- FileWatcher: poll input files for changes (mtime first, confirmed by
+  content hash) with debouncing of bursts of saves
+- gc_paused: suspend the cyclic garbage collector during bulk loads
+"""
+
+import functools
+import gc
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import time
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Optional dependencies - check at runtime
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+# Containers write_layout expands item by item: the layout, its clusters
+# list, each cluster and its applications list. Deeper values (one app) are
+# encoded whole.
+STREAM_DEPTH = 4
+STREAM_CHUNK = 1 << 20      # Characters per write
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 9          # 11 is several times slower for a few percent
+
+
+def file_digest(path) -> Optional[str]:
+    """SHA-256 of a file's contents, or None if it does not exist."""
+    h = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+    except FileNotFoundError:
+        return None
+    return h.hexdigest()
+
+
+@contextmanager
+def gc_paused():
+    """
+    Suspend cyclic garbage collection while building many objects.
+
+    Loading a large inventory allocates millions of App objects and lists;
+    each allocation burst triggers collections that rescan the whole growing
+    heap, which can take more time than the parsing itself.
+    """
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+@contextmanager
+def atomic_writer(path, mode: str = 'w'):
+    """Open a temp file in the target directory; on success it is renamed over path."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, mode) as f:
+            yield f
+        # mkstemp creates the file owner-only; match a normally written file
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def write_json_atomic(data, path, indent: Optional[int] = 2):
+    """Write JSON to a temp file in the target directory, then rename over path."""
+    with atomic_writer(path) as f:
+        # json.dump never uses the C encoder; dumps does for compact output
+        f.write(json.dumps(data, indent=indent))
+
+
+@functools.lru_cache(maxsize=None)
+def _encoder(indent: Optional[int], sort_keys: bool) -> json.JSONEncoder:
+    """One encoder per format: json.dumps builds a new one on every call with options."""
+    separators = (',', ':') if indent is None else (',', ': ')
+    return json.JSONEncoder(indent=indent, separators=separators, sort_keys=sort_keys)
+
+
+def iter_json(value, indent: Optional[int] = 2, sort_keys: bool = False,
+              depth: int = STREAM_DEPTH, _level: int = 0) -> Iterator[str]:
+    """
+    json.dumps(value, indent=indent, sort_keys=sort_keys) in pieces (compact
+    separators when indent is None). Containers down to depth are expanded
+    item by item; deeper values are encoded whole.
+    """
+    encoder = _encoder(indent, sort_keys)
+    if depth == 0 or not value or not isinstance(value, (dict, list)):
+        text = encoder.encode(value)
+        if indent is not None and _level:
+            # JSON strings escape their newlines, so these are all line breaks
+            text = text.replace('\n', '\n' + ' ' * (indent * _level))
+        yield text
+        return
+
+    close = inner = ''
+    if indent is not None:
+        close = '\n' + ' ' * (indent * _level)
+        inner = '\n' + ' ' * (indent * (_level + 1))
+    if isinstance(value, dict):
+        yield '{'
+        items = sorted(value.items()) if sort_keys else value.items()
+        for n, (key, item) in enumerate(items):
+            yield (',' if n else '') + inner + encoder.encode(key) + encoder.key_separator
+            yield from iter_json(item, indent, sort_keys, depth - 1, _level + 1)
+        yield close + '}'
+    else:
+        yield '['
+        for n, item in enumerate(value):
+            yield (',' if n else '') + inner
+            yield from iter_json(item, indent, sort_keys, depth - 1, _level + 1)
+        yield close + ']'
+
+
+def compressed_siblings(path) -> Dict[str, Path]:
+    """The precompressed copies of path: {'gzip': path.gz, 'br': path.br}."""
+    path = Path(path)
+    return {'gzip': path.with_name(path.name + '.gz'), 'br': path.with_name(path.name + '.br')}
+
+
+def write_layout(data, path, minify: bool = False, canonical: bool = False,
+                 compress: bool = False) -> List[Path]:
+    """
+    Stream a layout to path (atomically) as JSON: indented like
+    write_json_atomic, or minified. canonical sorts object keys, so equal
+    layouts give equal bytes. compress also writes path.gz and, if brotli is
+    installed, path.br from the same stream; siblings not written this time
+    are removed rather than left stale. Returns the files written.
+    """
+    path = Path(path)
+    siblings = compressed_siblings(path)
+    written = [path]
+    with ExitStack() as stack:
+        sinks = [stack.enter_context(atomic_writer(path, 'wb')).write]
+        brotli_out = None
+        if compress:
+            # mtime=0 and no file name keep the .gz reproducible
+            gzip_out = gzip.GzipFile(filename='', mode='wb', compresslevel=GZIP_LEVEL, mtime=0,
+                                     fileobj=stack.enter_context(atomic_writer(siblings['gzip'], 'wb')))
+            stack.enter_context(gzip_out)
+            sinks.append(gzip_out.write)
+            written.append(siblings['gzip'])
+            if HAS_BROTLI:
+                brotli_out = stack.enter_context(atomic_writer(siblings['br'], 'wb'))
+                compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+                sinks.append(lambda chunk: brotli_out.write(compressor.process(chunk)))
+                written.append(siblings['br'])
+
+        pieces = []
+        size = 0
+        for piece in iter_json(data, indent=None if minify else 2, sort_keys=canonical):
+            pieces.append(piece)
+            size += len(piece)
+            if size >= STREAM_CHUNK:
+                chunk = ''.join(pieces).encode('utf-8')
+                for sink in sinks:
+                    sink(chunk)
+                pieces.clear()
+                size = 0
+        chunk = ''.join(pieces).encode('utf-8')
+        for sink in sinks:
+            sink(chunk)
+        if brotli_out is not None:
+            brotli_out.write(compressor.finish())
+
+    for sibling in siblings.values():
+        if sibling not in written and sibling.exists():
+            sibling.unlink()
+    return written
+
+
+class FileWatcher:
+    """
+    Poll files for changes.
+
+    A change in mtime or size triggers a check; the change is reported only
+    once the file has stopped changing for `debounce` seconds and its content
+    hash differs from the last reported version (so touching a file or saving
+    it unchanged does not trigger a regeneration).
+    """
+
+    def __init__(self, paths: Iterable, poll_interval: float = 0.5, debounce: float = 0.3):
+        self.paths = [Path(p) for p in paths]
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self.stats = {p: self._stat(p) for p in self.paths}
+        self.digests = {p: file_digest(p) for p in self.paths}
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _settle(self) -> Dict[Path, Optional[Tuple[int, int]]]:
+        """Wait until no file has changed for the debounce period."""
+        stats = {p: self._stat(p) for p in self.paths}
+        quiet_since = time.monotonic()
+        while time.monotonic() - quiet_since < self.debounce:
+            time.sleep(min(self.poll_interval, self.debounce) / 2)
+            current = {p: self._stat(p) for p in self.paths}
+            if current != stats:
+                stats = current
+                quiet_since = time.monotonic()
+        return stats
+
+    def poll(self) -> List[Path]:
+        """Return the files whose content changed since the last poll."""
+        current = {p: self._stat(p) for p in self.paths}
+        if current == self.stats:
+            return []
+
+        self.stats = self._settle()
+        changed = []
+        for path in self.paths:
+            digest = file_digest(path)
+            if digest != self.digests[path]:
+                self.digests[path] = digest
+                changed.append(path)
+        return changed
+
+    def wait(self) -> List[Path]:
+        """Block until at least one file's content changes."""
+        while True:
+            changed = self.poll()
+            if changed:
+                return changed
+            time.sleep(self.poll_interval)
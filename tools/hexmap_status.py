@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+"""
+HexMap Status Updater
+
+Patches application health scores in an existing layout file without
+rerunning the layout. The file is scanned once to build an index from app
+id to the byte offset of its "status" value; updates then overwrite those
+few bytes in place. Positions, connections and everything else are left
+untouched.
+
+Status values are kept in fixed 3-character slots ("87 ," is valid JSON),
+so every update fits in place. Files written by the layout tools are
+padded once, on first use; slots that are not a plain 0-100 integer
+(87.5, 1000, -1) are rewritten to one at the same time. Since only digits
+and spaces are ever overwritten, the file stays valid JSON even while a
+patch is in progress.
+
+Patches go straight into a memory map of the file, which other readers
+see at once; syncing to disk and writing the delta happen at most every
+DELTA_INTERVAL seconds. Each delta holds only the changes since the
+previous one and names it as its baseVersion, so the delta file stays
+small however long the feed runs.
+
+Updates are "app_id,status" rows. They are read from a file, from stdin (a
+stream: each chunk that arrives is applied immediately) or from a small
+HTTP endpoint. Within a batch the last value for an app wins.
+
+Usage:
+    python hexmap_status.py updates.csv
+    health-feed | python hexmap_status.py - --delta ../src/data.delta.json
+    python hexmap_status.py --serve --port 8766
+
+HTTP endpoint (--serve):
+    POST /status   CSV rows (text/csv) or JSON {"app_id": status, ...}
+    GET  /delta    Status changes since the layout was indexed (JSON)
+"""
+
+import argparse
+import json
+import mmap
+import os
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from hexmap_io import atomic_writer, compressed_siblings, write_json_atomic
+
+# Width of a status slot: room for "100"
+STATUS_WIDTH = 3
+
+# "id" and "status" keys with their values, plus any spaces after the value.
+# Matching keys with a regex is safe for JSON: inside strings, quotes are
+# always escaped, so '"status":' can only appear as a real key.
+_KEY_PATTERN = re.compile(
+    rb'"(id|status)"\s*:\s*("(?:[^"\\]|\\.)*"|-?[0-9][0-9.eE+-]*)([ \t]*)')
+
+# How much of a file or stream to read per batch
+READ_CHUNK = 1 << 16
+
+# Minimum seconds between syncs (and delta rewrites) while streaming
+DELTA_INTERVAL = 0.25
+
+
+def parse_status(value: bytes) -> int:
+    """Parse a health score the way the layout tools do (0-100, clamped)."""
+    return max(0, min(100, int(float(value))))
+
+
+def format_status(status: int) -> bytes:
+    return b'%-*d' % (STATUS_WIDTH, status)
+
+
+_SLOT_VALUES = [format_status(status) for status in range(101)]
+
+
+def _slot_fits(value: bytes, spaces: bytes) -> bool:
+    """Whether a status slot can be patched in place: a 0-100 integer, STATUS_WIDTH wide."""
+    return (len(value) + len(spaces) >= STATUS_WIDTH and value.isdigit()
+            and (value == b'0' or not value.startswith(b'0')) and int(value) <= 100)
+
+
+def parse_update_rows(lines: Iterable[bytes], updates: Dict[str, int]) -> Tuple[int, int]:
+    """
+    Parse "app_id,status" rows into updates (last value wins).
+
+    The status is taken after the last comma, so app ids may contain commas.
+    Blank lines and a header row are skipped. Returns the number of valid
+    and invalid rows. This is the hot loop, hence the integer fast path.
+    """
+    rows = 0
+    invalid = 0
+    for line in lines:
+        app_id, sep, value = line.rpartition(b',')
+        if not sep:
+            if line.strip():
+                invalid += 1
+            continue
+        try:
+            status = int(value)
+            if not 0 <= status <= 100:
+                status = max(0, min(100, status))
+            updates[app_id.strip(b' \t"').decode('utf-8')] = status
+        except ValueError:
+            try:
+                updates[app_id.strip(b' \t"').decode('utf-8')] = parse_status(value)
+            except ValueError:
+                if value.strip().lower() != b'status':
+                    invalid += 1
+                continue
+        rows += 1
+    return rows, invalid
+
+
+def iter_update_batches(stream) -> Iterator[Tuple[Dict[str, int], int, int]]:
+    """
+    Yield (updates, rows, invalid_rows) for each chunk read from a binary stream.
+
+    read1() returns whatever is available, so on a pipe each batch holds the
+    rows that arrived since the previous one and nothing waits for a full
+    buffer. A row split across chunks is carried over to the next batch.
+    """
+    pending = b''
+    while True:
+        chunk = stream.read1(READ_CHUNK)
+        if not chunk:
+            break
+        lines = (pending + chunk).split(b'\n')
+        pending = lines.pop()
+        updates = {}
+        rows, invalid = parse_update_rows(lines, updates)
+        if rows or invalid:
+            yield updates, rows, invalid
+    if pending.strip():
+        updates = {}
+        rows, invalid = parse_update_rows([pending], updates)
+        yield updates, rows, invalid
+
+
+def _decode_id(raw: bytes) -> str:
+    if b'\\' in raw:
+        return json.loads(b'"' + raw + b'"')
+    return raw.decode('utf-8')
+
+
+class StatusPatcher:
+    """
+    In-place status updates for one layout file.
+
+    The id -> offset index is rebuilt automatically when the file is
+    replaced (e.g. by a new layout run), which also starts a new delta.
+    Thread-safe: the HTTP endpoint applies batches from several threads.
+    Call flush() after applying batches, and close() when done.
+    """
+
+    def __init__(self, layout_path, delta_path=None):
+        self.layout_path = Path(layout_path)
+        self.delta_path = Path(delta_path) if delta_path else None
+        self.offsets: Dict[str, List[int]] = {}
+        self.status: Dict[str, int] = {}
+        self.changed: Dict[str, int] = {}
+        self.version = 0
+        self._file_stat = None
+        self._file = None
+        self._mm = None
+        self._unsynced = False
+        self._synced_at = 0.0
+        self._pending: Dict[str, int] = {}  # Changes since the last delta written
+        self._delta_version = 0             # Version of the last delta written
+        self._lock = threading.Lock()
+        self.index()
+
+    def _stat(self):
+        st = os.stat(self.layout_path)
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def index(self):
+        """Scan the layout file and build the id -> status offset index."""
+        start = time.perf_counter()
+        data = self.layout_path.read_bytes()
+        if self._build_index(data):
+            # Some slots cannot hold every score: rewrite them all once
+            data = _KEY_PATTERN.sub(self._pad_status, data)
+            with atomic_writer(self.layout_path, 'wb') as f:
+                f.write(data)
+            self._build_index(data)
+            print(f"Padded status fields in {self.layout_path} for in-place updates")
+            self._drop_compressed()
+
+        self._unmap()
+        self._file_stat = self._stat()
+        self.changed = {}
+        self._pending = {}
+        print(f"Indexed {len(self.offsets)} apps in {self.layout_path} "
+              f"({(time.perf_counter() - start) * 1000:.0f}ms)")
+
+    def _drop_compressed(self):
+        """Remove .gz / .br copies of the layout: they no longer match the patched file."""
+        for sibling in compressed_siblings(self.layout_path).values():
+            if sibling.exists():
+                sibling.unlink()
+                print(f"Removed stale {sibling}")
+
+    def _map(self) -> mmap.mmap:
+        """The memory map of the layout file, opened on first use."""
+        if self._mm is None:
+            self._file = open(self.layout_path, 'r+b')
+            self._mm = mmap.mmap(self._file.fileno(), 0)
+        return self._mm
+
+    def _unmap(self):
+        """Sync and close the memory map of the current (or replaced) file."""
+        if self._mm is not None:
+            self._sync()
+            self._mm.close()
+            self._file.close()
+            self._mm = self._file = None
+
+    def _sync(self):
+        if self._unsynced:
+            self._mm.flush()
+            # Bump mtime explicitly so watchers (and our own replacement
+            # check) see one well-defined change per sync
+            os.utime(self.layout_path)
+            self._file_stat = self._stat()
+            self._unsynced = False
+        self._synced_at = time.monotonic()
+
+    def close(self):
+        """Sync outstanding patches, write the last delta and release the file."""
+        self.flush(force=True)
+        with self._lock:
+            self._unmap()
+
+    def _build_index(self, data: bytes) -> bool:
+        """Fill offsets/status from data; returns True if any slot must be rewritten."""
+        offsets = {}
+        status = {}
+        needs_padding = False
+        current_id = None
+        for match in _KEY_PATTERN.finditer(data):
+            key, value, spaces = match.groups()
+            if key == b'id':
+                if value.startswith(b'"'):
+                    current_id = _decode_id(value[1:-1])
+                continue
+            if current_id is None or value.startswith(b'"'):
+                continue
+            if not _slot_fits(value, spaces):
+                needs_padding = True
+            offsets.setdefault(current_id, []).append(match.start(2))
+            status[current_id] = parse_status(value)
+        self.offsets = offsets
+        self.status = status
+        return needs_padding
+
+    @staticmethod
+    def _pad_status(match) -> bytes:
+        key, value, spaces = match.groups()
+        if key != b'status' or value.startswith(b'"') or _slot_fits(value, spaces):
+            return match.group(0)
+        prefix = match.group(0)[:match.start(2) - match.start(0)]
+        return prefix + format_status(parse_status(value))
+
+    def apply(self, updates: Dict[str, int]) -> Dict:
+        """Patch a batch of updates into the file; returns a summary."""
+        with self._lock:
+            if self._stat() != self._file_stat:
+                print(f"{self.layout_path} was replaced, re-indexing")
+                self.index()
+
+            changed = {app_id: status for app_id, status in updates.items()
+                       if app_id in self.status and self.status[app_id] != status}
+            unknown = [app_id for app_id in updates if app_id not in self.status]
+
+            if changed:
+                mm = self._map()
+                for app_id, status in changed.items():
+                    value = _SLOT_VALUES[status]
+                    for offset in self.offsets[app_id]:
+                        mm[offset:offset + STATUS_WIDTH] = value
+                # Writing to a mapped page can bump the file's mtime
+                self._file_stat = self._stat()
+                if not self._unsynced:
+                    self._drop_compressed()
+                self._unsynced = True
+
+                self.status.update(changed)
+                self.changed.update(changed)
+                self._pending.update(changed)
+                self.version += 1
+
+            return {"received": len(updates), "changed": len(changed),
+                    "unknown": len(unknown), "unknown_ids": unknown[:10]}
+
+    def flush(self, force: bool = False):
+        """
+        Sync patches to disk and write the delta, at most every
+        DELTA_INTERVAL seconds unless forced.
+        """
+        with self._lock:
+            if not force and time.monotonic() - self._synced_at < DELTA_INTERVAL:
+                return
+            if self._mm is not None:
+                self._sync()
+            if self.delta_path and self._pending:
+                write_json_atomic(self.pending_delta(), self.delta_path, indent=None)
+                self._pending = {}
+                self._delta_version = self.version
+
+    def pending_delta(self) -> Dict:
+        """
+        Status changes since the last delta written: what flush() writes.
+
+        baseVersion is the version of that previous delta, so a reader that
+        missed one (baseVersion is not the version it holds) knows to reload.
+        """
+        return self._delta_document(self._pending, self._delta_version)
+
+    def delta(self) -> Dict:
+        """
+        Status changes since the layout file was indexed.
+
+        Values are absolute, so applying a newer delta over an older one
+        (or applying one twice) gives the same result.
+        """
+        return self._delta_document(self.changed)
+
+    def _delta_document(self, changed: Dict[str, int],
+                        base_version: Optional[int] = None) -> Dict:
+        delta = {"format": "hexmap-delta", "version": self.version}
+        if base_version is not None:
+            delta["baseVersion"] = base_version
+        delta["apps"] = {"changed": {app_id: {"status": status}
+                                     for app_id, status in changed.items()}}
+        return delta
+
+
+class StatusRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end for a StatusPatcher (set as a class attribute)."""
+
+    patcher: StatusPatcher = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, data: Dict):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if path == '/delta':
+            with self.patcher._lock:
+                self._send_json(200, self.patcher.delta())
+        else:
+            self._send_json(404, {"error": f"Unknown path: {path}"})
+
+    def do_POST(self):
+        path = self.path.split('?')[0]
+        if path != '/status':
+            self._send_json(404, {"error": f"Unknown path: {path}"})
+            return
+
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else b''
+        updates = {}
+        try:
+            if body.lstrip().startswith(b'{'):
+                invalid = 0
+                for app_id, value in json.loads(body).items():
+                    updates[app_id] = parse_status(str(value))
+            else:
+                _, invalid = parse_update_rows(body.splitlines(), updates)
+        except (ValueError, AttributeError) as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        summary = self.patcher.apply(updates)
+        self.patcher.flush(force=True)
+        summary["invalid"] = invalid
+        self._send_json(200, summary)
+
+
+def run_stream(patcher: StatusPatcher, stream, verbose: bool = False) -> Dict:
+    """Apply updates from a stream batch by batch; returns totals."""
+    totals = {"rows": 0, "changed": 0, "unknown": 0, "invalid": 0}
+    start = time.perf_counter()
+    for updates, rows, invalid in iter_update_batches(stream):
+        summary = patcher.apply(updates)
+        patcher.flush()
+        totals["rows"] += rows + invalid
+        totals["changed"] += summary["changed"]
+        totals["unknown"] += summary["unknown"]
+        totals["invalid"] += invalid
+        if verbose:
+            print(f"Batch: {summary['received']} apps, {summary['changed']} changed, "
+                  f"{summary['unknown']} unknown")
+    patcher.flush(force=True)
+    totals["seconds"] = time.perf_counter() - start
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Patch app status values in a HexMap layout without relayout',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python hexmap_status.py updates.csv
+  python hexmap_status.py updates.csv --layout ../src/data.json --delta ../src/data.delta.json
+  health-feed | python hexmap_status.py -
+
+  # Small local endpoint
+  python hexmap_status.py --serve --port 8766
+  curl -X POST --data-binary @updates.csv localhost:8766/status
+  curl -X POST -d '{"Customer_DB": 42}' localhost:8766/status
+
+Update format (header optional):
+  app_id,status
+  Customer_DB,42
+        """
+    )
+    parser.add_argument('input', nargs='?',
+                        help='File with app_id,status rows ("-" for stdin)')
+    parser.add_argument('-l', '--layout', default='../src/data.json',
+                        help='Layout file to patch (default: ../src/data.json)')
+    parser.add_argument('-d', '--delta', default=None,
+                        help='Also write the status changes as a compact delta document')
+    parser.add_argument('--serve', action='store_true',
+                        help='Accept updates over HTTP instead of from a file')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='Address to bind with --serve (default: 127.0.0.1)')
+    parser.add_argument('-p', '--port', type=int, default=8766,
+                        help='Port to listen on with --serve (default: 8766)')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='Report every batch')
+
+    args = parser.parse_args()
+
+    if not args.input and not args.serve:
+        parser.print_help()
+        print("\nError: Provide an update file, - for stdin, or --serve")
+        return 1
+
+    def resolve(path):
+        path = Path(path)
+        return path if path.is_absolute() else Path(__file__).parent / path
+
+    layout_path = resolve(args.layout)
+    if not layout_path.exists():
+        print(f"Error: Layout file not found: {layout_path}")
+        return 1
+
+    patcher = StatusPatcher(layout_path, resolve(args.delta) if args.delta else None)
+
+    if args.serve:
+        StatusRequestHandler.patcher = patcher
+        server = ThreadingHTTPServer((args.host, args.port), StatusRequestHandler)
+        server.daemon_threads = True
+        print(f"Accepting status updates on http://{args.host}:{args.port}/status")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nStopping status server")
+        finally:
+            server.server_close()
+            patcher.close()
+        return 0
+
+    try:
+        if args.input == '-':
+            totals = run_stream(patcher, sys.stdin.buffer, args.verbose)
+        else:
+            with open(args.input, 'rb') as f:
+                totals = run_stream(patcher, f, args.verbose)
+    except FileNotFoundError as e:
+        print(f"Error: {e}")
+        return 1
+    except KeyboardInterrupt:
+        print("\nStopped")
+        return 0
+    finally:
+        patcher.close()
+
+    rate = totals["rows"] / totals["seconds"] if totals["seconds"] else 0
+    print(f"Applied {totals['rows']} updates in {totals['seconds'] * 1000:.0f}ms "
+          f"({rate:,.0f}/s): {totals['changed']} status changes, "
+          f"{totals['unknown']} unknown apps, {totals['invalid']} invalid rows")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+HexMap SVG Preview
+
+Renders a layout (HexMap data.json format) straight to an SVG, without the
+dev server or a browser. It uses the frontend's pointy-top odd-r grid and
+colours:
+
+- hexagons filled by cluster colour, or by status (--status) with the
+  thresholds of colorUtils.getStatusColor
+- hexagons that share a position with an earlier app outlined in red
+- territory outlines: the border of each cluster's hexes
+- connections (--connections): the curves of connectionUtils.js, styled by
+  strength, dark grey within a cluster, graded between two clusters
+- cluster names at the centre of their hexes
+
+Cluster colours come from the layout's "color" fields, as with the
+frontend's default colour scheme.
+
+Hexagons of one colour share a single <path>, one subpath per hexagon.
+Everything is written in chunks as it is generated, so a 100k-hex map
+renders in a few seconds and the SVG text is never held in memory in full.
+
+Usage:
+    python hexmap_svg.py ../src/data.json                    # writes ../src/data.svg
+    python hexmap_svg.py ../src/data.json -o preview.svg --status --connections
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, TextIO, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+from hexmap_geometry import HEX_WIDTH, pixel_centres
+from hexmap_io import atomic_writer
+
+# Status colours and thresholds, as in src/utils/colorUtils.js
+STATUS_COLORS = {'low': '#FF0000', 'medium': '#FFA500', 'high': '#008000', 'undefined': '#808080'}
+EMPTY_COLOR = '#cccccc'
+
+# Connection stroke width and dash pattern by strength, as in connectionUtils.js
+CONNECTION_STYLES = {'high': (3, None), 'medium': (2, None), 'low': (1.5, '5,3')}
+DEFAULT_CONNECTION_STYLE = (2, None)
+CONNECTION_CURVES = {'data-flow': 0.3, 'api': 0.15}
+DEFAULT_CONNECTION_CURVE = 0.2
+
+# Neighbour across each hexagon edge (corner i to corner i + 1), by row
+# parity. Corners start at the bottom and run clockwise on screen.
+EDGE_NEIGHBOURS = (
+    ((-1, 1), (-1, 0), (-1, -1), (0, -1), (1, 0), (0, 1)),   # even rows
+    ((0, 1), (-1, 0), (0, -1), (1, -1), (1, 0), (1, 1)),     # odd rows
+)
+
+MARGIN = 20           # px around the map
+CHUNK = 4096          # Subpaths or elements per write
+
+
+def status_color(status) -> str:
+    """colorUtils.getStatusColor."""
+    if status is None:
+        return STATUS_COLORS['undefined']
+    if status < 33:
+        return STATUS_COLORS['low']
+    if status < 66:
+        return STATUS_COLORS['medium']
+    return STATUS_COLORS['high']
+
+
+def hex_corners(hex_width: float = HEX_WIDTH) -> List[Tuple[float, float]]:
+    """Corner offsets of a pointy-top hexagon, as HexGrid.hexagonPath."""
+    size = hex_width / math.sqrt(3)
+    return [(size * math.cos(math.pi / 2 + i * math.pi / 3),
+             size * math.sin(math.pi / 2 + i * math.pi / 3)) for i in range(6)]
+
+
+def _write_chunked(out: TextIO, pieces):
+    buffer = []
+    for piece in pieces:
+        buffer.append(piece)
+        if len(buffer) >= CHUNK:
+            out.write(''.join(buffer))
+            buffer.clear()
+    out.write(''.join(buffer))
+
+
+def _connection_path(x1, y1, x2, y2, kind) -> str:
+    """connectionUtils.generateConnectionPath."""
+    dx, dy = x2 - x1, y2 - y1
+    distance = math.hypot(dx, dy)
+    curve = distance * CONNECTION_CURVES.get(kind, DEFAULT_CONNECTION_CURVE)
+    cx = (x1 + x2) / 2 - dy / distance * curve
+    cy = (y1 + y2) / 2 + dx / distance * curve
+    return f"M{x1:.1f},{y1:.1f}Q{cx:.1f},{cy:.1f} {x2:.1f},{y2:.1f}"
+
+
+def render_svg(layout: Dict, out: TextIO, color_mode: str = 'cluster',
+               connections: bool = False, outlines: bool = True, labels: bool = True,
+               hex_width: float = HEX_WIDTH) -> Dict[str, int]:
+    """
+    Write layout as SVG to out. color_mode is 'cluster' or 'status'.
+    Returns counts of what was drawn.
+    """
+    # Flat columns over every placed app, in output order
+    apps = []
+    owners = []
+    qs = []
+    rs = []
+    clusters = layout.get('clusters', [])
+    for index, cluster in enumerate(clusters):
+        for app in cluster.get('applications', []):
+            position = app.get('gridPosition')
+            if not position:
+                continue
+            apps.append(app)
+            owners.append(index)
+            qs.append(position['q'])
+            rs.append(position['r'])
+    xs, ys = pixel_centres(qs, rs, hex_width)
+
+    corners = hex_corners(hex_width)
+    size = hex_width / math.sqrt(3)
+    if apps:
+        left, right = min(xs) - hex_width / 2 - MARGIN, max(xs) + hex_width / 2 + MARGIN
+        top, bottom = min(ys) - size - MARGIN, max(ys) + size + MARGIN
+    else:
+        left, right, top, bottom = -MARGIN, MARGIN, -MARGIN, MARGIN
+    width, height = right - left, bottom - top
+
+    # First app on each hex owns it, as in the frontend's occupancy map
+    occupied = {}
+    colliding = []
+    for i, position in enumerate(zip(qs, rs)):
+        if position in occupied:
+            colliding.append(i)
+        else:
+            occupied[position] = i
+
+    out.write(f'<svg xmlns="http://www.w3.org/2000/svg" '
+              f'viewBox="{left:.1f} {top:.1f} {width:.1f} {height:.1f}" '
+              f'width="{width:.0f}" height="{height:.0f}">\n'
+              f'<rect x="{left:.1f}" y="{top:.1f}" width="{width:.1f}" height="{height:.1f}" '
+              f'fill="#ffffff"/>\n')
+
+    # Hexagons: one path per fill colour, drawn as relative moves from the top corner
+    hexagon = ''.join(f"l{bx - ax:.2f},{by - ay:.2f}"
+                      for (ax, ay), (bx, by) in zip(corners[3:] + corners[:2],
+                                                    corners[4:] + corners[:3])) + 'z'
+    if color_mode == 'status':
+        fills = [status_color(app.get('status')) for app in apps]
+    else:
+        cluster_fills = [cluster.get('color') or EMPTY_COLOR for cluster in clusters]
+        fills = [cluster_fills[owner] for owner in owners]
+    by_fill = {}
+    for i, fill in enumerate(fills):
+        by_fill.setdefault(fill, []).append(i)
+
+    out.write('<g class="hexagons" stroke="#fff" stroke-width="1">\n')
+    for fill, members in by_fill.items():
+        out.write(f'<path fill="{fill}" d="')
+        _write_chunked(out, (f"M{xs[i]:.1f},{ys[i] - size:.1f}{hexagon}" for i in members))
+        out.write('"/>\n')
+    out.write('</g>\n')
+
+    if colliding:
+        out.write('<path class="collisions" fill="none" stroke="#ff0000" stroke-width="2" d="')
+        _write_chunked(out, (f"M{xs[i]:.1f},{ys[i] - size:.1f}{hexagon}" for i in colliding))
+        out.write('"/>\n')
+
+    # Territory outlines: every hex edge whose neighbour belongs to another cluster
+    outline_edges = 0
+    if outlines:
+        def edges():
+            nonlocal outline_edges
+            for (q, r), i in occupied.items():
+                owner, x, y = owners[i], xs[i], ys[i]
+                for corner, (dq, dr) in enumerate(EDGE_NEIGHBOURS[r & 1]):
+                    neighbour = occupied.get((q + dq, r + dr))
+                    if neighbour is not None and owners[neighbour] == owner:
+                        continue
+                    (ax, ay), (bx, by) = corners[corner], corners[(corner + 1) % 6]
+                    outline_edges += 1
+                    yield f"M{x + ax:.1f},{y + ay:.1f}L{x + bx:.1f},{y + by:.1f}"
+
+        out.write('<path class="outlines" fill="none" stroke="#000000" stroke-width="2" '
+                  'stroke-linecap="round" d="')
+        _write_chunked(out, edges())
+        out.write('"/>\n')
+
+    connection_count = 0
+    if connections:
+        index_of = {app.get('id'): i for i, app in enumerate(apps)}
+        app_colors = [clusters[owner].get('color') or EMPTY_COLOR for owner in owners]
+
+        def connection_elements():
+            nonlocal connection_count
+            for i, app in enumerate(apps):
+                for connection in app.get('connections', []):
+                    j = index_of.get(connection.get('to'))
+                    if j is None or (xs[i], ys[i]) == (xs[j], ys[j]):
+                        continue
+                    stroke_width, dash = CONNECTION_STYLES.get(connection.get('strength'),
+                                                               DEFAULT_CONNECTION_STYLE)
+                    path = _connection_path(xs[i], ys[i], xs[j], ys[j], connection.get('type'))
+                    dash = f' stroke-dasharray="{dash}"' if dash else ''
+                    if app_colors[i] == app_colors[j]:
+                        stroke = '#444444'
+                        gradient = ''
+                    else:
+                        stroke = f'url(#c{connection_count})'
+                        gradient = (f'<linearGradient id="c{connection_count}" '
+                                    f'gradientUnits="userSpaceOnUse" x1="{xs[i]:.1f}" '
+                                    f'y1="{ys[i]:.1f}" x2="{xs[j]:.1f}" y2="{ys[j]:.1f}">'
+                                    f'<stop offset="10%" stop-color="{app_colors[i]}"/>'
+                                    f'<stop offset="90%" stop-color="{app_colors[j]}"/>'
+                                    f'</linearGradient>')
+                    connection_count += 1
+                    yield (f'{gradient}<path d="{path}" stroke="{stroke}" '
+                           f'stroke-width="{stroke_width}"{dash}/>\n')
+
+        out.write('<g class="connections" fill="none" opacity="0.7">\n')
+        _write_chunked(out, connection_elements())
+        out.write('</g>\n')
+
+    if labels and apps:
+        sums = {}
+        for i, owner in enumerate(owners):
+            x, y, count = sums.get(owner, (0.0, 0.0, 0))
+            sums[owner] = (x + xs[i], y + ys[i], count + 1)
+        out.write('<g class="labels" font-family="sans-serif" font-size="14" '
+                  'font-weight="bold" text-anchor="middle" fill="#222" stroke="#fff" '
+                  'stroke-width="3" paint-order="stroke">\n')
+        for owner, (x, y, count) in sums.items():
+            name = clusters[owner].get('name') or clusters[owner].get('id', '')
+            out.write(f'<text x="{x / count:.1f}" y="{y / count:.1f}" '
+                      f'id={quoteattr("label-" + str(clusters[owner].get("id", owner)))}>'
+                      f'{escape(str(name))}</text>\n')
+        out.write('</g>\n')
+
+    out.write('</svg>\n')
+    return {'hexagons': len(apps), 'collisions': len(colliding),
+            'outline_edges': outline_edges, 'connections': connection_count}
+
+
+def write_svg(layout: Dict, path, **options) -> Dict[str, int]:
+    """Render layout to an SVG file (atomically); returns render_svg's counts."""
+    with atomic_writer(path) as out:
+        return render_svg(layout, out, **options)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Render a HexMap layout to SVG without a browser',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python hexmap_svg.py ../src/data.json
+  python hexmap_svg.py ../src/data.json -o preview.svg --status
+  python hexmap_svg.py ../src/data.json -o preview.svg --connections --no-labels
+        """
+    )
+    parser.add_argument('input', help='Layout JSON (HexMap data.json format)')
+    parser.add_argument('-o', '--output', default=None,
+                        help='Output SVG (default: the input path with .svg)')
+    parser.add_argument('--status', action='store_true',
+                        help='Colour hexagons by status instead of cluster')
+    parser.add_argument('--connections', action='store_true',
+                        help='Draw every connection')
+    parser.add_argument('--no-outlines', action='store_true',
+                        help='Leave out territory outlines')
+    parser.add_argument('--no-labels', action='store_true',
+                        help='Leave out cluster names')
+    args = parser.parse_args()
+
+    output = Path(args.output) if args.output else Path(args.input).with_suffix('.svg')
+    start = time.perf_counter()
+    try:
+        with open(args.input) as f:
+            layout = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error: cannot read {args.input}: {e}")
+        sys.exit(1)
+    counts = write_svg(layout, output, color_mode='status' if args.status else 'cluster',
+                       connections=args.connections, outlines=not args.no_outlines,
+                       labels=not args.no_labels)
+    print(f"Written: {output} ({counts['hexagons']} hexagons, {counts['connections']} connections) "
+          f"in {(time.perf_counter() - start) * 1000:.0f}ms")
+
+
+if __name__ == '__main__':
+    main()
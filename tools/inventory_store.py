@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""
+HexMap Inventory Store
+
+Optional SQLite backend for the layout tools. An inventory export (CSV, TSV
+or XLSX) is ingested once into indexed tables; later runs load the apps
+from SQLite instead of reparsing the file, and re-ingesting an updated
+export only writes the rows that changed.
+
+Tables:
+    businesses   One row per business, with the persisted continent centroid
+    apps         One row per app; `revision` records the store revision of
+                 its last change (removed apps are kept as `deleted` rows).
+                 `connects_to` repeats the app's connections in one column
+                 so loading needs no join
+    connections  One row per connects_to entry, indexed both ways for
+                 dependency queries
+    positions    Grid position and continent of each app in the last layout
+    territories  Hexes of each business's territory in the last layout
+
+The store revision increases with every ingest that changes something, and
+the revision each layout was computed from is recorded, so
+changes_since(layout_revision()) lists exactly what changed since the last
+layout. continent_layout.py --db reuses the persisted territories when they
+still fit, which skips the expensive centroid and territory phases.
+
+The database is a local file; no server is involved.
+
+Usage:
+    python inventory_store.py ingest apps.csv --db inventory.db
+    python inventory_store.py info --db inventory.db
+    python inventory_store.py compare apps.csv     # load time: CSV vs SQLite
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from continent_layout import App, ContinentLayoutEngine, load_inventory
+from hexmap_io import gc_paused
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS businesses (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    centroid_q REAL,
+    centroid_r REAL
+);
+CREATE TABLE IF NOT EXISTS apps (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    business_id INTEGER NOT NULL REFERENCES businesses(id),
+    status INTEGER NOT NULL,
+    description TEXT NOT NULL,
+    show_indicator INTEGER NOT NULL,
+    connects_to TEXT NOT NULL,
+    region TEXT NOT NULL DEFAULT '',
+    sub_business TEXT NOT NULL DEFAULT '',
+    position INTEGER NOT NULL,
+    revision INTEGER NOT NULL,
+    deleted INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS connections (
+    source TEXT NOT NULL,
+    ordinal INTEGER NOT NULL,
+    target TEXT NOT NULL,
+    PRIMARY KEY (source, ordinal)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS positions (
+    app_id TEXT PRIMARY KEY,
+    q INTEGER NOT NULL,
+    r INTEGER NOT NULL,
+    cluster_id TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS territories (
+    business_id INTEGER NOT NULL,
+    q INTEGER NOT NULL,
+    r INTEGER NOT NULL,
+    PRIMARY KEY (business_id, q, r)
+) WITHOUT ROWID;
+"""
+
+# Secondary indexes; dropped during the first bulk ingest and built afterwards,
+# which is several times faster than maintaining them row by row
+INDEXES = {
+    'apps_business': "apps(business_id)",
+    'apps_revision': "apps(revision)",
+    'apps_position': "apps(position)",
+    'connections_target': "connections(target)",
+}
+
+# Engine settings a persisted layout depends on; territories are only
+# reused when these match
+LAYOUT_PARAMS = ('water_gap', 'connected_gap', 'padding_ratio', 'force_iterations',
+                 'seed', 'jitter', 'hierarchical', 'nested_gap')
+
+
+def layout_params(engine: ContinentLayoutEngine) -> Dict:
+    return {name: getattr(engine, name) for name in LAYOUT_PARAMS}
+
+
+class InventoryStore:
+    """An app inventory and its last layout in a SQLite file."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._migrate()
+        self._create_indexes()
+
+    def _migrate(self):
+        """Add columns introduced after a store file was created."""
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(apps)")}
+        for column in ('region', 'sub_business'):
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE apps ADD COLUMN {column} TEXT NOT NULL DEFAULT ''")
+
+    def _create_indexes(self):
+        for name, columns in INDEXES.items():
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {columns}")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _meta(self, key: str, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _set_meta(self, key: str, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                          (key, json.dumps(value)))
+
+    def revision(self) -> int:
+        """Current store revision (0 for an empty store)."""
+        return self._meta('revision', 0)
+
+    def layout_revision(self) -> Optional[int]:
+        """Store revision the last saved layout was computed from."""
+        return self._meta('layout_revision')
+
+    def _business_ids(self, names) -> Dict[str, int]:
+        self.conn.executemany("INSERT OR IGNORE INTO businesses (name) VALUES (?)",
+                              ((name,) for name in names))
+        return {name: business_id for business_id, name
+                in self.conn.execute("SELECT id, name FROM businesses")}
+
+    def ingest_apps(self, apps: List[App], prune: bool = True) -> Dict[str, int]:
+        """
+        Sync the store with a full inventory.
+
+        New and changed apps are written with a new revision; apps missing
+        from the inventory are marked deleted (if prune). Unchanged apps are
+        not rewritten. Returns counts per kind of change.
+        """
+        revision = self.revision() + 1
+        counts = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0}
+
+        with self.conn, gc_paused():
+            business_ids = self._business_ids({app.business for app in apps})
+            existing = {row[0]: row[1:] for row in self.conn.execute(
+                "SELECT id, name, business_id, status, description, show_indicator, "
+                "connects_to, region, sub_business, deleted, position FROM apps")}
+
+            upserts = []
+            moved = []
+            connection_rows = []
+            replaced_connections = []
+            for position, app in enumerate(apps):
+                connects_to = ';'.join(app.connections)
+                content = (app.name, business_ids[app.business], app.status,
+                           app.description, int(app.show_position_indicator), connects_to,
+                           app.region, app.sub_business, 0)
+                previous = existing.get(app.id)
+                if previous is not None and previous[:9] == content:
+                    counts["unchanged"] += 1
+                    if previous[9] != position:
+                        moved.append((position, app.id))
+                    continue
+
+                counts["added" if previous is None or previous[8] else "changed"] += 1
+                upserts.append((app.id, *content[:8], position, revision))
+                if previous is None or previous[5] != connects_to:
+                    if previous is not None:
+                        replaced_connections.append((app.id,))
+                    connection_rows.extend((app.id, ordinal, target)
+                                           for ordinal, target in enumerate(app.connections))
+
+            # Inserting in key order keeps B-tree writes sequential
+            upserts.sort()
+            connection_rows.sort()
+            bulk_load = not existing
+            if bulk_load:
+                for name in INDEXES:
+                    self.conn.execute(f"DROP INDEX IF EXISTS {name}")
+
+            self.conn.executemany(
+                "INSERT INTO apps (id, name, business_id, status, description, "
+                "show_indicator, connects_to, region, sub_business, position, revision, "
+                "deleted) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0) "
+                "ON CONFLICT(id) DO UPDATE SET name = excluded.name, "
+                "business_id = excluded.business_id, status = excluded.status, "
+                "description = excluded.description, "
+                "show_indicator = excluded.show_indicator, "
+                "connects_to = excluded.connects_to, region = excluded.region, "
+                "sub_business = excluded.sub_business, "
+                "position = excluded.position, "
+                "revision = excluded.revision, deleted = 0", upserts)
+            # Row order only matters for layout determinism, not a content change
+            self.conn.executemany("UPDATE apps SET position = ? WHERE id = ?", moved)
+            self.conn.executemany("DELETE FROM connections WHERE source = ?", replaced_connections)
+            self.conn.executemany("INSERT INTO connections (source, ordinal, target) "
+                                  "VALUES (?, ?, ?)", connection_rows)
+            if bulk_load:
+                self._create_indexes()
+
+            if prune:
+                current = {app.id for app in apps}
+                removed = [(revision, app_id) for app_id, row in existing.items()
+                           if not row[8] and app_id not in current]
+                counts["removed"] = len(removed)
+                self.conn.executemany("UPDATE apps SET deleted = 1, connects_to = '', "
+                                      "revision = ? WHERE id = ?", removed)
+                self.conn.executemany("DELETE FROM connections WHERE source = ?",
+                                      ((app_id,) for _, app_id in removed))
+
+            if counts["added"] or counts["changed"] or counts["removed"]:
+                self._set_meta('revision', revision)
+        return counts
+
+    def ingest_file(self, filepath, prune: bool = True) -> Dict[str, int]:
+        """Ingest a CSV/TSV/XLSX export (parsed exactly like continent_layout.py)."""
+        return self.ingest_apps(load_inventory(filepath), prune=prune)
+
+    def _apps_from_query(self, where: str, params=()) -> List[App]:
+        businesses = dict(self.conn.execute("SELECT id, name FROM businesses"))
+        with gc_paused():
+            # Sorted here rather than with ORDER BY, so SQLite is free to use
+            # the revision index for changes_since
+            rows = sorted(self.conn.execute(
+                "SELECT position, id, name, business_id, status, description, "
+                f"show_indicator, connects_to, region, sub_business FROM apps WHERE {where}",
+                params))
+            return [App(id=app_id, name=name, business=businesses[business_id],
+                        connections=connects_to.split(';') if connects_to else [],
+                        status=status, description=description,
+                        show_position_indicator=bool(indicator), region=region,
+                        sub_business=sub_business)
+                    for (_, app_id, name, business_id, status, description, indicator,
+                         connects_to, region, sub_business) in rows]
+
+    def dependents(self, app_id: str) -> List[str]:
+        """Ids of the current apps that connect to app_id."""
+        return [source for (source,) in self.conn.execute(
+            "SELECT c.source FROM connections c JOIN apps a ON a.id = c.source "
+            "WHERE c.target = ? AND NOT a.deleted ORDER BY c.source", (app_id,))]
+
+    def load_apps(self) -> List[App]:
+        """All current apps, in inventory order."""
+        return self._apps_from_query("NOT deleted")
+
+    def changes_since(self, revision: int) -> Tuple[List[App], List[str]]:
+        """Apps added or changed after a revision, and ids removed after it."""
+        changed = self._apps_from_query("revision > ? AND NOT deleted", (revision,))
+        removed = [row[0] for row in self.conn.execute(
+            "SELECT id FROM apps WHERE revision > ? AND deleted", (revision,))]
+        return changed, removed
+
+    def save_layout(self, engine: ContinentLayoutEngine):
+        """Persist the engine's positions and territories for the current revision."""
+        with self.conn:
+            business_ids = self._business_ids({c.name for c in engine.continents.values()})
+            self.conn.execute("DELETE FROM positions")
+            self.conn.execute("DELETE FROM territories")
+            self.conn.executemany(
+                "INSERT INTO positions (app_id, q, r, cluster_id) VALUES (?, ?, ?, ?)",
+                ((app.id, app.grid_position[0], app.grid_position[1], continent.id)
+                 for continent in engine.continents.values()
+                 for app in continent.apps if app.grid_position is not None))
+            self.conn.execute("UPDATE businesses SET centroid_q = NULL, centroid_r = NULL")
+            for business, (centroid, territory) in engine.territories().items():
+                business_id = business_ids[business]
+                self.conn.execute("UPDATE businesses SET centroid_q = ?, centroid_r = ? "
+                                  "WHERE id = ?", (*centroid, business_id))
+                self.conn.executemany(
+                    "INSERT INTO territories (business_id, q, r) VALUES (?, ?, ?)",
+                    ((business_id, q, r) for q, r in territory))
+            self._set_meta('layout_revision', self.revision())
+            self._set_meta('layout_params', layout_params(engine))
+
+    def load_territories(self, engine: ContinentLayoutEngine) -> Optional[Dict]:
+        """
+        Persisted territories in ContinentLayoutEngine.territories() form,
+        or None if there is no saved layout or it used other settings.
+        """
+        if self.layout_revision() is None or self._meta('layout_params') != layout_params(engine):
+            return None
+        territories = {}
+        for name, q, r in self.conn.execute(
+                "SELECT name, centroid_q, centroid_r FROM businesses "
+                "WHERE centroid_q IS NOT NULL"):
+            territories[name] = ((q, r), set())
+        for name, q, r in self.conn.execute(
+                "SELECT b.name, t.q, t.r FROM territories t "
+                "JOIN businesses b ON b.id = t.business_id"):
+            territories[name][1].add((q, r))
+        return territories
+
+    def positions(self) -> Dict[str, Tuple[int, int]]:
+        """Grid positions from the last saved layout."""
+        return {app_id: (q, r) for app_id, q, r in
+                self.conn.execute("SELECT app_id, q, r FROM positions")}
+
+    def info(self) -> Dict:
+        count = lambda sql: self.conn.execute(sql).fetchone()[0]
+        return {
+            "revision": self.revision(),
+            "layout_revision": self.layout_revision(),
+            "apps": count("SELECT COUNT(*) FROM apps WHERE NOT deleted"),
+            "deleted_apps": count("SELECT COUNT(*) FROM apps WHERE deleted"),
+            "connections": count("SELECT COUNT(*) FROM connections"),
+            "businesses": count("SELECT COUNT(*) FROM businesses"),
+            "positions": count("SELECT COUNT(*) FROM positions"),
+            "territory_hexes": count("SELECT COUNT(*) FROM territories"),
+        }
+
+
+def compare_load_times(csv_path, db_path=None) -> Dict[str, float]:
+    """Time loading an inventory from CSV against the SQLite store."""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(db_path) if db_path else Path(tmp) / 'inventory.db'
+
+        start = time.perf_counter()
+        apps = load_inventory(csv_path)
+        results['csv_load'] = time.perf_counter() - start
+
+        with InventoryStore(db_path) as store:
+            start = time.perf_counter()
+            store.ingest_apps(apps)
+            results['sqlite_ingest'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            loaded = store.load_apps()
+            results['sqlite_load'] = time.perf_counter() - start
+            if loaded != apps:
+                raise RuntimeError("Apps loaded from SQLite differ from the CSV")
+
+            start = time.perf_counter()
+            store.ingest_apps(apps)
+            results['sqlite_reingest_unchanged'] = time.perf_counter() - start
+
+            start = time.perf_counter()
+            store.changes_since(store.revision())
+            results['sqlite_changes_since'] = time.perf_counter() - start
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='SQLite store for HexMap app inventories and layouts',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python inventory_store.py ingest apps.csv --db inventory.db
+  python inventory_store.py ingest apps.xlsx --db inventory.db
+  python inventory_store.py info --db inventory.db
+  python inventory_store.py compare enterprise_apps_large.csv
+
+  # Lay out from the store (ingesting the file first if given)
+  python continent_layout.py apps.csv --db inventory.db
+  python continent_layout.py --db inventory.db
+        """
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ingest = subparsers.add_parser('ingest', help='Ingest a CSV/TSV/XLSX export')
+    ingest.add_argument('input', help='Inventory file')
+    ingest.add_argument('--db', default='inventory.db',
+                        help='SQLite file (default: inventory.db)')
+    ingest.add_argument('--keep-missing', action='store_true',
+                        help='Keep apps that are not in the file instead of removing them')
+
+    info = subparsers.add_parser('info', help='Show store contents and revisions')
+    info.add_argument('--db', default='inventory.db',
+                      help='SQLite file (default: inventory.db)')
+
+    compare = subparsers.add_parser('compare', help='Compare CSV and SQLite load times')
+    compare.add_argument('input', help='Inventory file')
+    compare.add_argument('--db', default=None,
+                         help='SQLite file to use (default: a temporary one)')
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'ingest':
+            with InventoryStore(args.db) as store:
+                start = time.perf_counter()
+                counts = store.ingest_file(args.input, prune=not args.keep_missing)
+                print(f"Ingested into {args.db} in {time.perf_counter() - start:.2f}s "
+                      f"(revision {store.revision()}): "
+                      + ", ".join(f"{count} {kind}" for kind, count in counts.items()))
+        elif args.command == 'info':
+            if not Path(args.db).exists():
+                print(f"Error: Store not found: {args.db}")
+                return 1
+            with InventoryStore(args.db) as store:
+                for key, value in store.info().items():
+                    print(f"{key}: {value}")
+        else:
+            results = compare_load_times(args.input, args.db)
+            print("\nLoad times:")
+            for name, seconds in results.items():
+                print(f"  {name:<28} {seconds:8.3f}s")
+            print(f"\nSQLite load is {results['csv_load'] / results['sqlite_load']:.1f}x "
+                  f"faster than parsing the CSV")
+    except (OSError, ImportError, sqlite3.Error) as e:
+        print(f"Error: {e}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
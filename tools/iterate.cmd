@@ -49,3 +49,5 @@ echo ========================================
 echo Done! Browser should show updated map.
 echo Re-run this script to iterate.
 echo ========================================
+echo Tip: for a CSV/XLSX inventory, keep the layout current while editing with
+echo   python continent_layout.py apps.csv --watch
@@ -38,3 +38,5 @@ echo ""
 echo "========================================"
 echo "Done! Refresh http://localhost:3000"
 echo "========================================"
+echo "Tip: for a CSV/XLSX inventory, keep the layout current while editing with"
+echo "  python3 continent_layout.py apps.csv --watch"
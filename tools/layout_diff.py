@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+HexMap Layout Diff
+
+Computes a compact delta between two layouts (HexMap data.json format) so
+the frontend can apply a regeneration instead of reloading the whole file.
+Apps and clusters are matched by id through dict indices, so a diff is a
+single O(n) pass over both layouts.
+
+Delta format (empty sections are omitted):
+
+    {
+      "format": "hexmap-delta",
+      "version": 5, "baseVersion": 4,
+      "clusters": {"added": [cluster without applications],
+                   "removed": [cluster ids],
+                   "changed": {cluster id: merge patch}},
+      "apps": {"added": [app + "cluster": cluster id],
+               "removed": [app ids],
+               "moved": {app id: {"gridPosition": ..., "cluster": id}},
+               "changed": {app id: merge patch}},
+      "connections": {app id: [full connection list]},
+      "root": merge patch of the other top-level keys
+    }
+
+Merge patches follow RFC 7396: changed fields carry their new value and
+removed fields are null (the layout tools never write null values, so
+this is unambiguous). "moved" holds the new gridPosition and, if the app
+changed continent, its new cluster. Order within a cluster's applications
+is not preserved: added and moved apps are appended.
+
+Usage:
+    python layout_diff.py old.json new.json
+    python layout_diff.py old.json new.json -o delta.json --version 2
+"""
+
+import argparse
+import copy
+import json
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from hexmap_io import write_json_atomic
+
+# App fields reported in their own delta section rather than in "changed"
+_APP_SECTION_FIELDS = {'id', 'gridPosition', 'connections'}
+
+# Sentinel so a field newly set to null still counts as a change
+_MISSING = object()
+
+
+def _merge_patch(old: Dict, new: Dict, skip=()) -> Dict:
+    """RFC 7396 style patch turning old into new (top-level keys only)."""
+    patch = {key: value for key, value in new.items()
+             if key not in skip and old.get(key, _MISSING) != value}
+    patch.update({key: None for key in old
+                  if key not in skip and key not in new})
+    return patch
+
+
+def index_layout(layout: Dict) -> Tuple[Dict[str, Dict], Dict[str, Tuple[str, Dict]]]:
+    """Index a layout: cluster id -> cluster, app id -> (cluster id, app)."""
+    clusters = {}
+    apps = {}
+    for cluster in layout.get('clusters', []):
+        clusters[cluster['id']] = cluster
+        for app in cluster.get('applications', []):
+            apps[app['id']] = (cluster['id'], app)
+    return clusters, apps
+
+
+def diff_layouts(old: Dict, new: Dict, version: Optional[int] = None,
+                 base_version: Optional[int] = None) -> Dict:
+    """Delta that turns layout `old` into layout `new`."""
+    old_clusters, old_apps = index_layout(old)
+    new_clusters, new_apps = index_layout(new)
+
+    clusters = {"added": [], "removed": [], "changed": {}}
+    for cluster_id, cluster in new_clusters.items():
+        previous = old_clusters.get(cluster_id)
+        if previous is None:
+            clusters["added"].append(
+                {k: v for k, v in cluster.items() if k != 'applications'})
+        else:
+            patch = _merge_patch(previous, cluster, skip=('id', 'applications'))
+            if patch:
+                clusters["changed"][cluster_id] = patch
+    clusters["removed"] = [cluster_id for cluster_id in old_clusters
+                           if cluster_id not in new_clusters]
+
+    apps = {"added": [], "removed": [], "moved": {}, "changed": {}}
+    connections = {}
+    for app_id, (cluster_id, app) in new_apps.items():
+        previous = old_apps.get(app_id)
+        if previous is None:
+            apps["added"].append(dict(app, cluster=cluster_id))
+            continue
+
+        previous_cluster, previous_app = previous
+        move = {}
+        if previous_app.get('gridPosition') != app.get('gridPosition'):
+            move['gridPosition'] = app.get('gridPosition')
+        if previous_cluster != cluster_id:
+            move['cluster'] = cluster_id
+            move.setdefault('gridPosition', app.get('gridPosition'))
+        if move:
+            apps["moved"][app_id] = move
+
+        if previous_app.get('connections', []) != app.get('connections', []):
+            connections[app_id] = app.get('connections', [])
+
+        patch = _merge_patch(previous_app, app, skip=_APP_SECTION_FIELDS)
+        if patch:
+            apps["changed"][app_id] = patch
+    apps["removed"] = [app_id for app_id in old_apps if app_id not in new_apps]
+
+    delta = {"format": "hexmap-delta"}
+    if version is not None:
+        delta["version"] = version
+    if base_version is not None:
+        delta["baseVersion"] = base_version
+    clusters = {k: v for k, v in clusters.items() if v}
+    apps = {k: v for k, v in apps.items() if v}
+    if clusters:
+        delta["clusters"] = clusters
+    if apps:
+        delta["apps"] = apps
+    if connections:
+        delta["connections"] = connections
+    root = _merge_patch(old, new, skip=('clusters',))
+    if root:
+        delta["root"] = root
+    return delta
+
+
+def is_empty_delta(delta: Dict) -> bool:
+    """True if the delta changes nothing (version fields aside)."""
+    return not any(key in delta for key in ('clusters', 'apps', 'connections', 'root'))
+
+
+def delta_summary(delta: Dict) -> str:
+    """Short human-readable count of what a delta contains."""
+    parts = []
+    for section in ('apps', 'clusters'):
+        for kind, entries in delta.get(section, {}).items():
+            parts.append(f"{len(entries)} {kind} {section[:-1] if len(entries) == 1 else section}")
+    if delta.get('connections'):
+        parts.append(f"{len(delta['connections'])} connection lists")
+    return ", ".join(parts) or "no changes"
+
+
+def _apply_patch(target: Dict, patch: Dict):
+    for key, value in patch.items():
+        if value is None:
+            target.pop(key, None)
+        else:
+            target[key] = value
+
+
+def apply_delta(layout: Dict, delta: Dict) -> Dict:
+    """
+    Apply a delta to a copy of layout and return it.
+
+    Python counterpart of src/utils/layoutDelta.js, mainly for tests and
+    for tools that keep a layout in memory.
+    """
+    layout = copy.deepcopy(layout)
+    _apply_patch(layout, delta.get('root', {}))
+    clusters, apps = index_layout(layout)
+
+    cluster_delta = delta.get('clusters', {})
+    for cluster in cluster_delta.get('added', []):
+        cluster = dict(cluster, applications=[])
+        layout.setdefault('clusters', []).append(cluster)
+        clusters[cluster['id']] = cluster
+    for cluster_id, patch in cluster_delta.get('changed', {}).items():
+        _apply_patch(clusters[cluster_id], patch)
+
+    app_delta = delta.get('apps', {})
+    removed = set(app_delta.get('removed', []))
+    moved_out = {app_id for app_id, move in app_delta.get('moved', {}).items()
+                 if 'cluster' in move}
+    if removed or moved_out:
+        for cluster in layout.get('clusters', []):
+            cluster['applications'] = [
+                app for app in cluster.get('applications', [])
+                if app['id'] not in removed and app['id'] not in moved_out]
+
+    for app_id, move in app_delta.get('moved', {}).items():
+        _, app = apps[app_id]
+        app['gridPosition'] = move.get('gridPosition', app.get('gridPosition'))
+        if 'cluster' in move:
+            clusters[move['cluster']]['applications'].append(app)
+    for app_id, patch in app_delta.get('changed', {}).items():
+        _apply_patch(apps[app_id][1], patch)
+    for app_id, app_connections in delta.get('connections', {}).items():
+        if app_id in apps:
+            apps[app_id][1]['connections'] = app_connections
+    for app in app_delta.get('added', []):
+        app = dict(app)
+        cluster_id = app.pop('cluster')
+        clusters[cluster_id]['applications'].append(app)
+
+    removed_clusters = set(cluster_delta.get('removed', []))
+    if removed_clusters:
+        layout['clusters'] = [cluster for cluster in layout['clusters']
+                              if cluster['id'] not in removed_clusters]
+    return layout
+
+
+def layouts_equivalent(a: Dict, b: Dict) -> bool:
+    """Compare layouts ignoring the order of clusters and of apps within them."""
+    a_clusters, a_apps = index_layout(a)
+    b_clusters, b_apps = index_layout(b)
+    strip = lambda clusters: {cid: {k: v for k, v in c.items() if k != 'applications'}
+                              for cid, c in clusters.items()}
+    return (strip(a_clusters) == strip(b_clusters) and a_apps == b_apps
+            and {k: v for k, v in a.items() if k != 'clusters'}
+            == {k: v for k, v in b.items() if k != 'clusters'})
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compute a delta between two HexMap layouts',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python layout_diff.py old.json new.json
+  python layout_diff.py old.json new.json -o ../src/data.delta.json --version 2
+        """
+    )
+    parser.add_argument('old', help='Previous layout (data.json)')
+    parser.add_argument('new', help='New layout (data.json)')
+    parser.add_argument('-o', '--output', default=None,
+                        help='Write the delta here instead of stdout')
+    parser.add_argument('--version', type=int, default=None,
+                        help='Version number of the new layout')
+
+    args = parser.parse_args()
+
+    try:
+        with open(args.old) as f:
+            old = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        return 1
+
+    base_version = args.version - 1 if args.version is not None else None
+    delta = diff_layouts(old, new, args.version, base_version)
+    if args.output:
+        write_json_atomic(delta, args.output, indent=None)
+        print(f"Wrote {args.output}: {delta_summary(delta)}")
+    else:
+        print(json.dumps(delta, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+"""
+HexMap Layout Server
+
+Keeps a ContinentLayoutEngine and the app inventory in memory and serves
+the current layout over HTTP, so edits are applied without paying for a
+cold Python start, a full CSV parse and a full relayout each time.
+
+Endpoints:
+    GET  /data.json   Current layout (HexMap data.json format)
+    GET  /events      Server-sent events: one "layout" event per new version
+    GET  /stats       Edit-to-view latency report (JSON)
+    GET  /delta       Deltas since a version: /delta?since=N
+    POST /apps        Apply a delta: CSV rows (text/csv) upsert apps; JSON
+                      {"upsert": [rows], "remove": [app ids]} upserts/removes
+    POST /relayout    Force a full relayout
+    POST /ack         Browser confirms it rendered {"version": N}
+
+Usage:
+    python layout_server.py apps.csv
+    python layout_server.py --generate --num-apps 500 --port 8765
+    python layout_server.py apps.csv --write ../src/data.json
+
+Example delta:
+    curl -X POST --data-binary @changed_rows.csv -H "Content-Type: text/csv" \\
+         http://localhost:8765/apps
+"""
+
+import argparse
+import csv
+import io
+import json
+import queue
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+from typing import Dict, List, Optional
+
+from hexmap_io import write_json_atomic
+from layout_diff import diff_layouts
+from continent_layout import (PLACEMENTS, ContinentLayoutEngine, apps_from_rows,
+                              generate_test_data, load_inventory)
+
+# How many per-version latency records to keep for /stats
+LATENCY_HISTORY = 200
+
+# Seconds between SSE keep-alive comments
+HEARTBEAT_INTERVAL = 15
+
+# How many per-version deltas to keep for /delta?since=N
+DELTA_HISTORY = 50
+
+# Deltas larger than this share of the full layout are not sent in events;
+# clients reload /data.json instead
+MAX_EVENT_DELTA_RATIO = 0.5
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+def _percentile(values: List[float], pct: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def rows_from_json(rows: List[Dict]) -> List[Dict[str, str]]:
+    """
+    Turn JSON app objects into CSV-style string rows for apps_from_rows.
+
+    Raises ValueError unless rows is a list of objects.
+    """
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise ValueError('"upsert" must be a list of app objects')
+    converted = []
+    for row in rows:
+        converted_row = {}
+        for key, value in row.items():
+            if isinstance(value, list):
+                value = ';'.join(str(v) for v in value)
+            elif value is None:
+                value = ''
+            converted_row[key] = str(value)
+        converted.append(converted_row)
+    return converted
+
+
+class LayoutService:
+    """In-memory inventory, warm layout engine and change notifications."""
+
+    def __init__(self, apps, engine: ContinentLayoutEngine, write_path: Optional[Path] = None):
+        self.engine = engine
+        self.write_path = write_path
+        self.apps = {app.id: app for app in apps}
+
+        self.lock = threading.Lock()
+        self.subscribers: List[queue.Queue] = []
+        self.subscribers_lock = threading.Lock()
+        self.latencies = deque(maxlen=LATENCY_HISTORY)
+
+        self.version = 0
+        self.body = b''
+        self.layout = None
+        self.deltas = deque(maxlen=DELTA_HISTORY)
+        self._relayout(time.perf_counter(), {}, full=True, summary="initial load")
+
+    def _relayout(self, received: float, timings: Dict[str, float], full: bool, summary: str):
+        """Lay out the current inventory and publish it as a new version."""
+        start = time.perf_counter()
+        apps = list(self.apps.values())
+        if full:
+            self.engine.load_apps(apps)
+            output = self.engine.generate_layout()
+            mode = "full"
+        else:
+            output = self.engine.update_layout(apps)
+            mode = "incremental" if self.engine.last_update_incremental else "full"
+        timings['layout'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self.body = json.dumps(output).encode('utf-8')
+        if self.write_path:
+            write_json_atomic(output, self.write_path)
+        timings['serialize'] = time.perf_counter() - start
+
+        self.version += 1
+        event = {"version": self.version, "mode": mode, "apps": len(apps),
+                 "summary": summary}
+
+        if self.layout is not None:
+            start = time.perf_counter()
+            delta = diff_layouts(self.layout, output, self.version, self.version - 1)
+            self.deltas.append(delta)
+            if len(json.dumps(delta)) <= MAX_EVENT_DELTA_RATIO * len(self.body):
+                event["delta"] = delta
+            timings['diff'] = time.perf_counter() - start
+        self.layout = output
+
+        self._publish(event)
+        published = time.perf_counter()
+
+        record = {
+            "version": self.version,
+            "mode": mode,
+            "summary": summary,
+            "received": received,
+            **{f"{name}_ms": _ms(seconds) for name, seconds in timings.items()},
+            "server_ms": _ms(published - received),
+            "view_ms": None,
+        }
+        self.latencies.append(record)
+
+        parts = " ".join(f"{name} {_ms(seconds)}ms" for name, seconds in timings.items())
+        print(f"v{self.version} {mode} ({summary}): {parts} | server total "
+              f"{record['server_ms']}ms")
+        return event
+
+    def apply_delta(self, upserts: List[Dict[str, str]], removals: List[str],
+                    received: float) -> Dict:
+        """Upsert and remove apps, then relayout incrementally."""
+        timings = {}
+        start = time.perf_counter()
+        new_apps = apps_from_rows(upserts, start_row=1)
+        timings['parse'] = time.perf_counter() - start
+
+        with self.lock:
+            removed = 0
+            for app_id in removals:
+                if self.apps.pop(str(app_id).replace(' ', '_'), None) is not None:
+                    removed += 1
+            for app in new_apps:
+                self.apps[app.id] = app
+            summary = f"{len(new_apps)} upserted, {removed} removed"
+            return self._relayout(received, timings, full=False, summary=summary)
+
+    def deltas_since(self, version: int) -> Optional[List[Dict]]:
+        """Deltas from version to the current one, or None if not all are kept."""
+        with self.lock:
+            if version == self.version:
+                return []
+            deltas = [d for d in self.deltas if d["version"] > version]
+            if not deltas or deltas[0]["baseVersion"] != version:
+                return None
+            return deltas
+
+    def full_relayout(self, received: float) -> Dict:
+        with self.lock:
+            return self._relayout(received, {}, full=True, summary="forced relayout")
+
+    def acknowledge(self, version: int) -> Optional[float]:
+        """Record that a browser rendered a version; returns edit-to-view ms."""
+        now = time.perf_counter()
+        with self.lock:
+            for record in self.latencies:
+                if record["version"] == version and record["view_ms"] is None:
+                    record["view_ms"] = _ms(now - record["received"])
+                    print(f"v{version} viewed {record['view_ms']}ms after edit")
+                    return record["view_ms"]
+        return None
+
+    def subscribe(self) -> queue.Queue:
+        q = queue.Queue()
+        with self.subscribers_lock:
+            self.subscribers.append(q)
+        return q
+
+    def unsubscribe(self, q: queue.Queue):
+        with self.subscribers_lock:
+            if q in self.subscribers:
+                self.subscribers.remove(q)
+
+    def _publish(self, event: Dict):
+        with self.subscribers_lock:
+            for q in self.subscribers:
+                q.put(event)
+
+    def stats(self) -> Dict:
+        with self.lock:
+            records = [{k: v for k, v in r.items() if k != "received"} for r in self.latencies]
+        server = [r["server_ms"] for r in records]
+        viewed = [r["view_ms"] for r in records if r["view_ms"] is not None]
+        return {
+            "version": self.version,
+            "apps": len(self.apps),
+            "subscribers": len(self.subscribers),
+            "server_ms": {"median": statistics.median(server) if server else None,
+                          "p95": _percentile(server, 95)},
+            "view_ms": {"median": statistics.median(viewed) if viewed else None,
+                        "p95": _percentile(viewed, 95)},
+            "updates": records,
+        }
+
+
+class LayoutRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end for a LayoutService (set as a class attribute)."""
+
+    service: LayoutService = None
+
+    def log_message(self, format, *args):
+        # Updates are logged by the service; keep request noise out
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str = 'application/json'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, data: Dict):
+        self._send(status, json.dumps(data).encode('utf-8'))
+
+    def _read_body(self) -> str:
+        length = int(self.headers.get('Content-Length', 0))
+        return self.rfile.read(length).decode('utf-8-sig') if length else ''
+
+    def do_OPTIONS(self):
+        self.send_response(204)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.end_headers()
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if path == '/data.json':
+            self._send(200, self.service.body)
+        elif path == '/stats':
+            self._send_json(200, self.service.stats())
+        elif path == '/events':
+            self._stream_events()
+        elif path == '/delta':
+            self._send_deltas()
+        else:
+            self._send_json(404, {"error": f"Unknown path: {path}"})
+
+    def do_POST(self):
+        received = time.perf_counter()
+        path = self.path.split('?')[0]
+        try:
+            if path == '/apps':
+                self._send_json(200, self._apply_delta(received))
+            elif path == '/relayout':
+                self._send_json(200, self.service.full_relayout(received))
+            elif path == '/ack':
+                ack = json.loads(self._read_body() or '{}')
+                if not isinstance(ack, dict):
+                    raise ValueError('Expected {"version": N}')
+                version = int(ack.get('version', 0))
+                self._send_json(200, {"version": version,
+                                      "view_ms": self.service.acknowledge(version)})
+            else:
+                self._send_json(404, {"error": f"Unknown path: {path}"})
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {"error": str(e)})
+
+    def _apply_delta(self, received: float) -> Dict:
+        body = self._read_body()
+        content_type = self.headers.get('Content-Type', '')
+
+        if 'json' in content_type or body.lstrip().startswith(('{', '[')):
+            delta = json.loads(body)
+            if isinstance(delta, list):
+                delta = {"upsert": delta}
+            if not isinstance(delta, dict):
+                raise ValueError('Expected {"upsert": [apps], "remove": [app ids]} or a list of apps')
+            upserts = rows_from_json(delta.get("upsert", []))
+            removals = delta.get("remove", [])
+            if not isinstance(removals, list) or not all(isinstance(app_id, str)
+                                                         for app_id in removals):
+                raise ValueError('"remove" must be a list of app ids')
+        else:
+            upserts = list(csv.DictReader(io.StringIO(body)))
+            removals = []
+
+        return self.service.apply_delta(upserts, removals, received)
+
+    def _send_deltas(self):
+        query = parse_qs(urlparse(self.path).query)
+        try:
+            since = int(query.get('since', ['0'])[0])
+        except ValueError:
+            self._send_json(400, {"error": "since must be a version number"})
+            return
+        deltas = self.service.deltas_since(since)
+        if deltas is None:
+            self._send_json(410, {"error": f"Deltas since version {since} are no longer "
+                                           f"available; reload /data.json"})
+        else:
+            self._send_json(200, {"version": self.service.version, "deltas": deltas})
+
+    def _stream_events(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-store')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+
+        q = self.service.subscribe()
+        try:
+            # Tell new clients which version is current
+            self._write_event({"version": self.service.version, "mode": "current"})
+            while True:
+                try:
+                    event = q.get(timeout=HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    self.wfile.write(b': keep-alive\n\n')
+                    self.wfile.flush()
+                    continue
+                self._write_event(event)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            self.service.unsubscribe(q)
+
+    def _write_event(self, event: Dict):
+        self.wfile.write(f"event: layout\ndata: {json.dumps(event)}\n\n".encode('utf-8'))
+        self.wfile.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Serve a live HexMap layout with incremental updates',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  python layout_server.py apps.csv
+  python layout_server.py --generate --num-apps 500
+  python layout_server.py apps.csv --write ../src/data.json
+
+  # Upsert apps from CSV rows, or upsert/remove with JSON
+  curl -X POST --data-binary @delta.csv -H "Content-Type: text/csv" localhost:8765/apps
+  curl -X POST -d '{"remove": ["Old App"]}' localhost:8765/apps
+  curl localhost:8765/stats
+        """
+    )
+    parser.add_argument('input', nargs='?', help='Input CSV/TSV file')
+    parser.add_argument('-g', '--generate', action='store_true',
+                        help='Start from synthetic test data')
+    parser.add_argument('-n', '--num-apps', type=int, default=200,
+                        help='Number of apps for synthetic data (default: 200)')
+    parser.add_argument('-s', '--seed', type=int, default=42,
+                        help='Random seed for reproducibility (default: 42)')
+    parser.add_argument('--water-gap', type=int, default=2,
+                        help='Hex gap between unconnected continents (default: 2)')
+    parser.add_argument('--connected-gap', type=int, default=1,
+                        help='Hex gap between connected continents (default: 1)')
+    parser.add_argument('--hierarchical', action='store_true',
+                        help='Nest sub-continents by the sub_business column')
+    parser.add_argument('--placement', choices=PLACEMENTS, default='spiral',
+                        help='App placement within territories (default: spiral)')
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='Address to bind (default: 127.0.0.1)')
+    parser.add_argument('-p', '--port', type=int, default=8765,
+                        help='Port to listen on (default: 8765)')
+    parser.add_argument('-w', '--write', default=None,
+                        help='Also write each version to this file (e.g. ../src/data.json)')
+
+    args = parser.parse_args()
+
+    if args.input:
+        apps = load_inventory(args.input)
+    elif args.generate:
+        apps = generate_test_data(args.num_apps, args.seed)
+    else:
+        parser.print_help()
+        print("\nError: Provide an input CSV file or use --generate for synthetic data")
+        return 1
+
+    write_path = None
+    if args.write:
+        write_path = Path(args.write)
+        if not write_path.is_absolute():
+            write_path = Path(__file__).parent / write_path
+
+    engine = ContinentLayoutEngine(
+        water_gap=args.water_gap,
+        connected_gap=args.connected_gap,
+        seed=args.seed,
+        hierarchical=args.hierarchical,
+        placement=args.placement,
+        verbose=False
+    )
+    LayoutRequestHandler.service = LayoutService(apps, engine, write_path)
+
+    server = ThreadingHTTPServer((args.host, args.port), LayoutRequestHandler)
+    server.daemon_threads = True
+    print(f"Serving layout on http://{args.host}:{args.port}/data.json "
+          f"(events: /events, stats: /stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping layout server")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,329 @@
+"""
+Multilevel App Placement
+
+Places apps inside their continents' territories so that connected apps end
+up close together, instead of the spiral placement's edge/centre split by
+external connection count. Used by ContinentLayoutEngine(placement=
+'multilevel') once territories have been grown.
+
+1. Coarsen: the app connection graph is shrunk level by level by heavy-edge
+   matching (each node merges with its most strongly linked free neighbour;
+   leftovers hanging off the same neighbour merge with each other). Nodes
+   only merge within a continent, so every coarse node belongs to one.
+2. Lay out the coarsest graph in rounds: every node moves part of the way
+   towards its neighbours' mean position (O(edges)), then each continent's
+   nodes are spread back over its territory by weighted recursive
+   bisection, a coarse node taking as many hexes as it holds apps
+   (O(n log n)). The spread plays the part of repulsion without any
+   pairwise forces, and keeps nodes inside their territory.
+3. Refine: each finer level starts around its parent's position and runs
+   another round, as it only fixes local detail.
+4. Snap: every continent's apps are assigned distinct territory hexes by the
+   same bisection, which keeps their relative positions.
+
+Links between continents pull apps towards the shore facing the other
+continent. Every step is seeded, so placements are reproducible.
+"""
+
+import math
+import random
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Dict, List, Optional, Sequence, Tuple
+
+Point = Tuple[float, float]
+
+COARSEST_NODES = 64      # Stop coarsening below this many nodes...
+MIN_SHRINK = 0.9         # ...or once a level keeps more than this share
+COARSEST_ROUNDS = 20     # Pull-and-spread rounds for the coarsest graph
+REFINE_ROUNDS = 1        # Pull-and-spread rounds per finer level
+PULL_STEPS = 2           # Pull steps per round
+NEIGHBOUR_PULL = 0.5     # Share of the way moved towards the neighbours' mean
+CELL_SAMPLE = 4          # Cells sampled per node when spreading a level
+
+
+def hex_to_xy(q: int, r: int) -> Point:
+    """Centre of hex (q, r) in the frontend's pointy-top odd-r layout, in hex widths."""
+    return (q + 0.5 * (r & 1), r * math.sqrt(3) / 2)
+
+
+def _match(adjacency: List[Dict[int, float]], group: List[int], size: List[int],
+           rng: random.Random) -> Tuple[List[int], int]:
+    """Heavy-edge matching within groups; returns (parent per node, parent count)."""
+    parent = [-1] * len(adjacency)
+    count = 0
+    waiting: Dict[Tuple[int, int], int] = {}
+    order = list(range(len(adjacency)))
+    rng.shuffle(order)
+
+    for node in order:
+        if parent[node] >= 0:
+            continue
+        best = -1
+        best_score = 0.0
+        for neighbour, weight in adjacency[node].items():
+            if parent[neighbour] < 0 and group[neighbour] == group[node]:
+                score = weight / (size[node] * size[neighbour])
+                if score > best_score:
+                    best, best_score = neighbour, score
+        if best >= 0:
+            parent[node] = parent[best] = count
+            count += 1
+            continue
+
+        # No free neighbour: pair with another node hanging off the same
+        # neighbour (or with another unconnected node), as stars never shrink
+        # by plain matching
+        links = adjacency[node]
+        hub = max(links, key=links.get) if links else -1
+        other = waiting.pop((group[node], hub), None)
+        if other is not None:
+            parent[node] = parent[other]
+        else:
+            parent[node] = count
+            count += 1
+            waiting[(group[node], hub)] = node
+    return parent, count
+
+
+def _contract(adjacency: List[Dict[int, float]], group: List[int], size: List[int],
+              parent: List[int], count: int):
+    """The coarse graph of a matching: (adjacency, group, size)."""
+    coarse_adjacency: List[Dict[int, float]] = [{} for _ in range(count)]
+    coarse_group = [0] * count
+    coarse_size = [0] * count
+    for node, neighbours in enumerate(adjacency):
+        coarse = parent[node]
+        coarse_group[coarse] = group[node]
+        coarse_size[coarse] += size[node]
+        edges = coarse_adjacency[coarse]
+        for neighbour, weight in neighbours.items():
+            other = parent[neighbour]
+            if other != coarse:
+                edges[other] = edges.get(other, 0) + weight
+    return coarse_adjacency, coarse_group, coarse_size
+
+
+def _pull(adjacency: List[Dict[int, float]], xs: List[float], ys: List[float], steps: int):
+    """Move every node part of the way towards its neighbours' weighted mean, in place."""
+    for _ in range(steps):
+        new_xs = xs[:]
+        new_ys = ys[:]
+        for node, neighbours in enumerate(adjacency):
+            if not neighbours:
+                continue
+            total = sx = sy = 0.0
+            for neighbour, weight in neighbours.items():
+                total += weight
+                sx += weight * xs[neighbour]
+                sy += weight * ys[neighbour]
+            new_xs[node] += NEIGHBOUR_PULL * (sx / total - xs[node])
+            new_ys[node] += NEIGHBOUR_PULL * (sy / total - ys[node])
+        xs[:] = new_xs
+        ys[:] = new_ys
+
+
+def _by_axes(ids: Sequence[int], xs: Sequence[float], ys: Sequence[float]):
+    """ids sorted by x (then y) and by y (then x)."""
+    return (sorted(ids, key=lambda i: (xs[i], ys[i], i)),
+            sorted(ids, key=lambda i: (ys[i], xs[i], i)))
+
+
+def _bisect(nodes: Tuple[List[int], List[int]], weights: Sequence[int],
+            cells: Tuple[List[int], List[int]], cell_xs: Sequence[float],
+            cell_ys: Sequence[float]) -> List[Tuple[List[int], List[int]]]:
+    """
+    Recursive bisection of nodes onto cells, in proportion to their weights.
+
+    nodes and cells are each given sorted by x and by y (see _by_axes).
+    Both are split along the cells' wider axis, nodes at their weighted
+    median and cells so that each half keeps at least its weight in cells
+    (when there are enough). Returns the leaves as (nodes, cells), each
+    with a single node unless the cells ran out. Sorted order is kept by
+    filtering rather than re-sorting, so this is O(n log n).
+    """
+    # Half markers, indexed by node and cell id
+    node_low = bytearray(len(weights))
+    cell_low = bytearray(len(cell_xs))
+    leaves = []
+    stack = [(nodes, cells, sum(weights[node] for node in nodes[0]))]
+    while stack:
+        (nodes_x, nodes_y), (cells_x, cells_y), total = stack.pop()
+        if not nodes_x:
+            continue
+        if len(nodes_x) == 1 or len(cells_x) <= 1:
+            leaves.append((nodes_x, cells_x))
+            continue
+
+        by_x = cell_xs[cells_x[-1]] - cell_xs[cells_x[0]] >= cell_ys[cells_y[-1]] - cell_ys[cells_y[0]]
+        ordered_nodes, other_nodes = (nodes_x, nodes_y) if by_x else (nodes_y, nodes_x)
+        ordered_cells, other_cells = (cells_x, cells_y) if by_x else (cells_y, cells_x)
+
+        # Weighted median, leaving at least one node on each side
+        cumulative = list(accumulate(weights[node] for node in ordered_nodes))
+        split = min(max(1, bisect_right(cumulative, total / 2)), len(ordered_nodes) - 1)
+        left = cumulative[split - 1]
+        count = len(ordered_cells)
+        if count >= total:
+            cut = left + (count - total) * left // total
+        else:
+            cut = min(max(1, round(count * left / total)), count - 1)
+
+        for node in ordered_nodes[:split]:
+            node_low[node] = 1
+        for cell in ordered_cells[:cut]:
+            cell_low[cell] = 1
+        low_nodes = (ordered_nodes[:split], [n for n in other_nodes if node_low[n]])
+        high_nodes = (ordered_nodes[split:], [n for n in other_nodes if not node_low[n]])
+        low_cells = (ordered_cells[:cut], [c for c in other_cells if cell_low[c]])
+        high_cells = (ordered_cells[cut:], [c for c in other_cells if not cell_low[c]])
+        for node in ordered_nodes[:split]:
+            node_low[node] = 0
+        for cell in ordered_cells[:cut]:
+            cell_low[cell] = 0
+        if not by_x:
+            low_nodes, high_nodes = low_nodes[::-1], high_nodes[::-1]
+            low_cells, high_cells = low_cells[::-1], high_cells[::-1]
+        stack.append((low_nodes, low_cells, left))
+        stack.append((high_nodes, high_cells, total - left))
+    return leaves
+
+
+def _spread(members: Dict[int, List[int]], size: Sequence[int], xs: List[float],
+            ys: List[float], regions: Dict[int, Tuple[List[int], List[int]]],
+            cell_xs: Sequence[float], cell_ys: Sequence[float]):
+    """Spread each group's nodes over its (sorted) cells in proportion to size, in place."""
+    for g, nodes in members.items():
+        if len(nodes) == 1:
+            continue
+        for leaf_nodes, leaf_cells in _bisect(_by_axes(nodes, xs, ys), size, regions[g],
+                                              cell_xs, cell_ys):
+            if not leaf_cells:
+                continue
+            x = sum(cell_xs[c] for c in leaf_cells) / len(leaf_cells)
+            y = sum(cell_ys[c] for c in leaf_cells) / len(leaf_cells)
+            for node in leaf_nodes:
+                xs[node] = x
+                ys[node] = y
+
+
+def assign_cells(points: Sequence[Point], cells: Sequence[Point]) -> List[int]:
+    """
+    Give each point a distinct cell, keeping relative positions.
+
+    Points and cells are split at the median along the cells' wider axis
+    (cells in proportion, so both halves have room) until one point is
+    left, which takes its nearest cell. O(n log n). If there are more
+    points than cells, those farthest from the cells' centre get -1.
+    """
+    result = [-1] * len(points)
+    if not points or not cells:
+        return result
+
+    point_ids = list(range(len(points)))
+    if len(points) > len(cells):
+        mx = sum(x for x, _ in cells) / len(cells)
+        my = sum(y for _, y in cells) / len(cells)
+        point_ids.sort(key=lambda i: ((points[i][0] - mx) ** 2 + (points[i][1] - my) ** 2, i))
+        point_ids = point_ids[:len(cells)]
+
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    cell_xs = [x for x, _ in cells]
+    cell_ys = [y for _, y in cells]
+    leaves = _bisect(_by_axes(point_ids, xs, ys), [1] * len(points),
+                     _by_axes(range(len(cells)), cell_xs, cell_ys), cell_xs, cell_ys)
+    for (point,), leaf_cells in leaves:
+        result[point] = min(leaf_cells, key=lambda c: ((cell_xs[c] - xs[point]) ** 2 +
+                                                       (cell_ys[c] - ys[point]) ** 2, c))
+    return result
+
+
+def multilevel_layout(adjacency: List[Dict[int, float]], group: Sequence[int],
+                      regions: Sequence[Sequence[Point]], seed: int = 42,
+                      stats: Optional[Dict] = None) -> List[int]:
+    """
+    Place nodes on the cells of their group's region.
+
+    adjacency is the undirected weighted graph (as from
+    communities.build_adjacency), group[i] the region index of node i and
+    regions[g] the cell centres of region g. Returns for each node the
+    index of its cell in regions[group[node]] (-1 if the region is full).
+    If stats is given, the number of nodes per level is recorded in it.
+    """
+    rng = random.Random(seed)
+    n = len(adjacency)
+
+    # All regions' cells in one list; a coarse level only needs a sample of
+    # them (in a seeded random order) to spread its few nodes
+    cell_xs: List[float] = []
+    cell_ys: List[float] = []
+    shuffled_cells = []
+    for cells in regions:
+        ids = list(range(len(cell_xs), len(cell_xs) + len(cells)))
+        rng.shuffle(ids)
+        shuffled_cells.append(ids)
+        cell_xs.extend(x for x, _ in cells)
+        cell_ys.extend(y for _, y in cells)
+
+    # 1. Coarsen
+    levels = [(adjacency, list(group), [1] * n)]
+    parents: List[List[int]] = []
+    while len(levels[-1][0]) > COARSEST_NODES:
+        level_adjacency, level_group, level_size = levels[-1]
+        parent, count = _match(level_adjacency, level_group, level_size, rng)
+        if count > MIN_SHRINK * len(level_adjacency):
+            break
+        parents.append(parent)
+        levels.append(_contract(level_adjacency, level_group, level_size, parent, count))
+    if stats is not None:
+        stats["levels"] = [len(level[0]) for level in levels]
+
+    def relax(level: int, xs: List[float], ys: List[float], rounds: int):
+        level_adjacency, level_group, level_size = levels[level]
+        members: Dict[int, List[int]] = {}
+        for node, g in enumerate(level_group):
+            members.setdefault(g, []).append(node)
+        cells = {g: _by_axes(shuffled_cells[g][:CELL_SAMPLE * len(nodes)], cell_xs, cell_ys)
+                 for g, nodes in members.items()}
+        for _ in range(rounds):
+            _pull(level_adjacency, xs, ys, PULL_STEPS)
+            _spread(members, level_size, xs, ys, cells, cell_xs, cell_ys)
+
+    # 2. Lay out the coarsest graph, starting from random cells of its region
+    xs = []
+    ys = []
+    for g in levels[-1][1]:
+        if regions[g]:
+            x, y = regions[g][rng.randrange(len(regions[g]))]
+        else:
+            x = y = 0.0
+        xs.append(x)
+        ys.append(y)
+    relax(len(levels) - 1, xs, ys, COARSEST_ROUNDS)
+
+    # 3. Refine: children start around their parent
+    for depth in range(len(parents) - 1, -1, -1):
+        parent_size = levels[depth + 1][2]
+        fine_xs = []
+        fine_ys = []
+        for p in parents[depth]:
+            spread = math.sqrt(parent_size[p]) / 2
+            fine_xs.append(xs[p] + (rng.random() - 0.5) * spread)
+            fine_ys.append(ys[p] + (rng.random() - 0.5) * spread)
+        xs, ys = fine_xs, fine_ys
+        if depth:
+            relax(depth, xs, ys, REFINE_ROUNDS)
+
+    # 4. Pull the apps once more and snap each group onto its region (the
+    # snap spreads them, so the finest level needs no spread of its own)
+    _pull(adjacency, xs, ys, PULL_STEPS)
+    result = [-1] * n
+    members: Dict[int, List[int]] = {}
+    for node, g in enumerate(group):
+        members.setdefault(g, []).append(node)
+    for g, nodes in members.items():
+        cells = assign_cells([(xs[node], ys[node]) for node in nodes], regions[g])
+        for node, c in zip(nodes, cells):
+            result[node] = c
+    return result
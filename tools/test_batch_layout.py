@@ -0,0 +1,100 @@
+"""
+Tests for batch layouts.
+
+Run with: python -m pytest tools/test_batch_layout.py
+      or: python tools/test_batch_layout.py
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+from batch_layout import load_manifest, run_batch, select_apps
+from continent_layout import ContinentLayoutEngine, generate_test_data
+
+
+def test_batch_maps_match_single_layouts():
+    apps = generate_test_data(300, seed=2)
+    for i, app in enumerate(apps):
+        app.region = ("EMEA", "APAC", "AMER")[i % 3]
+
+    manifest = {
+        "inputs": ["unused.csv"],
+        "defaults": {"seed": 9},
+        "maps": [
+            {"name": "all", "output": "out/all.json"},
+            {"name": "markets", "business": ["Trading", "Risk*"], "output": "out/markets.json"},
+            {"name": "emea", "region": "EMEA", "output": "out/emea.json", "jitter": 3.0},
+            {"name": "none", "business": "Nothing", "output": "out/none.json"},
+        ],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'manifest.json'
+        path.write_text(json.dumps(manifest))
+        maps = load_manifest(path)["maps"]
+
+        serial = run_batch(apps, maps, jobs=1)
+        written = [spec["output"].read_bytes() for spec in maps[:3]]
+        parallel = run_batch(apps, maps, jobs=3)
+        assert [spec["output"].read_bytes() for spec in maps[:3]] == written
+
+        for spec, data in zip(maps[:3], written):
+            engine = ContinentLayoutEngine(verbose=False, **spec["params"])
+            engine.load_apps(select_apps(apps, spec["business"], spec["region"]))
+            assert json.loads(data) == engine.generate_layout()
+
+    assert [r["name"] for r in parallel] == ["all", "markets", "emea", "none"]
+    assert [r["apps"] for r in serial] == [r["apps"] for r in parallel]
+    assert serial[1]["continents"] == 2
+    assert "error" in serial[3]
+
+    # Connections never point outside the map
+    emea = select_apps(apps, [], ["EMEA"])
+    ids = {app.id for app in emea}
+    assert all(target in ids for app in emea for target in app.connections)
+
+
+def test_bad_parameters_fail_the_manifest():
+    bad_maps = [
+        {"name": "typo", "output": "typo.json", "water_gapp": 3},
+        {"name": "placement", "output": "placement.json", "placement": "sprial"},
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'manifest.json'
+        for entry in bad_maps:
+            path.write_text(json.dumps({"inputs": ["unused.csv"], "maps": [entry]}))
+            try:
+                load_manifest(path)
+            except ValueError as e:
+                assert entry["name"] in str(e) or "water_gapp" in str(e)
+            else:
+                raise AssertionError(f"{entry} was accepted")
+
+
+def test_failed_maps_are_reported():
+    apps = generate_test_data(100, seed=4)
+    manifest = {
+        "inputs": ["unused.csv"],
+        "maps": [
+            {"name": "ok", "output": "out/ok.json"},
+            {"name": "unwritable", "output": "blocker/unwritable.json"},
+        ],
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'manifest.json'
+        path.write_text(json.dumps(manifest))
+        (Path(tmp) / 'blocker').write_text("not a directory")
+        maps = load_manifest(path)["maps"]
+
+        for jobs in (1, 2):
+            ok, failed = run_batch(apps, maps, jobs=jobs)
+            assert "error" not in ok and maps[0]["output"].exists()
+            assert failed["name"] == "unwritable" and failed["apps"] == 100
+            assert "Error" in failed["error"]
+
+
+if __name__ == '__main__':
+    test_batch_maps_match_single_layouts()
+    test_bad_parameters_fail_the_manifest()
+    test_failed_maps_are_reported()
+    print("All batch layout tests passed")
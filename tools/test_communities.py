@@ -0,0 +1,77 @@
+"""
+Tests for continent discovery from the connection graph.
+
+Run with: python -m pytest tools/test_communities.py
+      or: python tools/test_communities.py
+"""
+
+import tempfile
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from communities import OTHER, UNCONNECTED, build_adjacency, detect_communities
+from continent_layout import ContinentLayoutEngine, load_inputs
+from generate_enterprise import EnterpriseModel
+
+
+def enterprise_graph(num_apps=2000):
+    apps = list(EnterpriseModel(num_apps, avg_degree=3.0, cross_business=0.1).iter_apps())
+    return apps, [app.id for app in apps], [app.connections for app in apps]
+
+
+def test_communities_recover_businesses():
+    apps, nodes, links = enterprise_graph()
+    result = detect_communities(nodes, links, verbose=False)
+    assert result == detect_communities(nodes, links, verbose=False)
+
+    by_community = defaultdict(Counter)
+    for app in apps:
+        by_community[result[app.id]][app.business] += 1
+    found = [name for name in by_community if name not in (UNCONNECTED, OTHER)]
+    assert 2 <= len(found) <= 24
+
+    purity = sum(counts.most_common(1)[0][1] for counts in by_community.values()) / len(apps)
+    assert purity > 0.8
+
+    adjacency = build_adjacency(nodes, links)
+    for node, neighbours in zip(nodes, adjacency):
+        assert (result[node] == UNCONNECTED) == (not neighbours)
+
+
+def test_known_businesses_anchor_their_communities():
+    apps, nodes, links = enterprise_graph()
+    known = {app.id: app.business for i, app in enumerate(apps) if i % 4 == 0}
+    result = detect_communities(nodes, links, known=known, verbose=False)
+
+    assert all(result[node] == business for node, business in known.items())
+    # Most unowned apps join the known continent of their own business
+    unowned = [app for app in apps if app.id not in known]
+    joined = sum(1 for app in unowned if result[app.id] == app.business)
+    assert joined / len(unowned) > 0.8
+
+
+def test_inventory_without_business_column_is_laid_out():
+    apps, _, _ = enterprise_graph(400)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'feed.csv'
+        lines = ["app_name,connects_to"]
+        lines += [f"{app.id},{';'.join(app.connections)}" for app in apps]
+        path.write_text("\n".join(lines) + "\n")
+
+        assert load_inputs([str(path)]) == []
+        loaded = load_inputs([str(path)], communities=True)
+
+    assert len(loaded) == len(apps)
+    assert all(app.business for app in loaded)
+
+    engine = ContinentLayoutEngine(verbose=False)
+    engine.load_apps(loaded)
+    output = engine.generate_layout()
+    assert sum(len(c["applications"]) for c in output["clusters"]) == len(apps)
+
+
+if __name__ == '__main__':
+    test_communities_recover_businesses()
+    test_known_businesses_anchor_their_communities()
+    test_inventory_without_business_column_is_laid_out()
+    print("All community detection tests passed")
@@ -0,0 +1,190 @@
+"""
+Tests for the continent layout engine: concurrency, multi-file loading,
+hierarchical and multilevel layouts.
+
+Run with: python -m pytest tools/test_continent_layout.py
+      or: python tools/test_continent_layout.py
+"""
+
+import json
+import random
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from continent_layout import (ContinentLayoutEngine, generate_test_data, load_inventories,
+                              merge_inventories)
+from multilevel_layout import assign_cells
+
+NUM_CONCURRENT_LAYOUTS = 32
+
+
+def layout_specs():
+    """32 distinct (num_apps, data seed, layout seed, jitter) combinations."""
+    return [
+        (150 + 25 * (i % 8), i // 2, 1000 + i, 6.0 if i % 2 else 0.0)
+        for i in range(NUM_CONCURRENT_LAYOUTS)
+    ]
+
+
+def run_layout(spec):
+    """Generate data and lay it out; returns the serialized output."""
+    num_apps, data_seed, layout_seed, jitter = spec
+    apps = generate_test_data(num_apps, data_seed)
+    engine = ContinentLayoutEngine(seed=layout_seed, jitter=jitter, verbose=False)
+    engine.load_apps(apps)
+    return json.dumps(engine.generate_layout(), sort_keys=True)
+
+
+def test_concurrent_layouts_match_serial():
+    specs = layout_specs()
+    serial = [run_layout(spec) for spec in specs]
+
+    with ThreadPoolExecutor(max_workers=NUM_CONCURRENT_LAYOUTS) as pool:
+        concurrent = list(pool.map(run_layout, specs))
+
+    mismatched = [spec for spec, a, b in zip(specs, serial, concurrent) if a != b]
+    assert not mismatched, f"Concurrent layouts differ from serial: {mismatched}"
+
+
+def test_engines_sharing_apps_match_serial():
+    apps = generate_test_data(300, seed=7)
+
+    def layout(seed):
+        engine = ContinentLayoutEngine(seed=seed, jitter=6.0, verbose=False)
+        engine.load_apps(apps)
+        return json.dumps(engine.generate_layout(), sort_keys=True)
+
+    seeds = list(range(NUM_CONCURRENT_LAYOUTS))
+    serial = [layout(seed) for seed in seeds]
+
+    with ThreadPoolExecutor(max_workers=NUM_CONCURRENT_LAYOUTS) as pool:
+        concurrent = list(pool.map(layout, seeds))
+
+    assert serial == concurrent
+    # Layouts work on copies, so the shared input is left untouched
+    assert all(app.grid_position is None for app in apps)
+
+
+def test_layout_is_repeatable_and_leaves_global_random_alone():
+    random.seed(123)
+    expected = random.random()
+
+    random.seed(123)
+    apps = generate_test_data(200, seed=1)
+    engine = ContinentLayoutEngine(seed=5, verbose=False)
+    engine.load_apps(apps)
+    first = engine.generate_layout()
+    second = engine.generate_layout()
+
+    assert first == second
+    assert random.random() == expected
+
+
+def test_parallel_multi_file_load_is_deterministic():
+    files = {
+        'a.csv': "app_name,business,connects_to\nAlpha,Trading,beta\nGamma,Risk,Delta\n",
+        'b.csv': "Application,Group,Dependencies\nBeta,Trading,Alpha\nGamma,Ops,\n",
+        'c.csv': "name,category,linked_to\nDelta,Risk,Missing\n",
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, text in files.items():
+            (Path(tmp) / name).write_text(text)
+        pattern = str(Path(tmp) / '*.csv')
+        serial = load_inventories([pattern], jobs=1)
+        parallel = load_inventories([pattern], jobs=3)
+
+    assert serial == parallel
+    assert [app.id for app in serial] == ['Alpha', 'Gamma', 'Beta', 'Delta']
+    # Connections resolve across files, ignoring case
+    assert serial[0].connections == ['Beta']
+
+    generated = generate_test_data(50, seed=1)
+    apps, conflicts, unresolved = merge_inventories(
+        [('b', generate_test_data(50, seed=1)), ('a', generate_test_data(50, seed=1))])
+    assert apps == generated
+    assert {(c['kept'], c['dropped'], c['identical']) for c in conflicts} == {('b', 'a', True)}
+    assert len(conflicts) == len(generated)
+    assert unresolved == []
+
+
+def test_hierarchical_layout_nests_subcontinents():
+    apps = generate_test_data(600, seed=3)
+    for i, app in enumerate(apps):
+        prefix, suffix = app.id.split('_')[:2]
+        app.sub_business = f"{prefix} > {suffix}" if i % 2 else prefix
+
+    engine = ContinentLayoutEngine(seed=4, hierarchical=True, collision_rate=0, verbose=False)
+    engine.load_apps(apps)
+    output = engine.generate_layout()
+    assert output == engine.generate_layout()
+    assert engine.layout_metrics()["gap_violations"] == 0
+
+    def leaves(continent):
+        if not continent.subcontinents:
+            return [continent]
+        return [leaf for sub in continent.subcontinents for leaf in leaves(sub)]
+
+    for continent in engine.continents.values():
+        assert continent.subcontinents
+        placed = set()
+        for leaf in leaves(continent):
+            assert leaf.territory <= continent.territory
+            assert not leaf.territory & placed
+            placed |= leaf.territory
+            assert all(app.grid_position in leaf.territory for app in leaf.apps)
+
+    clusters = {cluster["id"]: cluster for cluster in output["clusters"]}
+    sub_cluster = clusters["continent_0"]["subClusters"][0]
+    assert sub_cluster["id"].startswith("continent_0_")
+    assert "subClusters" in sub_cluster or "applicationIds" in sub_cluster
+    assert sum(len(c["applications"]) for c in clusters.values()) == len(apps)
+
+    # Nested layouts never reuse flat territories
+    engine.update_layout(apps)
+    assert not engine.last_update_incremental
+
+
+def test_multilevel_placement_shortens_connections():
+    apps = generate_test_data(1500, seed=5)
+
+    def layout(placement, inventory=apps, **kwargs):
+        engine = ContinentLayoutEngine(seed=2, collision_rate=0, placement=placement,
+                                       verbose=False, **kwargs)
+        engine.load_apps(inventory)
+        return engine, engine.generate_layout()
+
+    spiral, _ = layout('spiral')
+    multilevel, output = layout('multilevel')
+    assert output == layout('multilevel')[1]
+
+    metrics = multilevel.layout_metrics()
+    assert metrics["unplaced_apps"] == 0
+    assert metrics["connection_length"] < 0.9 * spiral.layout_metrics()["connection_length"]
+    # Territories are unchanged; apps get distinct hexes of their own territory
+    assert multilevel.territories() == spiral.territories()
+    for continent in multilevel.continents.values():
+        positions = [app.grid_position for app in continent.apps]
+        assert len(set(positions)) == len(positions)
+        assert set(positions) <= continent.territory
+
+    # Nested continents place their leaves the same way
+    for app in apps:
+        app.sub_business = app.id.split('_')[0]
+    nested, output = layout('multilevel', hierarchical=True)
+    assert all("subClusters" in cluster for cluster in output["clusters"])
+    assert nested.layout_metrics()["unplaced_apps"] == 0
+
+    # More points than cells: the outermost points are left out
+    cells = [(0, 0), (1, 0), (2, 0)]
+    assert assign_cells([(2.1, 0), (-0.2, 0), (9, 9), (1, 0.1)], cells) == [2, 0, -1, 1]
+
+
+if __name__ == '__main__':
+    test_concurrent_layouts_match_serial()
+    test_engines_sharing_apps_match_serial()
+    test_layout_is_repeatable_and_leaves_global_random_alone()
+    test_parallel_multi_file_load_is_deterministic()
+    test_hierarchical_layout_nests_subcontinents()
+    test_multilevel_placement_shortens_connections()
+    print("All continent layout tests passed")
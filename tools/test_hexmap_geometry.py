@@ -0,0 +1,68 @@
+"""
+Tests for precomputed frontend geometry.
+
+Run with: python -m pytest tools/test_hexmap_geometry.py
+      or: python tools/test_hexmap_geometry.py
+"""
+
+import copy
+import math
+
+from continent_layout import ContinentLayoutEngine, generate_test_data
+from hexmap_geometry import HEX_SIZE, add_geometry, strip_geometry
+from layout_diff import apply_delta, diff_layouts
+
+
+def layout(num_apps=300, seed=1):
+    engine = ContinentLayoutEngine(seed=seed, collision_rate=0.01, verbose=False)
+    engine.load_apps(generate_test_data(num_apps, seed))
+    return engine.generate_layout()
+
+
+def test_pixels_match_the_frontend_grid():
+    output = add_geometry(layout())
+    assert output["geometry"]["hexSize"] == HEX_SIZE
+    for cluster in output["clusters"]:
+        for app in cluster["applications"]:
+            q, r = app["gridPosition"]["q"], app["gridPosition"]["r"]
+            # HexGrid.gridToPixel without the viewport offset
+            assert math.isclose(app["pixel"]["x"], HEX_SIZE * math.sqrt(3) * (q + 0.5 * (r & 1)),
+                                abs_tol=1e-3)
+            assert math.isclose(app["pixel"]["y"], HEX_SIZE * 1.5 * r, abs_tol=1e-3)
+
+
+def test_collisions():
+    output = add_geometry(layout())
+    geometry = output["geometry"]
+
+    # The same collisions the frontend's occupancy map would find
+    seen = {}
+    expected = []
+    for cluster in output["clusters"]:
+        for app in cluster["applications"]:
+            position = (app["gridPosition"]["q"], app["gridPosition"]["r"])
+            if position in seen:
+                assert app["collidesWith"]["name"] == seen[position]
+                expected.append(app["name"])
+            else:
+                assert "hasCollision" not in app
+                seen[position] = app["name"]
+    assert expected and [c["app"] for c in geometry["collisions"]] == expected
+
+
+def test_geometry_is_repeatable_and_survives_deltas():
+    plain = layout()
+    with_geometry = add_geometry(copy.deepcopy(plain))
+    assert add_geometry(copy.deepcopy(with_geometry)) == with_geometry
+    assert strip_geometry(copy.deepcopy(with_geometry)) == plain
+
+    changed = add_geometry(layout(seed=2))
+    delta = diff_layouts(with_geometry, changed)
+    assert apply_delta(with_geometry, delta)["geometry"] == changed["geometry"]
+
+
+if __name__ == '__main__':
+    test_pixels_match_the_frontend_grid()
+    test_collisions()
+    test_geometry_is_repeatable_and_survives_deltas()
+    print("All geometry tests passed")
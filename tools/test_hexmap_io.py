@@ -0,0 +1,66 @@
+"""
+Tests for streamed layout output.
+
+Run with: python -m pytest tools/test_hexmap_io.py
+      or: python tools/test_hexmap_io.py
+"""
+
+import gzip
+import json
+import tempfile
+from pathlib import Path
+
+from continent_layout import ContinentLayoutEngine, generate_test_data
+from hexmap_io import HAS_BROTLI, compressed_siblings, iter_json, write_layout
+
+if HAS_BROTLI:
+    import brotli
+
+
+def layout(num_apps=200, seed=3):
+    engine = ContinentLayoutEngine(seed=seed, verbose=False)
+    engine.load_apps(generate_test_data(num_apps, seed))
+    return engine.generate_layout()
+
+
+def test_stream_matches_json_dumps():
+    samples = [layout(), {}, [], {"a": [], "b": {}}, [[[[["deep", {"z": 1, "a": None}]]]]],
+               {"text": "line\nbreak", "unicode": "é"}, "scalar"]
+    for data in samples:
+        for indent in (None, 2):
+            for sort_keys in (False, True):
+                separators = (',', ':') if indent is None else None
+                expected = json.dumps(data, indent=indent, sort_keys=sort_keys,
+                                      separators=separators)
+                assert ''.join(iter_json(data, indent, sort_keys)) == expected
+
+
+def test_minified_canonical_and_compressed():
+    data = layout()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "data.json"
+        siblings = compressed_siblings(path)
+
+        written = write_layout(data, path, minify=True, canonical=True, compress=True)
+        raw = path.read_bytes()
+        assert raw == json.dumps(data, sort_keys=True, separators=(',', ':')).encode()
+        assert gzip.decompress(siblings['gzip'].read_bytes()) == raw
+        if HAS_BROTLI:
+            assert written == [path, siblings['gzip'], siblings['br']]
+            assert brotli.decompress(siblings['br'].read_bytes()) == raw
+
+        # Reproducible: the same layout gives the same bytes, compressed too
+        gz = siblings['gzip'].read_bytes()
+        write_layout(data, path, minify=True, canonical=True, compress=True)
+        assert siblings['gzip'].read_bytes() == gz
+
+        # Without --compress, copies of the previous version are removed
+        assert write_layout(data, path) == [path]
+        assert not siblings['gzip'].exists() and not siblings['br'].exists()
+        assert path.read_text() == json.dumps(data, indent=2)
+
+
+if __name__ == '__main__':
+    test_stream_matches_json_dumps()
+    test_minified_canonical_and_compressed()
+    print("All output tests passed")
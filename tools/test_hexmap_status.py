@@ -0,0 +1,170 @@
+"""
+Tests for in-place status updates.
+
+Run with: python -m pytest tools/test_hexmap_status.py
+      or: python tools/test_hexmap_status.py
+"""
+
+import json
+import re
+import tempfile
+from pathlib import Path
+
+from continent_layout import ContinentLayoutEngine, generate_test_data
+from hexmap_io import write_json_atomic, write_layout
+from hexmap_status import STATUS_WIDTH, StatusPatcher
+
+
+def layout(num_apps=120, seed=5):
+    engine = ContinentLayoutEngine(seed=seed, verbose=False)
+    engine.load_apps(generate_test_data(num_apps, seed))
+    return engine.generate_layout()
+
+
+def app_status(data):
+    return {app['id']: app['status']
+            for cluster in data['clusters'] for app in cluster['applications']}
+
+
+def some_updates(statuses, count=10):
+    """New scores for a few apps, covering 1-, 2- and 3-digit values."""
+    new = [0, 7, 42, 100, 99, 5, 63, 18, 100, 1]
+    return {app_id: value for app_id, value in zip(sorted(statuses)[:count], new)
+            if statuses[app_id] != value}
+
+
+def test_padding():
+    data = layout()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "data.json"
+        write_json_atomic(data, path)
+
+        patcher = StatusPatcher(path)
+        raw = path.read_bytes()
+        slots = re.findall(rb'"status": ([0-9]+ *)', raw)
+        assert slots and all(len(slot) >= STATUS_WIDTH for slot in slots)
+        assert json.loads(raw) == data
+        assert patcher.status == app_status(data)
+
+        # An already padded file is left alone
+        mtime = path.stat().st_mtime_ns
+        StatusPatcher(path)
+        assert path.stat().st_mtime_ns == mtime and path.read_bytes() == raw
+
+
+def test_slots_that_are_not_plain_scores():
+    # Floats, out-of-range and over-wide values are rewritten to plain,
+    # clamped scores, so a shorter score never leaves stray bytes behind
+    raw = {"87.5": 87, "1000": 100, "100.0": 100, "-1": 0, "007": 7, "1e2": 100,
+           "42": 42, "5    ": 5}
+    apps = ",".join(f'{{"id":"a{i}","status":{value},"name":"x"}}'
+                    for i, value in enumerate(raw))
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "data.json"
+        path.write_text(f'{{"clusters":[{{"id":"c","applications":[{apps}]}}]}}')
+
+        patcher = StatusPatcher(path)
+        statuses = {f"a{i}": score for i, score in enumerate(raw.values())}
+        assert patcher.status == statuses
+        assert app_status(json.loads(path.read_text())) == statuses
+
+        for score in (7, 100, 42):
+            patcher.apply({app_id: score for app_id in statuses})
+            patcher.flush(force=True)
+            assert app_status(json.loads(path.read_text())) == dict.fromkeys(statuses, score)
+        patcher.close()
+
+
+def test_index_minified_canonical_and_indented():
+    data = layout()
+    statuses = app_status(data)
+    updates = some_updates(statuses)
+    expected = dict(statuses, **updates)
+    with tempfile.TemporaryDirectory() as tmp:
+        for options in ({}, {'minify': True}, {'canonical': True},
+                        {'minify': True, 'canonical': True}):
+            path = Path(tmp) / "data.json"
+            write_layout(data, path, **options)
+
+            patcher = StatusPatcher(path)
+            assert patcher.status == statuses, options
+            summary = patcher.apply(dict(updates, unknown_app=50))
+            assert summary['changed'] == len(updates) and summary['unknown'] == 1
+            patcher.close()
+
+            patched = json.loads(path.read_text())
+            assert app_status(patched) == expected, options
+            # Only status values changed
+            for cluster in patched['clusters']:
+                for app in cluster['applications']:
+                    app['status'] = statuses[app['id']]
+            assert patched == data, options
+
+
+def test_reindex_after_replace():
+    first, second = layout(seed=5), layout(num_apps=80, seed=6)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "data.json"
+        write_layout(first, path)
+        patcher = StatusPatcher(path)
+        patcher.apply(some_updates(patcher.status, 3))
+        assert patcher.changed
+
+        # A new layout run replaces the file: the next batch re-indexes it
+        write_layout(second, path, minify=True)
+        statuses = app_status(second)
+        updates = some_updates(statuses, 4)
+        patcher.apply(updates)
+        assert set(patcher.offsets) == set(statuses)
+        assert patcher.changed == updates
+        assert app_status(json.loads(path.read_text())) == dict(statuses, **updates)
+        patcher.close()
+
+
+def test_delta():
+    data = layout()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "data.json"
+        delta_path = Path(tmp) / "data.delta.json"
+        write_layout(data, path)
+        patcher = StatusPatcher(path, delta_path)
+        updates = some_updates(patcher.status, 4)
+
+        patcher.flush(force=True)
+        assert not delta_path.exists()      # Nothing changed yet
+
+        patcher.apply(updates)
+        patcher.apply(dict(updates))        # Same values again: no change
+        patcher.apply({next(iter(updates)): 50})
+        expected = dict(updates, **{next(iter(updates)): 50})
+        assert patcher.delta() == {
+            "format": "hexmap-delta",
+            "version": 2,
+            "apps": {"changed": {app_id: {"status": status}
+                                 for app_id, status in expected.items()}},
+        }
+
+        patcher.flush(force=True)
+        assert json.loads(delta_path.read_text()) == dict(patcher.delta(), baseVersion=0)
+
+        # The next delta file holds only what changed since the previous one
+        last = sorted(patcher.status)[-1]
+        patcher.apply({last: (patcher.status[last] + 1) % 101})
+        patcher.flush(force=True)
+        assert json.loads(delta_path.read_text()) == {
+            "format": "hexmap-delta",
+            "version": 3,
+            "baseVersion": 2,
+            "apps": {"changed": {last: {"status": patcher.status[last]}}},
+        }
+        assert last in patcher.delta()["apps"]["changed"]
+        patcher.close()
+
+
+if __name__ == '__main__':
+    test_padding()
+    test_slots_that_are_not_plain_scores()
+    test_index_minified_canonical_and_indented()
+    test_reindex_after_replace()
+    test_delta()
+    print("All status update tests passed")
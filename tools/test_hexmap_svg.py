@@ -0,0 +1,96 @@
+"""
+Tests for the SVG preview renderer.
+
+Run with: python -m pytest tools/test_hexmap_svg.py
+      or: python tools/test_hexmap_svg.py
+"""
+
+import io
+import math
+import xml.etree.ElementTree as ET
+
+from continent_layout import ContinentLayoutEngine, generate_test_data
+from hexmap_geometry import HEX_WIDTH, pixel_centres
+from hexmap_svg import EDGE_NEIGHBOURS, STATUS_COLORS, hex_corners, render_svg
+
+SVG = '{http://www.w3.org/2000/svg}'
+
+
+def layout(num_apps=300, seed=1):
+    engine = ContinentLayoutEngine(seed=seed, collision_rate=0.01, verbose=False)
+    engine.load_apps(generate_test_data(num_apps, seed))
+    return engine.generate_layout()
+
+
+def render(data, **options):
+    out = io.StringIO()
+    counts = render_svg(data, out, **options)
+    return ET.fromstring(out.getvalue()), counts
+
+
+def app(app_id, q, r, **fields):
+    return dict(id=app_id, name=app_id, gridPosition={"q": q, "r": r}, **fields)
+
+
+def test_edges_face_their_neighbours():
+    # The midpoint of each edge is halfway to the neighbour across it
+    corners = hex_corners()
+    for q, r in [(0, 0), (3, 1), (-2, -3)]:
+        for corner, (dq, dr) in enumerate(EDGE_NEIGHBOURS[r & 1]):
+            (x, nx), (y, ny) = pixel_centres([q, q + dq], [r, r + dr])
+            (ax, ay), (bx, by) = corners[corner], corners[(corner + 1) % 6]
+            assert math.isclose(x + (ax + bx) / 2, (x + nx) / 2, abs_tol=1e-2)
+            assert math.isclose(y + (ay + by) / 2, (y + ny) / 2, abs_tol=1e-2)
+            assert math.isclose(math.hypot(nx - x, ny - y), HEX_WIDTH, abs_tol=1e-2)
+
+
+def test_every_app_is_drawn():
+    data = layout()
+    root, counts = render(data, connections=True)
+    apps = [a for c in data["clusters"] for a in c["applications"]]
+    assert counts["hexagons"] == len(apps)
+
+    hexagons = root.find(f"{SVG}g[@class='hexagons']")
+    assert sum(path.get("d").count("M") for path in hexagons) == len(apps)
+    fills = {path.get("fill") for path in hexagons}
+    assert fills == {c["color"] for c in data["clusters"]}
+
+    ids = {a["id"] for a in apps}
+    expected = sum(1 for a in apps for conn in a.get("connections", []) if conn["to"] in ids)
+    assert counts["connections"] == expected
+    labels = root.find(f"{SVG}g[@class='labels']")
+    assert [label.text for label in labels] == [c["name"] for c in data["clusters"]]
+
+
+def test_status_colours_and_collisions():
+    data = {"clusters": [
+        {"id": "a", "name": "A", "color": "#111111",
+         "applications": [app("x", 0, 0, status=10), app("y", 1, 0, status=50),
+                          app("z", 2, 0, status=90), app("w", 3, 0)]},
+        {"id": "b", "name": "B", "color": "#222222",
+         "applications": [app("v", 0, 0, status=90)]},
+    ]}
+    root, counts = render(data, color_mode="status")
+    fills = {path.get("fill"): path.get("d").count("M")
+             for path in root.find(f"{SVG}g[@class='hexagons']")}
+    assert fills == {STATUS_COLORS["low"]: 1, STATUS_COLORS["medium"]: 1,
+                     STATUS_COLORS["high"]: 2, STATUS_COLORS["undefined"]: 1}
+    assert counts["collisions"] == 1
+
+
+def test_outlines_follow_territory_borders():
+    # Two adjacent hexes: one shared edge inside a cluster, none across clusters
+    same = {"clusters": [{"id": "a", "color": "#111111",
+                          "applications": [app("x", 0, 0), app("y", 1, 0)]}]}
+    split = {"clusters": [{"id": "a", "color": "#111111", "applications": [app("x", 0, 0)]},
+                          {"id": "b", "color": "#222222", "applications": [app("y", 1, 0)]}]}
+    assert render(same)[1]["outline_edges"] == 10
+    assert render(split)[1]["outline_edges"] == 12
+
+
+if __name__ == '__main__':
+    test_edges_face_their_neighbours()
+    test_every_app_is_drawn()
+    test_status_colours_and_collisions()
+    test_outlines_follow_territory_borders()
+    print("All SVG tests passed")
@@ -0,0 +1,68 @@
+"""
+Tests for the SQLite inventory store.
+
+Run with: python -m pytest tools/test_inventory_store.py
+      or: python tools/test_inventory_store.py
+"""
+
+import tempfile
+from dataclasses import replace
+from pathlib import Path
+
+from continent_layout import ContinentLayoutEngine, generate_test_data
+from inventory_store import InventoryStore
+
+
+def _store(tmp):
+    return InventoryStore(Path(tmp) / 'inventory.db')
+
+
+def test_round_trip_and_change_tracking():
+    apps = generate_test_data(300, seed=3)
+    with tempfile.TemporaryDirectory() as tmp, _store(tmp) as store:
+        counts = store.ingest_apps(apps)
+        assert counts["added"] == len(apps)
+        assert store.load_apps() == apps
+
+        revision = store.revision()
+        assert store.ingest_apps(apps)["unchanged"] == len(apps)
+        assert store.revision() == revision
+
+        edited = [replace(app, connections=list(app.connections)) for app in apps[1:]]
+        edited[0].status = (edited[0].status + 1) % 101
+        edited[1].connections.append(apps[2].id)
+        counts = store.ingest_apps(edited)
+        assert (counts["changed"], counts["removed"]) == (2, 1)
+        assert store.load_apps() == edited
+
+        changed, removed = store.changes_since(revision)
+        assert {app.id for app in changed} == {edited[0].id, edited[1].id}
+        assert removed == [apps[0].id]
+
+
+def test_persisted_territories_reproduce_layout():
+    apps = generate_test_data(300, seed=4)
+    with tempfile.TemporaryDirectory() as tmp:
+        with _store(tmp) as store:
+            store.ingest_apps(apps)
+            engine = ContinentLayoutEngine(seed=7, verbose=False)
+            engine.load_apps(store.load_apps())
+            expected = engine.generate_layout()
+            store.save_layout(engine)
+
+        # A fresh engine in a later run continues from the stored layout
+        with _store(tmp) as store:
+            engine = ContinentLayoutEngine(seed=7, verbose=False)
+            territories = store.load_territories(engine)
+            assert territories is not None
+            assert engine.update_layout(store.load_apps(), territories=territories) == expected
+            assert engine.last_update_incremental
+
+            # Other engine settings do not reuse the stored territories
+            assert store.load_territories(ContinentLayoutEngine(seed=8, verbose=False)) is None
+
+
+if __name__ == '__main__':
+    test_round_trip_and_change_tracking()
+    test_persisted_territories_reproduce_layout()
+    print("All inventory store tests passed")
@@ -0,0 +1,108 @@
+"""
+Tests for layout deltas.
+
+Run with: python -m pytest tools/test_layout_diff.py
+      or: python tools/test_layout_diff.py
+"""
+
+import copy
+
+from continent_layout import ContinentLayoutEngine, generate_test_data
+from layout_diff import apply_delta, diff_layouts, is_empty_delta, layouts_equivalent
+
+
+def layout(num_apps=150, seed=11):
+    engine = ContinentLayoutEngine(seed=seed, verbose=False)
+    engine.load_apps(generate_test_data(num_apps, seed))
+    return engine.generate_layout()
+
+
+def all_apps(data):
+    return [app for cluster in data['clusters'] for app in cluster['applications']]
+
+
+def test_identical_layouts():
+    data = layout()
+    delta = diff_layouts(data, copy.deepcopy(data), version=3, base_version=2)
+    assert is_empty_delta(delta)
+    assert delta == {"format": "hexmap-delta", "version": 3, "baseVersion": 2}
+    assert layouts_equivalent(apply_delta(data, delta), data)
+
+
+def test_round_trip():
+    old = layout(seed=11)
+    new = copy.deepcopy(old)
+    first, second = new['clusters'][0], new['clusters'][1]
+
+    moved = first['applications'].pop()
+    moved['gridPosition'] = {'q': 99, 'r': -99}
+    second['applications'].append(moved)
+    first['applications'][0]['gridPosition'] = {'q': 98, 'r': -98}
+    first['applications'][1]['name'] = 'Renamed'
+    first['applications'][1].pop('description', None)
+    first['applications'][2]['connections'] = []
+    second['applications'].append(dict(first['applications'][3], id='new-app', name='New'))
+    second['color'] = '#123456'
+    new['clusters'].append({'id': 'new-cluster', 'name': 'New', 'color': '#000000',
+                            'applications': [dict(moved, id='new-app-2')]})
+    new['generated'] = 'later'
+
+    delta = diff_layouts(old, new)
+    assert not is_empty_delta(delta)
+    assert delta['apps']['moved'][moved['id']]['cluster'] == second['id']
+    assert delta['clusters']['added'][0]['id'] == 'new-cluster'
+    assert layouts_equivalent(apply_delta(old, delta), new)
+    # The old layout is not modified
+    assert layouts_equivalent(old, layout(seed=11))
+
+    # And back again
+    assert layouts_equivalent(apply_delta(new, diff_layouts(new, old)), old)
+
+    # A layout with a different inventory and placement
+    other = layout(num_apps=120, seed=12)
+    assert layouts_equivalent(apply_delta(old, diff_layouts(old, other)), other)
+
+
+def test_removed_apps():
+    old = layout()
+    new = copy.deepcopy(old)
+    removed = [new['clusters'][0]['applications'].pop(0)['id'],
+               new['clusters'][-1]['applications'].pop()['id']]
+    removed_cluster = new['clusters'].pop(1)
+    removed += [app['id'] for app in removed_cluster['applications']]
+
+    delta = diff_layouts(old, new)
+    assert sorted(delta['apps']['removed']) == sorted(removed)
+    assert delta['clusters']['removed'] == [removed_cluster['id']]
+    assert 'added' not in delta['apps'] and 'moved' not in delta['apps']
+
+    patched = apply_delta(old, delta)
+    assert layouts_equivalent(patched, new)
+    assert not set(removed) & {app['id'] for app in all_apps(patched)}
+
+
+def test_status_only_changes():
+    old = layout()
+    new = copy.deepcopy(old)
+    apps = all_apps(new)
+    changed = {}
+    for app in apps[::10]:
+        app['status'] = (app['status'] + 37) % 101
+        changed[app['id']] = app['status']
+
+    delta = diff_layouts(old, new, version=2)
+    assert delta == {
+        "format": "hexmap-delta",
+        "version": 2,
+        "apps": {"changed": {app_id: {"status": status}
+                             for app_id, status in changed.items()}},
+    }
+    assert layouts_equivalent(apply_delta(old, delta), new)
+
+
+if __name__ == '__main__':
+    test_identical_layouts()
+    test_round_trip()
+    test_removed_apps()
+    test_status_only_changes()
+    print("All layout diff tests passed")
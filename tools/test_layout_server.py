@@ -0,0 +1,90 @@
+"""
+Tests for the live layout server.
+
+Run with: python -m pytest tools/test_layout_server.py
+      or: python tools/test_layout_server.py
+"""
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from contextlib import contextmanager, redirect_stdout
+from http.server import ThreadingHTTPServer
+from io import StringIO
+
+from continent_layout import ContinentLayoutEngine, generate_test_data
+from layout_server import LayoutRequestHandler, LayoutService
+
+
+def service(num_apps=300, seed=8):
+    engine = ContinentLayoutEngine(seed=seed, verbose=False)
+    with redirect_stdout(StringIO()):
+        return LayoutService(generate_test_data(num_apps, seed), engine)
+
+
+@contextmanager
+def running_server(layout_service):
+    LayoutRequestHandler.service = layout_service
+    server = ThreadingHTTPServer(('127.0.0.1', 0), LayoutRequestHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def post(url, body: bytes):
+    request = urllib.request.Request(url, data=body, method='POST',
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_upsert_leaves_other_continents_out_of_the_delta():
+    layout_service = service()
+    clusters = {cluster["id"]: cluster["name"] for cluster in layout_service.layout["clusters"]}
+    trading = next(cluster_id for cluster_id, name in clusters.items() if name == "Trading")
+
+    with redirect_stdout(StringIO()):
+        event = layout_service.apply_delta(
+            [{"app_name": "New Trading App", "business": "Trading", "status": "80"}],
+            [], time.perf_counter())
+    assert event["mode"] == "incremental"
+
+    delta = layout_service.deltas[-1]
+    assert [app["id"] for app in delta["apps"]["added"]] == ["New_Trading_App"]
+    app_cluster = {app["id"]: cluster["id"] for cluster in layout_service.layout["clusters"]
+                   for app in cluster["applications"]}
+    touched = set(delta["apps"].get("changed", {})) | set(delta["apps"].get("moved", {}))
+    assert {app_cluster[app_id] for app_id in touched} <= {trading}
+
+
+def test_malformed_bodies_get_400():
+    layout_service = service(num_apps=60)
+    version = layout_service.version
+    with running_server(layout_service) as url:
+        for body in (b'{"upsert": [5]}', b'{"upsert": {"a": 1}}', b'{"upsert": "x"}',
+                     b'{"remove": "App_1"}', b'{"remove": [{"id": 1}]}', b'[1, 2]',
+                     b'{"upsert": [', b'{"version": 1'):
+            status, reply = post(f"{url}/apps", body)
+            assert status == 400 and reply["error"], body
+        status, reply = post(f"{url}/ack", b'[1]')
+        assert status == 400
+
+        # The server is still up and nothing was applied
+        status, reply = post(f"{url}/ack", json.dumps({"version": version}).encode())
+        assert status == 200 and reply["version"] == version
+    assert layout_service.version == version
+
+
+if __name__ == '__main__':
+    test_upsert_leaves_other_continents_out_of_the_delta()
+    test_malformed_bodies_get_400()
+    print("All layout server tests passed")
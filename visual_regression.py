@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Visual regression stage for the screenshot captures.
+
+Compares each capture with a stored baseline and writes a pass/fail summary,
+plus a diff heatmap for every capture that changed.
+
+Baselines live under visual-baselines/<data hash>-<viewport>/. The data hash
+is a hash of src/data.json, so a new layout gets new baselines instead of
+failing every comparison. An index.json in each directory records every
+baseline's file hash and perceptual hash (dHash).
+
+For each capture:
+- identical: same file hash as the baseline, so the pixels are not decoded
+- pass / fail: a vectorized pixel diff. A pixel counts as changed when any
+  channel differs by more than PIXEL_TOLERANCE; the capture fails when more
+  than MAX_CHANGED_RATIO of its pixels changed. The dHash distance is
+  reported alongside (0-64; small means the same picture with noise, large
+  means a different picture).
+- size-changed: dimensions differ from the baseline
+- new: no baseline yet; the capture becomes the baseline
+
+Needs numpy and Pillow (pip install numpy pillow).
+
+Usage:
+    python visual_regression.py test-screenshots/qa-manifest.json
+    python visual_regression.py test-screenshots/qa-manifest.json --update   # Accept current captures
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+# Optional dependencies - check at runtime
+try:
+    import numpy as np
+    from PIL import Image
+    HAS_IMAGING = True
+except ImportError:
+    HAS_IMAGING = False
+
+SCRIPT_DIR = Path(__file__).parent
+DEFAULT_BASELINES = SCRIPT_DIR / 'visual-baselines'
+DEFAULT_DATA = SCRIPT_DIR / 'src' / 'data.json'
+
+PIXEL_TOLERANCE = 16        # Max per-channel difference (0-255) still counted as unchanged
+MAX_CHANGED_RATIO = 0.001   # Share of changed pixels a capture may have and still pass
+
+
+def file_hash(path):
+    """sha256 of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def baseline_key(data_hash, viewport):
+    """Baseline directory name: the map data's hash plus the viewport."""
+    return f"{data_hash[:12]}-{viewport['width']}x{viewport['height']}"
+
+
+def load_pixels(path):
+    """RGB pixels as a uint8 array."""
+    with Image.open(path) as image:
+        return np.asarray(image.convert('RGB'))
+
+
+def dhash(pixels):
+    """64-bit difference hash: brighter-than-right-neighbour bits of a 9x8 thumbnail."""
+    gray = Image.fromarray(pixels).convert('L').resize((9, 8), Image.BILINEAR)
+    cells = np.asarray(gray)
+    bits = (cells[:, 1:] > cells[:, :-1]).flatten()
+    return int(''.join('1' if bit else '0' for bit in bits), 2)
+
+
+def diff_pixels(baseline, current):
+    """Per-pixel max channel difference, computed a channel at a time in uint8."""
+    channels = np.maximum(baseline, current) - np.minimum(baseline, current)
+    return np.maximum(np.maximum(channels[..., 0], channels[..., 1]), channels[..., 2])
+
+
+def write_heatmap(baseline, difference, changed, path):
+    """Dimmed grayscale baseline with changed pixels in red, brighter for bigger changes."""
+    gray = np.asarray(Image.fromarray(baseline).convert('L')) // 4 + 180
+    red, green = gray.copy(), gray.copy()
+    red[changed] = 128 + difference[changed] // 2
+    green[changed] = 0
+    heat = Image.merge('RGB', [Image.fromarray(red), Image.fromarray(green), Image.fromarray(green)])
+    heat.save(path, compress_level=1)
+
+
+def _load_index(directory):
+    path = directory / 'index.json'
+    if not path.exists():
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_index(directory, index):
+    directory.mkdir(parents=True, exist_ok=True)
+    with open(directory / 'index.json', 'w') as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+
+
+def _store_baseline(directory, index, name, capture_path, pixels=None):
+    directory.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(capture_path, directory / name)
+    if pixels is None:
+        pixels = load_pixels(capture_path)
+    index[name] = {
+        'sha256': file_hash(capture_path),
+        'dhash': f"{dhash(pixels):016x}",
+        'updated': datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def compare_capture(capture_path, directory, index, diff_dir, update=False,
+                    tolerance=PIXEL_TOLERANCE, max_ratio=MAX_CHANGED_RATIO):
+    """Compare one capture with its baseline in directory; returns its result record."""
+    name = Path(capture_path).name
+    result = {'name': name, 'capture': str(capture_path)}
+    entry = index.get(name)
+
+    if entry is None or not (directory / name).exists():
+        _store_baseline(directory, index, name, capture_path)
+        result['status'] = 'new'
+        return result
+
+    if file_hash(capture_path) == entry['sha256']:
+        result['status'] = 'identical'
+        return result
+
+    current = load_pixels(capture_path)
+    baseline = load_pixels(directory / name)
+    result['dhash_distance'] = bin(dhash(current) ^ int(entry['dhash'], 16)).count('1')
+
+    if current.shape != baseline.shape:
+        result['status'] = 'size-changed'
+        result['detail'] = (f"{baseline.shape[1]}x{baseline.shape[0]} -> "
+                            f"{current.shape[1]}x{current.shape[0]}")
+    else:
+        difference = diff_pixels(baseline, current)
+        changed = difference > tolerance
+        ratio = np.count_nonzero(changed) / changed.size
+        result['changed_ratio'] = round(ratio, 6)
+        result['max_difference'] = int(difference.max())
+        result['status'] = 'pass' if ratio <= max_ratio else 'fail'
+        if result['status'] == 'fail':
+            diff_dir.mkdir(parents=True, exist_ok=True)
+            diff_path = diff_dir / f"{Path(name).stem}-diff.png"
+            write_heatmap(baseline, difference, changed, diff_path)
+            result['diff'] = str(diff_path)
+
+    if update and result['status'] in ('fail', 'size-changed'):
+        _store_baseline(directory, index, name, capture_path, current)
+        result['status'] += ' (updated)'
+    return result
+
+
+def run_stage(captures, data_path=DEFAULT_DATA, baselines_dir=DEFAULT_BASELINES,
+              out_dir='./test-screenshots', update=False,
+              tolerance=PIXEL_TOLERANCE, max_ratio=MAX_CHANGED_RATIO):
+    """
+    Compare captures [{'path', 'viewport'}] with their baselines, print the
+    summary and write visual-regression.json to out_dir. Returns True if
+    nothing regressed.
+    """
+    if not HAS_IMAGING:
+        print("Visual regression skipped: needs numpy and Pillow (pip install numpy pillow)")
+        return True
+
+    start = time.perf_counter()
+    baselines_dir = Path(baselines_dir)
+    diff_dir = Path(out_dir) / 'diffs'
+    data_hash = file_hash(data_path)
+    keys = [baseline_key(data_hash, capture['viewport']) for capture in captures]
+    indexes = {key: _load_index(baselines_dir / key) for key in set(keys)}
+
+    def compare(capture, key):
+        result = compare_capture(capture['path'], baselines_dir / key, indexes[key], diff_dir,
+                                 update, tolerance, max_ratio)
+        result['baseline'] = key
+        return result
+
+    # PNG decoding and the numpy diff release the GIL, so threads overlap them
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+        results = list(pool.map(compare, captures, keys))
+    for key, index in indexes.items():
+        _save_index(baselines_dir / key, index)
+    seconds = time.perf_counter() - start
+
+    failed = [r for r in results if r['status'] in ('fail', 'size-changed')]
+    summary = {
+        'passed': not failed,
+        'seconds': round(seconds, 3),
+        'tolerance': tolerance,
+        'max_changed_ratio': max_ratio,
+        'results': results,
+    }
+    with open(Path(out_dir) / 'visual-regression.json', 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    print("\n" + "=" * 60)
+    print("VISUAL REGRESSION")
+    print("=" * 60)
+    for r in results:
+        detail = r.get('detail', '')
+        if 'changed_ratio' in r:
+            detail = f"{r['changed_ratio']:.3%} changed, dHash distance {r['dhash_distance']}"
+        print(f"  {r['status']:<22} {r['name']:<28} {detail}")
+        if 'diff' in r:
+            print(f"  {'':<22} heatmap: {r['diff']}")
+    print(f"\n{len(results)} capture(s) compared in {seconds:.2f}s: "
+          f"{len(results) - len(failed)} ok, {len(failed)} regressed")
+    return not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compare screenshot captures with their baselines',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+The manifest is written by test_visual_qa.py: a JSON list of
+{"path": "...png", "viewport": {"width": W, "height": H}}.
+
+Examples:
+  python visual_regression.py test-screenshots/qa-manifest.json
+  python visual_regression.py test-screenshots/qa-manifest.json --update
+  python visual_regression.py test-screenshots/qa-manifest.json --tolerance 32 --max-ratio 0.01
+        """
+    )
+    parser.add_argument('manifest', help='Capture manifest (JSON)')
+    parser.add_argument('--data', default=str(DEFAULT_DATA),
+                        help='Map data the captures show, for the baseline key (default: src/data.json)')
+    parser.add_argument('--baselines', default=str(DEFAULT_BASELINES),
+                        help='Baseline directory (default: visual-baselines/)')
+    parser.add_argument('--update', action='store_true',
+                        help='Accept changed captures as the new baselines')
+    parser.add_argument('--tolerance', type=int, default=PIXEL_TOLERANCE,
+                        help=f'Per-channel difference ignored (default: {PIXEL_TOLERANCE})')
+    parser.add_argument('--max-ratio', type=float, default=MAX_CHANGED_RATIO,
+                        help=f'Changed pixel share allowed (default: {MAX_CHANGED_RATIO})')
+    args = parser.parse_args()
+
+    with open(args.manifest) as f:
+        captures = json.load(f)
+    passed = run_stage(captures, args.data, args.baselines,
+                       os.path.dirname(args.manifest) or '.', args.update,
+                       args.tolerance, args.max_ratio)
+    return 0 if passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,45 +2,388 @@
 """
 Start one or more servers, wait for them to be ready, run a command, then clean up.
 
+All servers are started at once and waited on together. A server is ready
+when its port accepts connections, or, with --health, when its health URL
+answers with the expected status (a dev server opens its port long before
+it can serve the bundle). Probes back off exponentially with jitter. If any
+server exits or times out, the others are stopped at once.
+
 Usage:
     # Single server
     python scripts/with_server.py --server "npm run dev" --port 5173 -- python automation.py
     python scripts/with_server.py --server "npm start" --port 3000 -- python test.py
 
-    # Multiple servers
+    # Ready only once the dev server serves the bundle
+    python with_server.py --server "npm start" --port 3000 \
+      --health http://localhost:3000/static/js/bundle.js -- python test.py
+
+    # Multiple servers (--health and --expect-status follow --server order;
+    # "-" keeps the port check for that server)
     python scripts/with_server.py \
-      --server "cd backend && python server.py" --port 3000 \
-      --server "cd frontend && npm run dev" --port 5173 \
+      --server "cd backend && python server.py" --port 3000 --health http://localhost:3000/health \
+      --server "cd frontend && npm run dev" --port 5173 --health - \
       -- python test.py
+
+    # Keep the servers for the next call, then stop them when done
+    python with_server.py --daemon --server "npm start" --port 3000 -- python test_hexmap_visual.py
+    python with_server.py --daemon --server "npm start" --port 3000 -- python test_visual_qa.py
+    python with_server.py --stop
+
+Daemon mode:
+    With --daemon, servers started by this call are left running and
+    registered in a state file (.with_server.json by default) with their
+    PID, process start time, port and a hash of their command; their output goes to
+    .with_server-<port>.log next to it. Any later call, with or without
+    --daemon, reuses a registered server with the same command and port if
+    it still answers its probe, instead of starting a new one. A registered
+    server that is dead or was started from a different command is stopped
+    and replaced. --stop stops every registered server.
+
+    A registered PID is only signalled while the process with that PID
+    still has the recorded start time. An entry that outlived its server
+    (after a reboot or a manual kill, when the PID may belong to something
+    else by now) is dropped without signalling anything.
+
+    Every server runs in its own process group (session), and stopping a
+    server kills the whole group, so "cd x && npm start" takes the dev
+    server down with the shell.
 """
 
 import subprocess
 import socket
+import threading
 import time
+import random
 import sys
+import os
+import signal
+import json
+import hashlib
 import argparse
+import urllib.error
+import urllib.request
+
+PROBE_TIMEOUT = 2.0     # Seconds per connect / HTTP request
+BACKOFF_START = 0.05    # First retry delay in seconds
+BACKOFF_MAX = 2.0       # Retry delay cap in seconds
+STOP_GRACE = 5.0        # Seconds between SIGTERM and SIGKILL
+STATE_FILE = '.with_server.json'
+
+
+def port_open(port):
+    """True if something accepts connections on localhost:port."""
+    try:
+        with socket.create_connection(('localhost', port), timeout=PROBE_TIMEOUT):
+            return True
+    except OSError:
+        return False
+
+
+def health_ok(url, expect_status=200):
+    """True if url answers with expect_status."""
+    try:
+        with urllib.request.urlopen(url, timeout=PROBE_TIMEOUT) as response:
+            return response.status == expect_status
+    except urllib.error.HTTPError as e:
+        return e.code == expect_status
+    except (urllib.error.URLError, OSError):
+        return False
+
+
+def probe(server):
+    """One readiness check: the health URL if the server has one, else the port."""
+    if server['health']:
+        return health_ok(server['health'], server['expect_status'])
+    return port_open(server['port'])
+
 
 def is_server_ready(port, timeout=30):
     """Wait for server to be ready by polling the port."""
-    start_time = time.time()
-    while time.time() - start_time < timeout:
-        try:
-            with socket.create_connection(('localhost', port), timeout=1):
-                return True
-        except (socket.error, ConnectionRefusedError):
-            time.sleep(0.5)
+    deadline = time.time() + timeout
+    delay = BACKOFF_START
+    while time.time() < deadline:
+        if port_open(port):
+            return True
+        time.sleep(random.uniform(delay / 2, delay))
+        delay = min(delay * 2, BACKOFF_MAX)
     return False
 
 
+def wait_for_server(server, process, timeout, abort):
+    """
+    Probe one server until it is ready, its process exits, the timeout passes
+    or abort is set. Returns (ready, seconds, reason).
+    """
+    start = time.time()
+    delay = BACKOFF_START
+    while not abort.is_set():
+        ready = probe(server)
+        elapsed = time.time() - start
+        if ready:
+            return True, elapsed, None
+        if process.poll() is not None:
+            return False, elapsed, f"exited with code {process.returncode}"
+        if elapsed >= timeout:
+            return False, elapsed, f"not ready within {timeout}s"
+        # Full jitter keeps several waiters from probing in lockstep
+        abort.wait(min(random.uniform(delay / 2, delay), timeout - elapsed))
+        delay = min(delay * 2, BACKOFF_MAX)
+    return False, time.time() - start, "aborted"
+
+
+def wait_for_all(servers, processes, timeout):
+    """
+    Wait for every server in parallel. Raises RuntimeError as soon as one
+    fails; the remaining waiters are told to stop.
+    """
+    abort = threading.Event()
+    results = [None] * len(servers)
+    done = threading.Condition()
+
+    def waiter(i):
+        result = wait_for_server(servers[i], processes[i], timeout, abort)
+        with done:
+            results[i] = result
+            if not result[0]:
+                abort.set()
+            done.notify()
+
+    threads = [threading.Thread(target=waiter, args=(i,), daemon=True)
+               for i in range(len(servers))]
+    for thread in threads:
+        thread.start()
+
+    with done:
+        while not abort.is_set() and not all(results):
+            done.wait()
+    abort.set()
+
+    for i, result in enumerate(results):
+        if result and not result[0] and result[2] != "aborted":
+            server = servers[i]
+            raise RuntimeError(f"Server {server['number']} on port {server['port']} failed after "
+                               f"{result[1]:.1f}s: {result[2]}")
+
+    for server, (_, elapsed, _) in zip(servers, results):
+        target = server['health'] or f"port {server['port']}"
+        print(f"Server {server['number']} ready in {elapsed:.1f}s ({target})")
+
+
+def command_hash(cmd):
+    """Short, stable fingerprint of a server command."""
+    return hashlib.sha256(cmd.encode('utf-8')).hexdigest()[:16]
+
+
+def start_server(server, log_path=None):
+    """Start a server command in its own process group."""
+    # Use shell=True to support commands with cd and &&
+    # Without a log file, don't capture output so we can see server logs
+    output = open(log_path, 'ab') if log_path else None
+    if os.name == 'nt':
+        group = {'creationflags': subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        group = {'start_new_session': True}
+    try:
+        return subprocess.Popen(server['cmd'], shell=True, stdout=output,
+                                stderr=subprocess.STDOUT if output else None, **group)
+    finally:
+        if output:
+            output.close()
+
+
+def pid_alive(pid):
+    """True if a process with this PID exists."""
+    if os.name == 'nt':
+        # os.kill(pid, 0) would terminate it on Windows; the probe decides there
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _windows_start_time(pid):
+    import ctypes
+    from ctypes import wintypes
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+    if not handle:
+        return None
+    try:
+        times = [wintypes.FILETIME() for _ in range(4)]
+        if not kernel32.GetProcessTimes(handle, *(ctypes.byref(t) for t in times)):
+            return None
+        return f"{times[0].dwHighDateTime}:{times[0].dwLowDateTime}"
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def process_start_time(pid):
+    """
+    When the process with this PID started, as an opaque string, or None if
+    there is no such process. Together with the PID it identifies a process:
+    a reused PID gets a different start time.
+    """
+    if os.name == 'nt':
+        return _windows_start_time(pid)
+    if os.path.isdir('/proc/self'):
+        try:
+            with open(f'/proc/{pid}/stat') as f:
+                stat = f.read()
+        except OSError:
+            return None
+        # Field 22 (starttime); the command name before it may contain spaces
+        return stat.rsplit(')', 1)[1].split()[19]
+    result = subprocess.run(['ps', '-o', 'lstart=', '-p', str(pid)],
+                            capture_output=True, text=True)
+    return result.stdout.strip() or None
+
+
+def owns_process(entry):
+    """True if a registered entry's PID still belongs to the server it recorded."""
+    start = entry.get('start')
+    return start is not None and process_start_time(entry['pid']) == start
+
+
+def stop_process_group(pid, process=None):
+    """Stop a server and everything it started: SIGTERM its group, then SIGKILL."""
+    if os.name == 'nt':
+        subprocess.run(['taskkill', '/T', '/F', '/PID', str(pid)],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if process:
+            process.wait()
+        return
+    try:
+        os.killpg(pid, signal.SIGTERM)
+    except ProcessLookupError:
+        pass
+    deadline = time.time() + STOP_GRACE
+    while time.time() < deadline:
+        if process and process.poll() is not None:
+            break
+        if not process and not pid_alive(pid):
+            break
+        time.sleep(0.1)
+    # The leader may be gone while its children linger; kill whatever is left
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    if process:
+        process.wait()
+
+
+def load_state(path):
+    """Registered servers by port (as a string), or {} if there are none."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Warning: ignoring unreadable state file {path}: {e}")
+        return {}
+
+
+def save_state(path, state):
+    """Write the state file atomically; remove it once nothing is registered."""
+    if not state:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def stop_registered(state_path):
+    """Stop every registered server and clear the state file."""
+    state = load_state(state_path)
+    if not state:
+        print("No registered servers")
+        return
+    print(f"Stopping {len(state)} registered server(s)...")
+    for port, entry in sorted(state.items()):
+        if not owns_process(entry):
+            print(f"Server on port {port} is no longer running (pid {entry['pid']}), dropped")
+            continue
+        stop_process_group(entry['pid'])
+        print(f"Server on port {port} stopped (pid {entry['pid']})")
+    save_state(state_path, {})
+    print("All servers stopped")
+
+
+def reuse_registered(servers, state):
+    """
+    Split servers into (reused, to_start). A registered server is reused when
+    its command hash matches and it still answers its probe; otherwise its
+    process group is stopped (if the process is still the one registered)
+    and it is dropped from state.
+    """
+    reused = []
+    to_start = []
+    for server in servers:
+        key = str(server['port'])
+        entry = state.get(key)
+        if entry:
+            owned = owns_process(entry)
+            if entry['hash'] == server['hash'] and owned and probe(server):
+                print(f"Reusing server {server['number']} on port {server['port']} "
+                      f"(pid {entry['pid']})")
+                reused.append(server)
+                continue
+            if not owned:
+                reason = "no longer running"
+            elif entry['hash'] != server['hash']:
+                reason = "command changed"
+            else:
+                reason = "not healthy"
+            print(f"Replacing registered server on port {key} ({reason})")
+            if owned:
+                stop_process_group(entry['pid'])
+            del state[key]
+        to_start.append(server)
+    return reused, to_start
+
+
+def per_server(values, count, default, name, shared=False):
+    """Expand a repeatable option to one value per server (shared: one value may cover all)."""
+    if not values:
+        return [default] * count
+    if shared and len(values) == 1:
+        return values * count
+    if len(values) != count:
+        print(f"Error: Number of {name} arguments must match --server")
+        sys.exit(1)
+    return values
+
+
 def main():
     parser = argparse.ArgumentParser(description='Run command with one or more servers')
-    parser.add_argument('--server', action='append', dest='servers', required=True, help='Server command (can be repeated)')
-    parser.add_argument('--port', action='append', dest='ports', type=int, required=True, help='Port for each server (must match --server count)')
+    parser.add_argument('--server', action='append', dest='servers', help='Server command (can be repeated)')
+    parser.add_argument('--port', action='append', dest='ports', type=int, help='Port for each server (must match --server count)')
+    parser.add_argument('--health', action='append', dest='health',
+                        help='Health URL for each server, in --server order ("-" to poll the port)')
+    parser.add_argument('--expect-status', action='append', dest='expect_status', type=int,
+                        help='Expected health status for each server, or one for all (default: 200)')
     parser.add_argument('--timeout', type=int, default=30, help='Timeout in seconds per server (default: 30)')
+    parser.add_argument('--daemon', action='store_true',
+                        help='Leave started servers running and register them for reuse')
+    parser.add_argument('--stop', action='store_true', help='Stop all registered servers and exit')
+    parser.add_argument('--state', default=STATE_FILE,
+                        help=f'State file for registered servers (default: {STATE_FILE})')
     parser.add_argument('command', nargs=argparse.REMAINDER, help='Command to run after server(s) ready')
 
     args = parser.parse_args()
 
+    if args.stop:
+        stop_registered(args.state)
+        return
+
     # Remove the '--' separator if present
     if args.command and args.command[0] == '--':
         args.command = args.command[1:]
@@ -50,37 +393,61 @@ def main():
         sys.exit(1)
 
     # Parse server configurations
-    if len(args.servers) != len(args.ports):
+    if not args.servers or len(args.servers) != len(args.ports or []):
         print("Error: Number of --server and --port arguments must match")
         sys.exit(1)
 
+    count = len(args.servers)
+    health = per_server(args.health, count, '-', '--health')
+    statuses = per_server(args.expect_status, count, 200, '--expect-status', shared=True)
+
     servers = []
-    for cmd, port in zip(args.servers, args.ports):
-        servers.append({'cmd': cmd, 'port': port})
+    for i, (cmd, port, url, status) in enumerate(zip(args.servers, args.ports, health, statuses)):
+        servers.append({'number': i + 1, 'cmd': cmd, 'port': port, 'hash': command_hash(cmd),
+                        'health': None if url == '-' else url, 'expect_status': status})
 
+    state = load_state(args.state)
+    reused, to_start = reuse_registered(servers, state)
+    save_state(args.state, state)
+    log_dir = os.path.dirname(os.path.abspath(args.state))
+
+    # Servers this call owns and must stop on exit
     server_processes = []
 
     try:
-        # Start all servers
-        for i, server in enumerate(servers):
-            print(f"Starting server {i+1}/{len(servers)}: {server['cmd']}")
-
-            # Use shell=True to support commands with cd and &&
-            # Don't capture output so we can see server logs
-            process = subprocess.Popen(
-                server['cmd'],
-                shell=True
-            )
-            server_processes.append(process)
+        # Start all servers at once
+        start = time.time()
+        for server in to_start:
+            print(f"Starting server {server['number']}/{len(servers)}: {server['cmd']}")
+            log_path = None
+            if args.daemon:
+                log_path = os.path.join(log_dir, f".with_server-{server['port']}.log")
+                print(f"  logging to {log_path}")
+            server_processes.append(start_server(server, log_path))
 
-            # Wait for this server to be ready
-            print(f"Waiting for server on port {server['port']}...")
-            if not is_server_ready(server['port'], timeout=args.timeout):
-                raise RuntimeError(f"Server failed to start on port {server['port']} within {args.timeout}s")
+        if to_start:
+            print(f"Waiting for {len(to_start)} server(s)...")
+            try:
+                wait_for_all(to_start, server_processes, args.timeout)
+            except RuntimeError as e:
+                print(f"Error: {e}")
+                sys.exit(1)
 
-            print(f"Server ready on port {server['port']}")
+        if args.daemon and to_start:
+            for server, process in zip(to_start, server_processes):
+                state[str(server['port'])] = {
+                    'cmd': server['cmd'], 'hash': server['hash'], 'pid': process.pid,
+                    'start': process_start_time(process.pid),
+                    'health': server['health'], 'expect_status': server['expect_status'],
+                    'started': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                }
+            save_state(args.state, state)
+            print(f"Registered {len(to_start)} server(s) in {args.state} "
+                  f"(stop with: with_server.py --stop)")
+            server_processes = []
 
-        print(f"\nAll {len(servers)} server(s) ready")
+        print(f"\nAll {len(servers)} server(s) ready in {time.time() - start:.1f}s"
+              + (f" ({len(reused)} reused)" if reused else ""))
 
         # Run the command
         print(f"Running: {' '.join(args.command)}\n")
@@ -88,18 +455,14 @@ def main():
         sys.exit(result.returncode)
 
     finally:
-        # Clean up all servers
-        print(f"\nStopping {len(server_processes)} server(s)...")
-        for i, process in enumerate(server_processes):
-            try:
-                process.terminate()
-                process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                process.kill()
-                process.wait()
-            print(f"Server {i+1} stopped")
-        print("All servers stopped")
+        # Clean up the servers this call started and did not register
+        if server_processes:
+            print(f"\nStopping {len(server_processes)} server(s)...")
+            for server, process in zip(to_start, server_processes):
+                stop_process_group(process.pid, process)
+                print(f"Server {server['number']} stopped")
+            print("All servers stopped")
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()